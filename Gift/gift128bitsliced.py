@@ -2,6 +2,7 @@
 Module to implement the GIFT-128 bit sliced block cipher for use
 in GIFT-COFB class
 """
+from functools import lru_cache
 from utils import *
 
 
@@ -13,6 +14,119 @@ round_constants = [0x01, 0x03, 0x07, 0x0F, 0x1F, 0x3E, 0x3D, 0x3B,
                    0x31, 0x23, 0x06, 0x0D, 0x1B, 0x36, 0x2D, 0x1A,
                    0x34, 0x29, 0x12, 0x24, 0x08, 0x11, 0x22, 0x04]
 
+# new bit positions in each nibble for each cell in the cipher state
+bit_positions = [[0, 3, 2, 1], [1, 0, 3, 2],
+                 [2, 1, 0, 3], [3, 2, 1, 0]]
+
+
+def cell_permutation(cell):
+    """
+    Function to determine where each bit of a cell of the cipher state moves
+    to under the bit permutation.
+    Parameters: the cell number (0-3)
+    Returns: list of 32 new bit positions
+    """
+
+    # bit 4i + j of the cell moves to bit i + 8 * position
+    return [i + 8 * bit_positions[cell][j]
+            for i in range(0, 8) for j in range(0, 4)]
+
+
+def invert_permutation(permutation):
+    """
+    Function to invert a bit permutation.
+    Parameters: list of new bit positions
+    Returns: the inverse list of new bit positions
+    """
+
+    inverse = [0] * len(permutation)
+    for i in range(0, len(permutation)):
+        inverse[permutation[i]] = i
+
+    return inverse
+
+
+def build_perm_masks():
+    """
+    Function to group the bit permutation of each cell of the cipher state by
+    how far each bit moves, so a cell can be permuted with one mask and shift
+    per distance rather than one per bit.
+    Parameters: none
+    Returns: list (one per cell) of (mask, shift) pairs
+    """
+
+    perm_masks = []
+    for cell in range(0, 4):
+        shifts = {}
+        for bit, new_bit in enumerate(cell_permutation(cell)):
+            shifts[new_bit - bit] = shifts.get(new_bit - bit, 0) | 1 << bit
+
+        perm_masks.append(sorted((mask, shift)
+                                 for shift, mask in shifts.items()))
+
+    return perm_masks
+
+
+def build_perm_tables(permutation):
+    """
+    Function to build byte lookup tables for a cell bit permutation. Entry
+    [k][v] holds the permuted bits of byte value v sitting at byte k of the
+    cell, so a cell is permuted with four lookups ORed together.
+    Parameters: list of 32 new bit positions
+    Returns: list of 4 tables of 256 entries
+    """
+
+    tables = []
+    for k in range(0, 4):
+        table = []
+        for value in range(0, 256):
+            permuted = 0
+            for bit in range(0, 8):
+                if value >> bit & 0x1:
+                    permuted |= 1 << permutation[8 * k + bit]
+            table.append(permuted)
+        tables.append(table)
+
+    return tables
+
+
+def permute_word(value, tables):
+    """
+    Function to apply a cell bit permutation using its lookup tables.
+    Parameters: the 32-bit cell value and the cell's permutation tables
+    Returns: the permuted value
+    """
+
+    t0, t1, t2, t3 = tables
+    return (t0[value & 0xff] | t1[value >> 8 & 0xff]
+            | t2[value >> 16 & 0xff] | t3[value >> 24 & 0xff])
+
+
+perm_masks = build_perm_masks()
+perm_tables = [build_perm_tables(cell_permutation(cell))
+               for cell in range(0, 4)]
+perm_inv_tables = [build_perm_tables(invert_permutation(
+    cell_permutation(cell))) for cell in range(0, 4)]
+
+
+def permute_lanes(word, masks):
+    """
+    Function to apply a cell bit permutation to every 32-bit lane of a wide
+    word at once.
+    Parameters: the wide word and the (mask, shift) pairs for the cell, with
+    each mask copied into every lane
+    Returns: the permuted word
+    """
+
+    permuted = 0
+    for mask, shift in masks:
+        if shift >= 0:
+            permuted |= (word & mask) << shift
+        else:
+            permuted |= (word & mask) >> -shift
+
+    return permuted
+
 
 class Gift128BitSliced:
     def __init__(self):
@@ -20,6 +134,9 @@ class Gift128BitSliced:
         self.state = []
         self.key = []
 
+        # schedule the expanded keys are tagged with (see ExpandedKey)
+        self.key_schedule = ("bytes", "GIFT-128 bit sliced", 40)
+
     def encrypt_block(self, plaintext, input_key):
         """
         Method to run the GIFT-128 (bit-sliced) BC.
@@ -44,6 +161,300 @@ class Gift128BitSliced:
 
         return ciphertext
 
+    def encrypt_block_bytes(self, block, key):
+        """
+        Method to run the GIFT-128 (bit-sliced) BC on a block given as
+        bytes. The 16 bytes of the block are the four 32-bit cells of the
+        cipher state, each big endian, and the 16 byte key is the eight
+        16-bit key state words, each big endian - the same layout as the
+        byte lists taken by encrypt_block.
+        Parameters: the plaintext block (bytes or memoryview) and key (bytes
+        or an ExpandedKey from expand_key_bytes)
+        Returns: the ciphertext as bytes
+        """
+
+        block = bytes(block)
+        state = [int.from_bytes(block[i:i + 4], "big")
+                 for i in range(0, 16, 4)]
+
+        state = self.encrypt_words(state,
+                                   self.expand_key_bytes(key).round_keys)
+
+        return b"".join(word.to_bytes(4, "big") for word in state)
+
+    def decrypt_block_bytes(self, block, key):
+        """
+        Method to run the inverse of the GIFT-128 (bit-sliced) BC on a block
+        given as bytes (layout as for encrypt_block_bytes).
+        Parameters: the ciphertext block (bytes or memoryview) and key
+        (bytes or an ExpandedKey from expand_key_bytes)
+        Returns: the plaintext as bytes
+        """
+
+        block = bytes(block)
+        state = [int.from_bytes(block[i:i + 4], "big")
+                 for i in range(0, 16, 4)]
+
+        state = self.decrypt_words(state,
+                                   self.expand_key_bytes(key).round_keys)
+
+        return b"".join(word.to_bytes(4, "big") for word in state)
+
+    def encrypt_int(self, state, round_keys):
+        """
+        Method to run the GIFT-128 (bit-sliced) BC on a block held as a
+        128-bit int - cell 0 of the cipher state is the most significant
+        word, so the int is the block's bytes read big endian.
+        Parameters: the plaintext block as an int and the round keys (see
+        calculate_round_keys)
+        Returns: the ciphertext as an int
+        """
+
+        s0, s1, s2, s3 = self.encrypt_words(
+            [state >> 96, state >> 64 & 0xffffffff, state >> 32 & 0xffffffff,
+             state & 0xffffffff], round_keys)
+
+        return s0 << 96 | s1 << 64 | s2 << 32 | s3
+
+    def encrypt_words(self, state, round_keys):
+        """
+        Method to run the round function over a cipher state held as four
+        32-bit words.
+        Parameters: the four cells of the cipher state and the round keys
+        (see calculate_round_keys)
+        Returns: the four cells of the ciphertext
+        """
+
+        s0, s1, s2, s3 = state
+
+        for u, v, round_constant in round_keys:
+            # sub cells - NOT is an XOR with all ones to stay in 32 bits
+            s1 ^= s0 & s2
+            s0 ^= s1 & s3
+            s2 ^= s0 | s1
+            s3 ^= s2
+            s1 ^= s3
+            s3 ^= 0xffffffff
+            s2 ^= s0 & s1
+            s0, s3 = s3, s0
+
+            # bit permutation
+            s0 = permute_word(s0, perm_tables[0])
+            s1 = permute_word(s1, perm_tables[1])
+            s2 = permute_word(s2, perm_tables[2])
+            s3 = permute_word(s3, perm_tables[3])
+
+            # add round key and round constant
+            s2 ^= u
+            s1 ^= v
+            s3 ^= round_constant
+
+        return [s0, s1, s2, s3]
+
+    def decrypt_words(self, state, round_keys):
+        """
+        Method to run the inverse round function over a cipher state held as
+        four 32-bit words.
+        Parameters: the four cells of the cipher state and the round keys
+        (see calculate_round_keys)
+        Returns: the four cells of the plaintext
+        """
+
+        s0, s1, s2, s3 = state
+
+        for u, v, round_constant in reversed(round_keys):
+            # add round key and round constant
+            s2 ^= u
+            s1 ^= v
+            s3 ^= round_constant
+
+            # inverse bit permutation
+            s0 = permute_word(s0, perm_inv_tables[0])
+            s1 = permute_word(s1, perm_inv_tables[1])
+            s2 = permute_word(s2, perm_inv_tables[2])
+            s3 = permute_word(s3, perm_inv_tables[3])
+
+            # inverse sub cells - the sub cells steps undone in reverse order
+            s0, s3 = s3, s0
+            s2 ^= s0 & s1
+            s3 ^= 0xffffffff
+            s1 ^= s3
+            s3 ^= s2
+            s2 ^= s0 | s1
+            s0 ^= s1 & s3
+            s1 ^= s0 & s2
+
+        return [s0, s1, s2, s3]
+
+    def expand_key(self, key):
+        """
+        Method to expand a key into an ExpandedKey holding its round keys (see
+        calculate_round_keys). The key schedule is cached by key bytes, so
+        repeated calls with the same key reuse it. Keys already expanded for
+        this schedule are returned as they are, and keys expanded for another
+        are expanded again (see reuse_expanded_key).
+        Parameters: the key (list of 16 bytes, as for encrypt_block) or an
+        ExpandedKey
+        Returns: the ExpandedKey
+        """
+
+        key = reuse_expanded_key(key, self.key_schedule)
+        if isinstance(key, ExpandedKey):
+            return key
+
+        return expand_gift_128_bitsliced_key(bytes(key))
+
+    def expand_key_bytes(self, key):
+        """
+        Method to expand a key given as bytes - the key already holds one
+        byte per element, so this is the same as expand_key.
+        Parameters: the key (bytes) or an ExpandedKey
+        Returns: the ExpandedKey
+        """
+
+        return self.expand_key(key)
+
+    def encrypt_blocks(self, blocks, input_key):
+        """
+        Method to run the GIFT-128 (bit-sliced) BC over many blocks at once.
+        Cell w of every block is packed into one wide int, block b sitting in
+        the 32-bit lane at bits 32b to 32b + 31, so each step of the round
+        function is the same handful of int operations however many blocks
+        there are.
+        Parameters: list of plaintext blocks (each as for encrypt_block) and
+        input key
+        Returns: list of ciphertexts
+        """
+
+        if len(blocks) == 0:
+            return []
+
+        words = self.encrypt_lanes(self.pack_blocks(blocks), len(blocks),
+                                   self.expand_key(input_key).round_keys)
+
+        return self.unpack_blocks(words, len(blocks))
+
+    def encrypt_ints(self, states, input_key):
+        """
+        Method to run the GIFT-128 (bit-sliced) BC over many blocks at once,
+        each held as a 128-bit int (cell 0 of the cipher state as the most
+        significant word) - see encrypt_blocks.
+        Parameters: list of plaintext blocks as ints and input key
+        Returns: list of ciphertexts as ints
+        """
+
+        if len(states) == 0:
+            return []
+
+        blocks = [state.to_bytes(16, "big") for state in states]
+        words = self.encrypt_lanes(self.pack_blocks(blocks), len(blocks),
+                                   self.expand_key(input_key).round_keys)
+
+        return [int.from_bytes(block, "big")
+                for block in self.unpack_block_bytes(words, len(blocks))]
+
+    def encrypt_lanes(self, words, num_blocks, round_keys):
+        """
+        Method to run the round function over many blocks packed into four
+        wide words (see pack_blocks).
+        Parameters: the four wide words, the number of blocks and the round
+        keys (see calculate_round_keys)
+        Returns: the four wide words of the ciphertexts
+        """
+
+        # multiplying a 32-bit value by lanes copies it into every lane
+        lanes = int.from_bytes(b"\x01\x00\x00\x00" * num_blocks, "little")
+        ones = 0xffffffff * lanes
+        masks = [[(mask * lanes, shift) for mask, shift in cell_masks]
+                 for cell_masks in perm_masks]
+
+        s0, s1, s2, s3 = words
+
+        for u, v, round_constant in round_keys:
+            # sub cells - as for sub_cells, with NOT as XOR with all ones
+            s1 ^= s0 & s2
+            s0 ^= s1 & s3
+            s2 ^= s0 | s1
+            s3 ^= s2
+            s1 ^= s3
+            s3 ^= ones
+            s2 ^= s0 & s1
+            s0, s3 = s3, s0
+
+            # bit permutation
+            s0 = permute_lanes(s0, masks[0])
+            s1 = permute_lanes(s1, masks[1])
+            s2 = permute_lanes(s2, masks[2])
+            s3 = permute_lanes(s3, masks[3])
+
+            # add round key and round constant
+            s2 ^= u * lanes
+            s1 ^= v * lanes
+            s3 ^= round_constant * lanes
+
+        return [s0, s1, s2, s3]
+
+    def pack_blocks(self, blocks):
+        """
+        Method to pack the cells of many blocks into four wide words.
+        Parameters: list of blocks (16 bytes each)
+        Returns: the four wide words, one per cell of the cipher state
+        """
+
+        words = []
+        for cell in range(0, 4):
+            # each cell is stored big endian in the block, but lane b of the
+            # wide word is at the low end - so reverse each cell's bytes
+            lane_bytes = b"".join(bytes(block[4 * cell:4 * cell + 4])[::-1]
+                                  for block in blocks)
+            words.append(int.from_bytes(lane_bytes, "little"))
+
+        return words
+
+    def unpack_blocks(self, words, num_blocks):
+        """
+        Method to unpack four wide words back into ciphertext blocks.
+        Parameters: the four wide words and the number of blocks
+        Returns: list of ciphertexts (hex, as for encrypt_block)
+        """
+
+        return [[n for byte in block for n in (byte >> 4, byte & 0xf)]
+                for block in self.unpack_block_bytes(words, num_blocks)]
+
+    def unpack_block_bytes(self, words, num_blocks):
+        """
+        Method to unpack four wide words back into blocks of 16 bytes.
+        Parameters: the four wide words and the number of blocks
+        Returns: list of ciphertexts as bytes
+        """
+
+        lane_bytes = [word.to_bytes(4 * num_blocks, "little")
+                      for word in words]
+
+        return [b"".join(cell[4 * b:4 * b + 4][::-1] for cell in lane_bytes)
+                for b in range(0, num_blocks)]
+
+    def calculate_round_keys(self, input_key):
+        """
+        Method to determine the round key and round constant words for every
+        round.
+        Parameters: the input key
+        Returns: list of (U, V, round constant) for each round
+        """
+
+        # load key state into the desired format
+        self.key = [input_key[i] << 8 | input_key[i + 1]
+                    for i in range(0, 16, 2)]
+
+        round_keys = []
+        for i in range(0, 40):
+            round_keys.append(((self.key[2] << 16) | self.key[3],
+                               (self.key[6] << 16) | self.key[7],
+                               0x80000000 | round_constants[i]))
+            self.key_update()
+
+        return round_keys
+
     def initialise(self, plaintext, key_input):
         """
         Method to initialise the cipher state and key state arrays
@@ -90,34 +501,19 @@ class Gift128BitSliced:
     def perm_bits(self):
         """
         Method to apply bit permutation to cipher state
-        We iterate over all four cells in the cipher state, for each cell we
-        iterate over every nibble, and then every bit in each nibble
-        and apply the bit permutation according to the bit positions 2D array
+        Each cell in the cipher state is permuted one byte at a time, looking
+        up where the bits of each byte move to in the precomputed permutation
+        tables
         Parameters: none
         Returns: none (cipher state attribute updated with
         the bit permutation applied)
         """
 
-        # new bit positions in each nibble for each cell in the cipher state
-        bit_positions = [[0, 3, 2, 1], [1, 0, 3, 2],
-                         [2, 1, 0, 3], [3, 2, 1, 0]]
-
-        # iterate over each cell in the cipher state
+        # iterate over each cell in the cipher state and OR together the
+        # permuted bits of each byte of the cell
         for cell in range(0, 4):
-            new_value = 0
-            # determine new value of the cipher state cell by applying bit
-            # permutation
-
-            # iterate over every nibble in the cell (0-7)
-            for i in range(0, 8):
-                # iterate over each bit in each nibble (0-4) and apply
-                # bit permutation to it
-                for j in range(0, 4):
-                    new_value = new_value | (self.state[cell] >>
-                                             (4 * i + j) & 0x1) << (
-                                            i + 8 * bit_positions[cell][j])
-
-            self.state[cell] = new_value
+            self.state[cell] = permute_word(self.state[cell],
+                                            perm_tables[cell])
 
     def add_round_key_and_constant(self, round_num):
         """
@@ -187,6 +583,23 @@ class Gift128BitSliced:
         self.key[0] = T6
 
 
+@lru_cache(maxsize=key_cache_size)
+def expand_gift_128_bitsliced_key(key):
+    """
+    Function to run the GIFT-128 (bit-sliced) key schedule for a key -
+    results are kept in an LRU cache keyed on the key bytes.
+    Parameters: the key as bytes
+    Returns: ExpandedKey holding the round keys
+    """
+
+    key = list(key)
+
+    cipher = Gift128BitSliced()
+
+    return ExpandedKey(key, cipher.calculate_round_keys(key),
+                       cipher.key_schedule)
+
+
 def apply_rotation(bits, num_to_shift):
     """
     Function to apply a
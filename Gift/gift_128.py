@@ -1,7 +1,9 @@
 """
 Module to implement the GIFT-128 version of the GIFT block cipher
 """
+from functools import lru_cache
 from utils import *
+from Gift.gift_128_table import Gift128Table
 
 
 class Gift128:
@@ -9,6 +11,9 @@ class Gift128:
         # define number of rounds in GIFT-128
         self.num_rounds = 40
 
+        # schedule the expanded keys are tagged with (see ExpandedKey)
+        self.key_schedule = ("nibbles", "GIFT-128", self.num_rounds)
+
         # 4-bit S-box for GIFT-128
         self.s_box = [0x1, 0xa, 0x4, 0xc, 0x6, 0xf, 0x3, 0x9, 0x2, 0xd,
                       0xb, 0x7, 0x5, 0x0, 0x8, 0xe]
@@ -52,6 +57,9 @@ class Gift128:
         # set steps to True to print intermediate steps of process (debugging)
         self.steps = False
 
+        # table driven implementation used for blocks given as bytes
+        self.packed = Gift128Table()
+
     def set_steps(self):
         """
         Method to set the steps attribute to True - meaning intermediate
@@ -70,6 +78,9 @@ class Gift128:
         Returns: the encrypted ciphertext.
         """
 
+        # take the round keys from the (cached) key schedule rather than
+        # updating the key every round
+        round_keys = self.expand_key(key).round_keys
         round_num = 0
         for i in range(0, self.num_rounds):
             # Step 1: Non-linear - Apply the s-box
@@ -84,16 +95,18 @@ class Gift128:
                 print("2. Apply P-box: " + str(state))
 
             # Step 3: Apply the round key and round constant
-            state = self.apply_round_key(state, key, round_num)
+            state = self.apply_round_key(state, round_keys[round_num],
+                                         round_num)
             if self.steps:
                 print("3. Add round key and constant: " + str(state))
 
-            # Step 4: Update the key
-            key = self.update_key(key)
+            # Step 4: Update the key (next round key)
             if self.steps:
-                print("4. The Updated Key: " + str(key))
+                if round_num < self.num_rounds - 1:
+                    print("4. The Updated Key: "
+                          + str(round_keys[round_num + 1]))
                 print()
-    
+
             round_num += 1
 
         return state
@@ -106,9 +119,9 @@ class Gift128:
         """
 
         # As decrypting, we need to calculate the round keys for each round -
-        # we need the key for round 27 first so must calculate the round keys
-        # up front - calculate_round_keys will do this
-        round_keys = self.calculate_round_keys(key)
+        # we need the key for round 39 first so must calculate the round keys
+        # up front - expand_key will do this (or reuse a cached schedule)
+        round_keys = self.expand_key(key).round_keys
         round_num = 39
 
         for i in range(0, self.num_rounds):
@@ -284,6 +297,57 @@ class Gift128:
 
         return updated_key
 
+    def expand_key(self, key):
+        """
+        Method to expand a key into an ExpandedKey holding all of its round
+        keys. The key schedule is cached by key bytes, so repeated calls with
+        the same key reuse it. Keys already expanded for this schedule are
+        returned as they are, and keys expanded for another are expanded again
+        (see reuse_expanded_key).
+        Parameters: the key (list of nibbles) or an ExpandedKey.
+        Returns: the ExpandedKey.
+        """
+
+        key = reuse_expanded_key(key, self.key_schedule)
+        if isinstance(key, ExpandedKey):
+            return key
+
+        return expand_gift_128_key(bytes(key))
+
+    def encrypt_block_bytes(self, block, key):
+        """
+        Method to encrypt one block given as bytes. Runs on the table driven
+        implementation, so no nibble lists are built - see
+        Gift128Table.encrypt_block_bytes for the block and key layout.
+        Parameters: the plaintext block (bytes or memoryview) and key (bytes
+        or an ExpandedKey - one from expand_key is expanded again for the
+        table driven engine, so expand_key_bytes is the one to reuse).
+        Returns: the ciphertext as bytes.
+        """
+
+        return self.packed.encrypt_block_bytes(block, key)
+
+    def decrypt_block_bytes(self, block, key):
+        """
+        Method to decrypt one block given as bytes. Runs on the table driven
+        implementation, so no nibble lists are built.
+        Parameters: the ciphertext block (bytes or memoryview) and key
+        (bytes or an ExpandedKey, as for encrypt_block_bytes).
+        Returns: the plaintext as bytes.
+        """
+
+        return self.packed.decrypt_block_bytes(block, key)
+
+    def expand_key_bytes(self, key):
+        """
+        Method to expand a key given as bytes for use with
+        encrypt_block_bytes / decrypt_block_bytes.
+        Parameters: the key (bytes) or an ExpandedKey.
+        Returns: the ExpandedKey.
+        """
+
+        return self.packed.expand_key_bytes(key)
+
     def calculate_round_keys(self, key):
         """
         Method to determine all round keys and return them in a list.
@@ -308,6 +372,23 @@ class Gift128:
         return round_keys
 
 
+@lru_cache(maxsize=key_cache_size)
+def expand_gift_128_key(key):
+    """
+    Function to run the GIFT-128 key schedule for a key - results are kept
+    in an LRU cache keyed on the key bytes.
+    Parameters: the key as bytes (one nibble per byte).
+    Returns: ExpandedKey holding the round keys.
+    """
+
+    key = list(key)
+
+    cipher = Gift128()
+
+    return ExpandedKey(key, cipher.calculate_round_keys(key),
+                       cipher.key_schedule)
+
+
 def convert_round_constant_to_bits(round_constant):
     """
     Function to convert the round constant to its bit representation.
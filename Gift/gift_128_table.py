@@ -0,0 +1,297 @@
+"""
+Module to implement a table driven version of the GIFT-128 block cipher -
+SubCells and PermBits are fused into precomputed per-nibble lookup tables
+and the cipher state and key are held as Python ints
+"""
+from functools import lru_cache
+from utils import ExpandedKey, reuse_expanded_key, key_cache_size, \
+    nibbles_to_int, int_to_nibbles, bytes_to_nibble_int, nibble_int_to_bytes, \
+    split_nibbles
+from Gift.gift_64_packed import s_box, s_box_inv, build_s_box_table, \
+    build_permutation_tables, spread_bits
+
+
+# number of rounds in GIFT-128
+num_rounds = 40
+
+# p-box and inverse p-box for GIFT-128 bit permutation
+p_box = [0, 33, 66, 99, 96, 1, 34, 67, 64, 97, 2, 35, 32, 65, 98, 3, 4, 37,
+         70, 103, 100, 5, 38, 71, 68, 101, 6, 39, 36, 69, 102, 7, 8, 41, 74,
+         107, 104, 9, 42, 75, 72, 105, 10, 43, 40, 73, 106, 11, 12, 45, 78,
+         111, 108, 13, 46, 79, 76, 109, 14, 47, 44, 77, 110, 15, 16, 49, 82,
+         115, 112, 17, 50, 83, 80, 113, 18, 51, 48, 81, 114, 19, 20, 53, 86,
+         119, 116, 21, 54, 87, 84, 117, 22, 55, 52, 85, 118, 23, 24, 57, 90,
+         123, 120, 25, 58, 91, 88, 121, 26, 59, 56, 89, 122, 27, 28, 61, 94,
+         127, 124, 29, 62, 95, 92, 125, 30, 63, 60, 93, 126, 31]
+p_box_inv = [0, 5, 10, 15, 16, 21, 26, 31, 32, 37, 42, 47, 48, 53, 58, 63, 64,
+             69, 74, 79, 80, 85, 90, 95, 96, 101, 106, 111, 112, 117, 122, 127,
+             12, 1, 6, 11, 28, 17, 22, 27, 44, 33, 38, 43, 60, 49, 54, 59, 76,
+             65, 70, 75, 92, 81, 86, 91, 108, 97, 102, 107, 124, 113, 118, 123,
+             8, 13, 2, 7, 24, 29, 18, 23, 40, 45, 34, 39, 56, 61, 50, 55, 72,
+             77, 66, 71, 88, 93, 82, 87, 104, 109, 98, 103, 120, 125, 114, 119,
+             4, 9, 14, 3, 20, 25, 30, 19, 36, 41, 46, 35, 52, 57, 62, 51, 68,
+             73, 78, 67, 84, 89, 94, 83, 100, 105, 110, 99, 116, 121, 126, 115]
+
+# round constants
+round_constants = [0x01, 0x03, 0x07, 0x0F, 0x1F, 0x3E, 0x3D, 0x3B, 0x37, 0x2F,
+                   0x1E, 0x3C, 0x39, 0x33, 0x27, 0x0E, 0x1D, 0x3A, 0x35, 0x2B,
+                   0x16, 0x2C, 0x18, 0x30, 0x21, 0x02, 0x05, 0x0B, 0x17, 0x2E,
+                   0x1C, 0x38, 0x31, 0x23, 0x06, 0x0D, 0x1B, 0x36, 0x2D, 0x1A]
+
+
+def permute(value, permutation):
+    """
+    Function to apply a bit permutation to an int.
+    Parameters: the value to permute and the bit permutation (bit i moves to
+    permutation[i]).
+    Returns: the permuted value.
+    """
+
+    permuted = 0
+    for i in range(0, len(permutation)):
+        if value >> i & 0x1:
+            permuted |= 1 << permutation[i]
+
+    return permuted
+
+
+def build_nibble_tables(box, permutation):
+    """
+    Function to build the per-nibble lookup tables. Entry [i][v] holds
+    box[v] placed at nibble position i and then bit permuted, so a round of
+    SubCells and PermBits is the OR of one lookup per nibble. Passing the
+    identity s-box gives the tables for the permutation alone.
+    Parameters: the 4-bit s-box and the bit permutation.
+    Returns: list of 32 tables of 16 entries.
+    """
+
+    return [[permute(box[v] << (4 * i), permutation) for v in range(16)]
+            for i in range(0, len(permutation) // 4)]
+
+
+def round_constant_mask(round_num):
+    """
+    Function to determine the bits of the state flipped by the round
+    constant (and the fixed 1 bit) of a round.
+    Parameters: the round number.
+    Returns: the round constant mask.
+    """
+
+    constant = round_constants[round_num]
+    mask = 1 << 127
+    for i in range(0, 6):
+        mask |= (constant >> i & 0x1) << (4 * i + 3)
+
+    return mask
+
+
+# fused SubCells/PermBits tables for encryption, and inverse PermBits tables
+# plus a 16-bit inverse s-box table for decryption
+sp_tables = build_nibble_tables(s_box, p_box)
+p_inv_tables = build_nibble_tables(list(range(16)), p_box_inv)
+s_box_inv_table = build_s_box_table(s_box_inv)
+round_constant_masks = [round_constant_mask(i) for i in range(num_rounds)]
+
+# table and shift pairs for every nibble position of the state
+sp_positions = [(table, 4 * i) for i, table in enumerate(sp_tables)]
+p_inv_positions = [(table, 4 * i) for i, table in enumerate(p_inv_tables)]
+
+
+class Gift128Table:
+    def __init__(self):
+        # define number of rounds in GIFT-128
+        self.num_rounds = num_rounds
+
+        # schedule the expanded keys are tagged with (see ExpandedKey)
+        self.key_schedule = ("nibbles", "GIFT-128 table", self.num_rounds)
+
+    def encrypt_block(self, state, key):
+        """
+        Method to encrypt one block of data using GIFT-128. Takes and returns
+        the same nibble lists as Gift128.encrypt_block.
+        Parameters: 128-bit block plaintext to encrypt and 128-bit key.
+        Returns: the encrypted ciphertext.
+        """
+
+        state = self.encrypt_int(nibbles_to_int(state),
+                                 self.expand_key(key).round_keys)
+
+        return int_to_nibbles(state, 32)
+
+    def decrypt_block(self, state, key):
+        """
+        Method to decrypt one block of data using GIFT-128. Takes and returns
+        the same nibble lists as Gift128.decrypt_block.
+        Parameters: 128-bit block ciphertext to decrypt and 128-bit key.
+        Returns: the decrypted plaintext.
+        """
+
+        state = self.decrypt_int(nibbles_to_int(state),
+                                 self.expand_key(key).round_keys)
+
+        return int_to_nibbles(state, 32)
+
+    def encrypt_block_bytes(self, block, key):
+        """
+        Method to encrypt one block given as bytes. Byte i of the 16 byte
+        block holds nibbles 2i (high) and 2i + 1 (low) of the nibble list
+        taken by encrypt_block, i.e. the block's hex string read in order,
+        and the 16 byte key is laid out the same way.
+        Parameters: the plaintext block (bytes or memoryview) and key (bytes
+        or an ExpandedKey from expand_key_bytes).
+        Returns: the ciphertext as bytes.
+        """
+
+        state = self.encrypt_int(bytes_to_nibble_int(block),
+                                 self.expand_key_bytes(key).round_keys)
+
+        return nibble_int_to_bytes(state, 16)
+
+    def decrypt_block_bytes(self, block, key):
+        """
+        Method to decrypt one block given as bytes (layout as for
+        encrypt_block_bytes).
+        Parameters: the ciphertext block (bytes or memoryview) and key
+        (bytes or an ExpandedKey from expand_key_bytes).
+        Returns: the plaintext as bytes.
+        """
+
+        state = self.decrypt_int(bytes_to_nibble_int(block),
+                                 self.expand_key_bytes(key).round_keys)
+
+        return nibble_int_to_bytes(state, 16)
+
+    def encrypt_int(self, state, round_keys):
+        """
+        Method to encrypt a packed state under a set of round keys.
+        Parameters: the packed 128-bit state and the packed round keys.
+        Returns: the packed ciphertext.
+        """
+
+        for round_key in round_keys:
+            # Steps 1 and 2: apply the s-box and bit permutation - one table
+            # lookup per nibble
+            new_state = 0
+            for table, shift in sp_positions:
+                new_state |= table[state >> shift & 0xf]
+
+            # Step 3: Apply the round key and round constant
+            state = new_state ^ round_key
+
+        return state
+
+    def decrypt_int(self, state, round_keys):
+        """
+        Method to decrypt a packed state under a set of round keys.
+        Parameters: the packed 128-bit state and the packed round keys.
+        Returns: the packed plaintext.
+        """
+
+        for round_key in reversed(round_keys):
+            # Step 1: Apply the round key and round constant
+            state ^= round_key
+
+            # Step 2: Linear - Apply inverse bit permutation
+            new_state = 0
+            for table, shift in p_inv_positions:
+                new_state |= table[state >> shift & 0xf]
+
+            # Step 3: Non-linear - Apply inverse s-box, four nibbles at a time
+            state = 0
+            for shift in range(0, 128, 16):
+                state |= s_box_inv_table[new_state >> shift & 0xffff] << shift
+
+        return state
+
+    def update_key(self, key):
+        """
+        Method to update the packed key. Key is updated after each round.
+        k7||k6||...||k1||k0 ← k1 ≫ 2||k0 ≫ 12||...||k3||k2.
+        Parameters: the packed 128-bit key state to update.
+        Returns: the updated packed key state.
+        """
+
+        k0 = key & 0xffff
+        k1 = key >> 16 & 0xffff
+
+        # apply k0 >>> 12 and k1 >>> 2
+        k0 = (k0 >> 12 | k0 << 4) & 0xffff
+        k1 = (k1 >> 2 | k1 << 14) & 0xffff
+
+        # shift k >>> 32 and combine key together
+        return key >> 32 | k0 << 96 | k1 << 112
+
+    def expand_key(self, key):
+        """
+        Method to expand a key into an ExpandedKey holding all of its packed
+        round keys. The key schedule is cached by key bytes, so repeated calls
+        with the same key reuse it. Keys already expanded for this schedule are
+        returned as they are, and keys expanded for another are expanded again
+        (see reuse_expanded_key).
+        Parameters: the key (list of nibbles) or an ExpandedKey.
+        Returns: the ExpandedKey.
+        """
+
+        key = reuse_expanded_key(key, self.key_schedule)
+        if isinstance(key, ExpandedKey):
+            return key
+
+        return expand_gift_128_table_key(bytes(key))
+
+    def expand_key_bytes(self, key):
+        """
+        Method to expand a key given as bytes (layout as for
+        encrypt_block_bytes) - shares the key schedule cache with
+        expand_key.
+        An ExpandedKey is checked as for expand_key, so one made by another
+        engine (e.g. Gift64.expand_key) is expanded again for this one.
+        Parameters: the key (bytes) or an ExpandedKey.
+        Returns: the ExpandedKey.
+        """
+
+        if isinstance(key, ExpandedKey):
+            return self.expand_key(key)
+
+        return self.expand_key(split_nibbles(key))
+
+    def calculate_round_keys(self, key):
+        """
+        Method to determine the packed round keys for every round. Each round
+        key already has the round constant folded in, so it can be XORed
+        straight into the state.
+        Parameters: the original key (list of nibbles).
+        Returns: a list of packed round keys, indexed by round number.
+        """
+
+        key = nibbles_to_int(key)
+        round_keys = []
+
+        for round_num in range(0, self.num_rounds):
+            # extract the U and V round key from the key and spread them to
+            # bits 4i + 2 and 4i + 1 of the state
+            u = key >> 64 & 0xffffffff
+            v = key & 0xffffffff
+            round_keys.append(spread_bits(v, 32) << 1
+                              | spread_bits(u, 32) << 2
+                              | round_constant_masks[round_num])
+
+            key = self.update_key(key)
+
+        return round_keys
+
+
+@lru_cache(maxsize=key_cache_size)
+def expand_gift_128_table_key(key):
+    """
+    Function to run the packed GIFT-128 key schedule for a key - results are
+    kept in an LRU cache keyed on the key bytes.
+    Parameters: the key as bytes (one nibble per byte).
+    Returns: ExpandedKey holding the packed round keys.
+    """
+
+    key = list(key)
+
+    cipher = Gift128Table()
+
+    return ExpandedKey(key, cipher.calculate_round_keys(key),
+                       cipher.key_schedule)
@@ -0,0 +1,364 @@
+"""
+Module to implement a packed integer version of the GIFT-64 block cipher -
+the cipher state and key are held as Python ints for the whole encryption
+rather than as nibble/bit lists, with SubCells and PermBits done by
+precomputed lookup tables
+"""
+from functools import lru_cache
+from utils import ExpandedKey, reuse_expanded_key, key_cache_size, \
+    nibbles_to_int, int_to_nibbles, bytes_to_nibble_int, nibble_int_to_bytes, \
+    split_nibbles
+
+
+# number of rounds in GIFT-64
+num_rounds = 28
+
+# 4-bit s-box and inverse s-box for GIFT-64
+s_box = [0x1, 0xa, 0x4, 0xc, 0x6, 0xf, 0x3, 0x9, 0x2, 0xd, 0xb, 0x7, 0x5,
+         0x0, 0x8, 0xe]
+s_box_inv = [0xD, 0x0, 0x8, 0x6, 0x2, 0xC, 0x4, 0xB, 0xE, 0x7, 0x1, 0xA, 0x3,
+             0x9, 0xF, 0x5]
+
+# p-box and inverse p-box for GIFT-64 bit permutation
+p_box = [0, 17, 34, 51, 48, 1, 18, 35, 32, 49, 2, 19, 16, 33, 50, 3, 4, 21,
+         38, 55, 52, 5, 22, 39, 36, 53, 6, 23, 20, 37, 54, 7, 8, 25, 42, 59,
+         56, 9, 26, 43, 40, 57, 10, 27, 24, 41, 58, 11, 12, 29, 46, 63, 60,
+         13, 30, 47, 44, 61, 14, 31, 28, 45, 62, 15]
+p_box_inv = [0, 5, 10, 15, 16, 21, 26, 31, 32, 37, 42, 47, 48, 53, 58, 63, 12,
+             1, 6, 11, 28, 17, 22, 27, 44, 33, 38, 43, 60, 49, 54, 59, 8, 13,
+             2, 7, 24, 29, 18, 23, 40, 45, 34, 39, 56, 61, 50, 55, 4, 9, 14, 3,
+             20, 25, 30, 19, 36, 41, 46, 35, 52, 57, 62, 51]
+
+# round constants
+round_constants = [0x01, 0x03, 0x07, 0x0F, 0x1F, 0x3E, 0x3D, 0x3B, 0x37, 0x2F,
+                   0x1E, 0x3C, 0x39, 0x33, 0x27, 0x0E, 0x1D, 0x3A, 0x35, 0x2B,
+                   0x16, 0x2C, 0x18, 0x30, 0x21, 0x02, 0x05, 0x0B, 0x17, 0x2E,
+                   0x1C, 0x38, 0x31, 0x23, 0x06, 0x0D, 0x1B, 0x36, 0x2D, 0x1A,
+                   0x34, 0x29, 0x12, 0x24, 0x08, 0x11, 0x22, 0x04]
+
+
+def build_s_box_table(box):
+    """
+    Function to build a 16-bit indexed s-box table, i.e. the s-box applied
+    to all four nibbles of a 16-bit value in one lookup.
+    Parameters: the 4-bit s-box.
+    Returns: the 65536 entry lookup table.
+    """
+
+    byte_table = [box[i & 0xf] | box[i >> 4] << 4 for i in range(256)]
+
+    return [byte_table[i & 0xff] | byte_table[i >> 8] << 8
+            for i in range(65536)]
+
+
+def build_permutation_tables(permutation):
+    """
+    Function to build byte-wise bit permutation tables. Entry [b][v] holds
+    the permuted bits of byte value v sitting at byte position b of the state.
+    Parameters: the bit permutation (bit i moves to permutation[i]).
+    Returns: list of tables of 256 entries, one per byte of the state.
+    """
+
+    tables = []
+    for position in range(0, len(permutation) // 8):
+        table = []
+        for value in range(0, 256):
+            permuted = 0
+            for bit in range(0, 8):
+                if value >> bit & 0x1:
+                    permuted |= 1 << permutation[8 * position + bit]
+            table.append(permuted)
+        tables.append(table)
+
+    return tables
+
+
+def spread_bits(value, num_bits=16):
+    """
+    Function to spread the bits of a round key word out to every fourth
+    bit of the state, i.e. bit i moves to bit 4i - one table lookup per byte.
+    Parameters: the value to spread and its size in bits.
+    Returns: the spread value.
+    """
+
+    spread = 0
+    for i in range(0, num_bits // 8):
+        spread |= spread_table[value >> (8 * i) & 0xff] << (32 * i)
+
+    return spread
+
+
+def round_constant_mask(round_num):
+    """
+    Function to determine the bits of the state flipped by the round
+    constant (and the fixed 1 bit) of a round.
+    Parameters: the round number.
+    Returns: the round constant mask.
+    """
+
+    constant = round_constants[round_num]
+    mask = 1 << 63
+    for i in range(0, 6):
+        mask |= (constant >> i & 0x1) << (4 * i + 3)
+
+    return mask
+
+
+# byte value v with bit i moved to bit 4i (used by spread_bits)
+spread_table = [sum((v >> i & 0x1) << (4 * i) for i in range(8))
+                for v in range(256)]
+
+s_box_table = build_s_box_table(s_box)
+s_box_inv_table = build_s_box_table(s_box_inv)
+p_box_tables = build_permutation_tables(p_box)
+p_box_inv_tables = build_permutation_tables(p_box_inv)
+round_constant_masks = [round_constant_mask(i) for i in range(num_rounds)]
+
+
+class Gift64Packed:
+    def __init__(self):
+        # define number of rounds in GIFT-64
+        self.num_rounds = num_rounds
+
+        # schedule the expanded keys are tagged with (see ExpandedKey)
+        self.key_schedule = ("nibbles", "GIFT-64 packed", self.num_rounds)
+
+    def encrypt_block(self, state, key):
+        """
+        Method to encrypt one block of data using GIFT-64. Takes and returns
+        the same nibble lists as Gift64.encrypt_block.
+        Parameters: 64-bit block plaintext to encrypt and 128-bit key.
+        Returns: the encrypted ciphertext.
+        """
+
+        state = self.encrypt_int(nibbles_to_int(state),
+                                 self.expand_key(key).round_keys)
+
+        return int_to_nibbles(state, 16)
+
+    def decrypt_block(self, state, key):
+        """
+        Method to decrypt one block of data using GIFT-64. Takes and returns
+        the same nibble lists as Gift64.decrypt_block.
+        Parameters: the 64 bit block ciphertext to decrypt and 128-bit key.
+        Returns: the decrypted plaintext.
+        """
+
+        state = self.decrypt_int(nibbles_to_int(state),
+                                 self.expand_key(key).round_keys)
+
+        return int_to_nibbles(state, 16)
+
+    def encrypt_block_bytes(self, block, key):
+        """
+        Method to encrypt one block given as bytes. Byte i of the 8 byte
+        block holds nibbles 2i (high) and 2i + 1 (low) of the nibble list
+        taken by encrypt_block, i.e. the block's hex string read in order,
+        and the 16 byte key is laid out the same way.
+        Parameters: the plaintext block (bytes or memoryview) and key (bytes
+        or an ExpandedKey from expand_key_bytes).
+        Returns: the ciphertext as bytes.
+        """
+
+        state = self.encrypt_int(bytes_to_nibble_int(block),
+                                 self.expand_key_bytes(key).round_keys)
+
+        return nibble_int_to_bytes(state, 8)
+
+    def decrypt_block_bytes(self, block, key):
+        """
+        Method to decrypt one block given as bytes (layout as for
+        encrypt_block_bytes).
+        Parameters: the ciphertext block (bytes or memoryview) and key
+        (bytes or an ExpandedKey from expand_key_bytes).
+        Returns: the plaintext as bytes.
+        """
+
+        state = self.decrypt_int(bytes_to_nibble_int(block),
+                                 self.expand_key_bytes(key).round_keys)
+
+        return nibble_int_to_bytes(state, 8)
+
+    def encrypt_int(self, state, round_keys):
+        """
+        Method to encrypt a packed state under a set of round keys.
+        Parameters: the packed 64-bit state and the packed round keys.
+        Returns: the packed ciphertext.
+        """
+
+        for round_key in round_keys:
+            # Step 1: Non-linear - Apply s-box
+            state = self.sub_cells(state)
+
+            # Step 2: Linear - Apply bit permutation
+            state = self.perm_bits(state)
+
+            # Step 3: Apply the round key and round constant
+            state ^= round_key
+
+        return state
+
+    def decrypt_int(self, state, round_keys):
+        """
+        Method to decrypt a packed state under a set of round keys.
+        Parameters: the packed 64-bit state and the packed round keys.
+        Returns: the packed plaintext.
+        """
+
+        for round_key in reversed(round_keys):
+            # Step 1: Apply the round key and round constant
+            state ^= round_key
+
+            # Step 2: Linear - Apply inverse bit permutation
+            state = self.perm_bits_inv(state)
+
+            # Step 3: Non-linear - Apply inverse s-box
+            state = self.sub_cells_inv(state)
+
+        return state
+
+    def sub_cells(self, state):
+        """
+        Method to apply the s-box to all 16 nibbles of the packed state,
+        four nibbles per table lookup.
+        Parameters: the packed state.
+        Returns: the packed state with the s-box applied.
+        """
+
+        return (s_box_table[state & 0xffff]
+                | s_box_table[state >> 16 & 0xffff] << 16
+                | s_box_table[state >> 32 & 0xffff] << 32
+                | s_box_table[state >> 48] << 48)
+
+    def sub_cells_inv(self, state):
+        """
+        Method to apply the inverse s-box to all 16 nibbles of the packed
+        state, four nibbles per table lookup.
+        Parameters: the packed state.
+        Returns: the packed state with the inverse s-box applied.
+        """
+
+        return (s_box_inv_table[state & 0xffff]
+                | s_box_inv_table[state >> 16 & 0xffff] << 16
+                | s_box_inv_table[state >> 32 & 0xffff] << 32
+                | s_box_inv_table[state >> 48] << 48)
+
+    def perm_bits(self, state):
+        """
+        Method to apply the bit permutation to the packed state, one table
+        lookup per byte of the state.
+        Parameters: the packed state.
+        Returns: the packed state with the p-box applied.
+        """
+
+        t = p_box_tables
+        return (t[0][state & 0xff] | t[1][state >> 8 & 0xff]
+                | t[2][state >> 16 & 0xff] | t[3][state >> 24 & 0xff]
+                | t[4][state >> 32 & 0xff] | t[5][state >> 40 & 0xff]
+                | t[6][state >> 48 & 0xff] | t[7][state >> 56])
+
+    def perm_bits_inv(self, state):
+        """
+        Method to apply the inverse bit permutation to the packed state, one
+        table lookup per byte of the state.
+        Parameters: the packed state.
+        Returns: the packed state with the inverse p-box applied.
+        """
+
+        t = p_box_inv_tables
+        return (t[0][state & 0xff] | t[1][state >> 8 & 0xff]
+                | t[2][state >> 16 & 0xff] | t[3][state >> 24 & 0xff]
+                | t[4][state >> 32 & 0xff] | t[5][state >> 40 & 0xff]
+                | t[6][state >> 48 & 0xff] | t[7][state >> 56])
+
+    def update_key(self, key):
+        """
+        Method to update the packed key. Key is updated after each round.
+        k7||k6||...||k1||k0 ← k1 ≫ 2||k0 ≫ 12||...||k3||k2.
+        Parameters: the packed 128-bit key state to update.
+        Returns: the updated packed key state.
+        """
+
+        k0 = key & 0xffff
+        k1 = key >> 16 & 0xffff
+
+        # apply k0 >>> 12 and k1 >>> 2
+        k0 = (k0 >> 12 | k0 << 4) & 0xffff
+        k1 = (k1 >> 2 | k1 << 14) & 0xffff
+
+        # shift k >>> 32 and combine key together
+        return key >> 32 | k0 << 96 | k1 << 112
+
+    def expand_key(self, key):
+        """
+        Method to expand a key into an ExpandedKey holding all of its packed
+        round keys. The key schedule is cached by key bytes, so repeated calls
+        with the same key reuse it. Keys already expanded for this schedule are
+        returned as they are, and keys expanded for another are expanded again
+        (see reuse_expanded_key).
+        Parameters: the key (list of nibbles) or an ExpandedKey.
+        Returns: the ExpandedKey.
+        """
+
+        key = reuse_expanded_key(key, self.key_schedule)
+        if isinstance(key, ExpandedKey):
+            return key
+
+        return expand_gift_64_packed_key(bytes(key))
+
+    def expand_key_bytes(self, key):
+        """
+        Method to expand a key given as bytes (layout as for
+        encrypt_block_bytes) - shares the key schedule cache with
+        expand_key.
+        An ExpandedKey is checked as for expand_key, so one made by another
+        engine (e.g. Gift64.expand_key) is expanded again for this one.
+        Parameters: the key (bytes) or an ExpandedKey.
+        Returns: the ExpandedKey.
+        """
+
+        if isinstance(key, ExpandedKey):
+            return self.expand_key(key)
+
+        return self.expand_key(split_nibbles(key))
+
+    def calculate_round_keys(self, key):
+        """
+        Method to determine the packed round keys for every round. Each round
+        key already has the round constant folded in, so it can be XORed
+        straight into the state.
+        Parameters: the original key (list of nibbles).
+        Returns: a list of packed round keys, indexed by round number.
+        """
+
+        key = nibbles_to_int(key)
+        round_keys = []
+
+        for round_num in range(0, self.num_rounds):
+            # extract the U and V round key from the key and spread them to
+            # bits 4i + 1 and 4i of the state
+            u = key >> 16 & 0xffff
+            v = key & 0xffff
+            round_keys.append(spread_bits(v) | spread_bits(u) << 1
+                              | round_constant_masks[round_num])
+
+            key = self.update_key(key)
+
+        return round_keys
+
+
+@lru_cache(maxsize=key_cache_size)
+def expand_gift_64_packed_key(key):
+    """
+    Function to run the packed GIFT-64 key schedule for a key - results are
+    kept in an LRU cache keyed on the key bytes.
+    Parameters: the key as bytes (one nibble per byte).
+    Returns: ExpandedKey holding the packed round keys.
+    """
+
+    key = list(key)
+
+    cipher = Gift64Packed()
+
+    return ExpandedKey(key, cipher.calculate_round_keys(key),
+                       cipher.key_schedule)
@@ -3,123 +3,205 @@ Module to implement the GIFT-COFB algorithm - note the need to import the
 GIFT-128 bit sliced version of the GIFT block cipher for use in GIFT-COFB
 """
 
+from hmac import compare_digest
 from utils import *
 from Gift.gift128bitsliced import *
 
+# L is held as a 64-bit int (first nibble as the most significant) - each
+# doubling is a multiplication by x modulo x^64 + x^4 + x^3 + x + 1
+delta_mask = (1 << 64) - 1
+delta_feedback = 0x1b
 
-class GiftCofb:
-    def __init__(self):
-        # instantiate GIFT-128 object - the block cipher used in GIFT-COFB
-        self.cipher = Gift128BitSliced()
 
-        # declare n which is the block size (bits)
-        self.n = 128
+def double_delta(delta):
+    """
+    Function to apply L ← 2 · L - a shift and a conditional XOR of the
+    feedback constant, selected with a mask rather than a branch.
+    Parameters: L as an int.
+    Returns: 2 · L.
+    """
 
-    def encrypt(self, plaintext_blocks, key, associated_data_blocks, nonce):
-        """
-        Method to run GIFT-COFB to produce ciphertext and tag
-        Parameters: the plaintext blocks, key, associated data blocks, nonce.
-        Returns: the ciphertext and tag
-        """
+    return (delta << 1 & delta_mask) ^ (-(delta >> 63) & delta_feedback)
 
-        # 1. Initialisation
-        ciphertext_blocks = []
 
-        # the nonce is encrypted with GIFT-128 and set as the state
-        state = nonce[:]
-        state = self.cipher.encrypt_block(hex_to_decimal(state),
-                                          hex_to_decimal(key))
+def triple_delta(delta):
+    """
+    Function to apply L ← 3 · L, i.e. 2 · L ⊕ L.
+    Parameters: L as an int.
+    Returns: 3 · L.
+    """
 
-        # truncate state (y[0]) and set to delta
-        delta = state[0:16]
+    return double_delta(delta) ^ delta
 
-        # 2. Process associated data blocks
 
-        # iterate over all associated data blocks excluding the last
-        for i in range(0, len(associated_data_blocks) - 1):
-            # L ← 2 · L
-            delta = self.double(delta)
-            # apply ρ1(Y, M) = G· Y ⊕ M
-            state = self.pho1(state, associated_data_blocks[i])
+def nibbles_to_delta(nibbles):
+    """
+    Function to pack L from a list of 16 nibbles into an int.
+    Parameters: L as a list of nibbles.
+    Returns: L as an int.
+    """
 
-            # xor state with delta (pad delta with 0's)
-            state = xor_bits(state, delta + [0] * 32)
+    return int.from_bytes(bytes(hex_to_decimal(nibbles)), "big")
 
-            # encrypt state under GIFT-128
-            state = self.cipher.encrypt_block(hex_to_decimal(state),
-                                              hex_to_decimal(key))
 
-        # L ← 3 · L
-        delta = self.triple(delta)
+def delta_to_nibbles(delta):
+    """
+    Function to unpack L from an int into a list of 16 nibbles.
+    Parameters: L as an int.
+    Returns: L as a list of nibbles.
+    """
 
-        # check whether last associated data block is not a full block
-        if len((associated_data_blocks[-1]) * 4) != self.n:
-            # L ← 3 · L if last associated data block is not full
-            delta = self.triple(delta)
+    return list(split_nibbles(delta.to_bytes(8, "big")))
 
-        # check whether plaintext is empty
-        if plaintext_blocks == [[]]:
-            # L ← 3^2 · L if plaintext is empty
-            delta = self.triple(delta)
-            delta = self.triple(delta)
 
-        # pad last associated data block (where necessary)
-        associated_data_blocks[-1] = apply_padding(associated_data_blocks[-1],
-                                                   128)
-        # apply ρ1(Y, M) = G· Y ⊕ M
-        state = self.pho1(state, associated_data_blocks[-1])
+def block_to_int(block):
+    """
+    Function to pack a block of up to 32 nibbles into a 128-bit int, the
+    first nibble as the most significant - a shorter block fills the top
+    of the int, with zeros below it.
+    Parameters: the block as a list of nibbles.
+    Returns: the block as an int.
+    """
 
-        # xor state with delta (pad delta with 0's) and encrypt state
-        state = xor_bits(state, delta + [0] * 32)
+    # each nibble is the second hex digit of its byte
+    return int(bytes(block).hex()[1::2] or "0", 16) << 4 * (32 - len(block))
 
-        state = self.cipher.encrypt_block(hex_to_decimal(state),
-                                          hex_to_decimal(key))
 
-        # 3. Process plaintext blocks
+def int_to_block(value, length):
+    """
+    Function to unpack the first nibbles of a 128-bit int into a block.
+    Parameters: the block as an int and the number of nibbles to keep.
+    Returns: the block as a list of nibbles.
+    """
 
-        # iterate over all plaintext blocks excluding the last one
-        for i in range(0, len(plaintext_blocks) - 1):
-            # L ← 2 · L
-            delta = self.double(delta)
+    return list(split_nibbles(value.to_bytes(16, "big"))[0:length])
 
-            # apply ρ(Y, M) = (ρ1(Y, M), Y ⊕ M)
-            state, ciphertext = self.pho(state, plaintext_blocks[i])
-            ciphertext_blocks.append(ciphertext)
 
-            # xor state with padded delta and encrypt state
-            state = xor_bits(state, delta + [0] * 32)
-            state = self.cipher.encrypt_block(hex_to_decimal(state),
-                                              hex_to_decimal(key))
+def bytes_to_block_int(data):
+    """
+    Function to pack a block of up to 16 bytes into a 128-bit int, filling
+    the top of the int (as block_to_int).
+    Parameters: the block as bytes.
+    Returns: the block as an int.
+    """
 
-        # check whether plaintext is not empty, i.e. there is a final block
-        # to analyse
-        if plaintext_blocks != [[]]:
-            # L ← 3 · L
-            delta = self.triple(delta)
+    return int.from_bytes(data, "big") << 8 * (16 - len(data))
 
-            # check whether last block of plaintext is not full
-            if len(plaintext_blocks[-1]) != 32:
-                # L ← 3 · L if last plaintext block not full
-                delta = self.triple(delta)
 
-            # apply padding where necessary to last plaintext block
-            length = len(plaintext_blocks[-1])
-            plaintext_blocks[-1] = apply_padding(plaintext_blocks[-1], 128)
+def blocks_to_ints(blocks):
+    """
+    Function to pack a list of blocks into (value, length) pairs.
+    Parameters: list of blocks (lists of nibbles).
+    Returns: list of (block as an int, number of nibbles) pairs.
+    """
 
-            # apply ρ(Y, M) = (ρ1(Y, M), Y ⊕ M)
-            state, ciphertext = self.pho(state, plaintext_blocks[-1])
-            ciphertext_blocks.append(ciphertext[0:length])
+    return [(block_to_int(block), len(block)) for block in blocks]
 
-            # xor state with padded delta and encrypt state
-            state = xor_bits(state, delta + [0] * 32)
 
-            state = self.cipher.encrypt_block(hex_to_decimal(state),
-                                              hex_to_decimal(key))
-            
-        # tag becomes the current value of state
-        tag = state
+def truncate_block_int(value, length):
+    """
+    Function to keep the first nibbles of a 128-bit int, zeroing the rest.
+    Parameters: the block as an int and the number of nibbles to keep.
+    Returns: the truncated block.
+    """
+
+    return value >> 4 * (32 - length) << 4 * (32 - length)
+
+
+def pad_block_int(value, length):
+    """
+    Function to apply the injective padding 10* to an incomplete block
+    held as an int (as apply_padding).
+    Parameters: the block as an int and its number of nibbles.
+    Returns: the padded block.
+    """
+
+    if length != 32:
+        value |= 8 << 4 * (31 - length)
+
+    return value
+
+
+def delta_ladder(delta, length):
+    """
+    Function to precompute the ladder of masks 2^i · L.
+    Parameters: L as an int and the number of entries.
+    Returns: list of 2^i · L, indexed by i.
+    """
+
+    ladder = [delta]
+    for i in range(1, length):
+        ladder.append(double_delta(ladder[-1]))
+
+    return ladder
+
+
+def ladder_mask(ladder, doublings, triplings):
+    """
+    Function to fetch the mask 3^k · 2^j · L from the ladder. Over GF(2),
+    3^k = (x + 1)^k is the sum of the x^t for which t is a subset of the bits
+    of k, so the mask is the XOR of those ladder entries from j onwards.
+    Parameters: the ladder (from delta_ladder), the number of doublings j
+    and the number of triplings k.
+    Returns: the mask as an int.
+    """
+
+    mask = 0
+    for t in range(0, triplings + 1):
+        if t & triplings == t:
+            mask ^= ladder[doublings + t]
+
+    return mask
+
+
+class GiftCofb:
+    def __init__(self):
+        # instantiate GIFT-128 object - the block cipher used in GIFT-COFB
+        self.cipher = Gift128BitSliced()
+
+        # declare n which is the block size (bits)
+        self.n = 128
+
+    def encrypt(self, plaintext_blocks, key, associated_data_blocks, nonce):
+        """
+        Method to run GIFT-COFB to produce ciphertext and tag
+        Parameters: the plaintext blocks, key, associated data blocks, nonce.
+        Returns: the ciphertext and tag
+        """
+
+        # 1. Initialisation - the key is expanded once, and the nonce is
+        # encrypted with GIFT-128 and set as the state
+        key = self.expand_key(key)
+        state = self.cipher.encrypt_int(block_to_int(nonce), key.round_keys)
+
+        return self.encrypt_from_state(state, plaintext_blocks, key,
+                                       associated_data_blocks)
+
+    def encrypt_from_state(self, state, plaintext_blocks, key,
+                           associated_data_blocks):
+        """
+        Method to run GIFT-COFB from the encrypted nonce onwards. The blocks
+        are converted to ints once, the construction is run on ints by
+        process_int and the ciphertext and tag are converted back.
+        Parameters: the encrypted nonce (as an int), the plaintext blocks,
+        key (an ExpandedKey from expand_key) and associated data blocks.
+        Returns: the ciphertext and tag
+        """
+
+        # an empty plaintext is given as [[]] and has no blocks
+        if plaintext_blocks == [[]]:
+            plaintext_blocks = []
 
-        return ciphertext_blocks, tag
+        ciphertext, tag = self.process_int(
+            state, key, blocks_to_ints(associated_data_blocks),
+            blocks_to_ints(plaintext_blocks), False)
+
+        # the last ciphertext block is truncated to the plaintext length
+        ciphertext_blocks = [int_to_block(block, len(plaintext_block))
+                             for block, plaintext_block
+                             in zip(ciphertext, plaintext_blocks)]
+
+        return ciphertext_blocks, int_to_block(tag, 32)
 
     def verify(self, ciphertext, key, associated_data, nonce, tag_to_verify):
         """
@@ -131,114 +213,212 @@ class GiftCofb:
         plaintext.
         """
 
-        # 1. Initialisation
-        plaintext_blocks = []
+        # 1. Initialisation - the key is expanded once, and the nonce is
+        # encrypted with GIFT-128 and set as the state
+        key = self.expand_key(key)
+        state = self.cipher.encrypt_int(block_to_int(nonce), key.round_keys)
+
+        return self.verify_from_state(state, ciphertext, key, associated_data,
+                                      tag_to_verify)
+
+    def verify_from_state(self, state, ciphertext, key, associated_data,
+                          tag_to_verify):
+        """
+        Method to verify a GIFT-COFB tag from the encrypted nonce onwards
+        (see encrypt_from_state).
+        Parameters: the encrypted nonce (as an int), ciphertext blocks, key
+        (an ExpandedKey from expand_key), associated data blocks and the tag
+        to verify.
+        Returns: if tag is verified, the plaintext, otherwise returns empty
+        plaintext.
+        """
 
-        # the nonce is encrypted with GIFT-128 and set as the state
-        state = nonce[:]
-        state = self.cipher.encrypt_block(hex_to_decimal(state),
-                                          hex_to_decimal(key))
+        # an empty ciphertext is given as [[]] and has no blocks
+        if ciphertext == [[]]:
+            ciphertext = []
 
-        # truncate state (y[0]) and set to delta
-        delta = state[0:16]
+        plaintext, tag = self.process_int(
+            state, key, blocks_to_ints(associated_data),
+            blocks_to_ints(ciphertext), True)
+
+        # verify whether the generated tag matches the tag to verify
+        if int_to_block(tag, 32) == tag_to_verify:
+            # if tag matches, return the plaintext
+            return [int_to_block(block, len(ciphertext_block))
+                    for block, ciphertext_block in zip(plaintext, ciphertext)]
+        else:
+            return [-1]
+
+    def process_int(self, state, key, associated_data, message, decrypt):
+        """
+        Method to run GIFT-COFB on ints - the state Y is one 128-bit int, L
+        a 64-bit int and each block a (value, length) pair from
+        blocks_to_ints, so no nibble lists are built between the encrypted
+        nonce and the tag.
+        Parameters: the encrypted nonce (as an int), key (an ExpandedKey
+        from expand_key), the associated data and message blocks as
+        (value, length) pairs (no message blocks for an empty message) and
+        whether decrypting.
+        Returns: the output blocks (as ints, not yet truncated) and the tag
+        (as an int).
+        """
+
+        round_keys = key.round_keys
+        encrypt_int = self.cipher.encrypt_int
+        output = []
+
+        # truncate state (y[0]) and set to L, then precompute 2^i · L for
+        # every block - the mask of each block is then fetched from the
+        # ladder by its number of doublings and triplings
+        ladder = delta_ladder(state >> 64,
+                              len(associated_data) + len(message) + 4)
+        doublings = 0
+        triplings = 0
 
         # 2. Process associated data blocks
 
         # iterate over all associated data blocks excluding the last
-        for i in range(0, len(associated_data) - 1):
+        for value, length in associated_data[:-1]:
             # L ← 2 · L
-            delta = self.double(delta)
+            doublings += 1
 
             # apply ρ1(Y, M) = G· Y ⊕ M
-            state = self.pho1(state, associated_data[i])
-
-            # xor state with delta (pad delta with 0's)
-            state = xor_bits(state, delta + [0] * 32)
-
-            # encrypt state under GIFT-128
-            state = self.cipher.encrypt_block(hex_to_decimal(state),
-                                              hex_to_decimal(key))
+            state = self.pho1_int(state, value)
 
-        # L ← 3 · L
-        delta = self.triple(delta)
+            # xor state with delta (padded with 0's) and encrypt it under
+            # GIFT-128
+            delta = ladder_mask(ladder, doublings, triplings)
+            state = encrypt_int(state ^ delta << 64, round_keys)
 
-        # check whether last associated data block is not a full block
-        if len((associated_data[-1]) * 4) != self.n:
-            # L ← 3 · L if last associated data block is not full
-            delta = self.triple(delta)
+        # L ← 3 · L, and again if the last associated data block is not full
+        value, length = associated_data[-1]
+        triplings += 1
+        if length != 32:
+            triplings += 1
 
-        # check whether plaintext is empty
-        if ciphertext == [[]]:
-            # L ← 3^2 · L if plaintext is empty
-            delta = self.triple(delta)
-            delta = self.triple(delta)
-
-        # pad last associated data block (where necessary)
-        associated_data[-1] = apply_padding(associated_data[-1], 128)
+        # L ← 3^2 · L if plaintext is empty
+        if not message:
+            triplings += 2
 
-        # apply ρ1(Y, M) = G· Y ⊕ M
-        state = self.pho1(state, associated_data[-1])
+        # pad last associated data block (where necessary) and apply
+        # ρ1(Y, M) = G· Y ⊕ M
+        state = self.pho1_int(state, pad_block_int(value, length))
 
-        # xor state with delta (pad delta with 0's) and encrypt state
-        state = xor_bits(state, delta + [0] * 32)
-        state = self.cipher.encrypt_block(hex_to_decimal(state),
-                                          hex_to_decimal(key))
+        # xor state with delta (padded with 0's) and encrypt state
+        delta = ladder_mask(ladder, doublings, triplings)
+        state = encrypt_int(state ^ delta << 64, round_keys)
 
-        # 3. Process plaintext blocks
+        # 3. Process message blocks
 
-        # iterate over all plaintext blocks excluding the last one
-        for i in range(0, len(ciphertext) - 1):
+        # iterate over all message blocks excluding the last one
+        for value, length in message[:-1]:
             # L ← 2 · L
-            delta = self.double(delta)
+            doublings += 1
 
-            # apply ρ(Y, M) = (ρ1(Y, M), Y ⊕ M)
-            state, ciphertext_block = self.phoprime(state, ciphertext[i])
-            plaintext_blocks.append(ciphertext_block)
+            # apply ρ(Y, M) = (ρ1(Y, M), Y ⊕ M), or ρ' when decrypting
+            if decrypt:
+                state, block = self.phoprime_int(state, value)
+            else:
+                state, block = self.pho_int(state, value)
+            output.append(block)
 
             # xor state with padded delta and encrypt state
-            state = xor_bits(state, delta + [0] * 32)
-            state = self.cipher.encrypt_block(hex_to_decimal(state),
-                                              hex_to_decimal(key))
+            delta = ladder_mask(ladder, doublings, triplings)
+            state = encrypt_int(state ^ delta << 64, round_keys)
 
-        # check whether plaintext is not empty, i.e. there is a final block
+        # check whether the message is not empty, i.e. there is a final block
         # to analyse
-        if ciphertext != [[]]:
-            # L ← 3 · L
-            delta = self.triple(delta)
-
-            # check whether last block of plaintext is not full
-            if len(ciphertext[-1]) != 32:
-                # L ← 3 · L if last plaintext block not full
-                delta = self.triple(delta)
-
-                # xor the last block with the current state
-                last_plaintext_block = xor_bits(ciphertext[-1], state)
-                plaintext_blocks.append(last_plaintext_block)
-
-                # apply padding to the final block
-                last_plaintext_block = apply_padding(last_plaintext_block[:],
-                                                     128)
+        if message:
+            # L ← 3 · L, and again if the last block is not full
+            value, length = message[-1]
+            triplings += 1
+            if length != 32:
+                triplings += 1
+
+            # apply ρ to the padded block - when decrypting, the plaintext is
+            # recovered (and truncated) first and then padded
+            if decrypt:
+                block = truncate_block_int(state ^ value, length)
+                state = self.pho1_int(state, pad_block_int(block, length))
             else:
-                last_plaintext_block = xor_bits(ciphertext[-1], state)
-                plaintext_blocks.append(last_plaintext_block)
-
-            # apply ρ(Y, M) = (ρ1(Y, M), Y ⊕ M)
-            state = self.pho1(state, last_plaintext_block)
+                state, block = self.pho_int(state,
+                                            pad_block_int(value, length))
+            output.append(block)
 
             # xor state with padded delta and encrypt state
-            state = xor_bits(state, delta + [0] * 32)
-            state = self.cipher.encrypt_block(hex_to_decimal(state),
-                                              hex_to_decimal(key))
+            delta = ladder_mask(ladder, doublings, triplings)
+            state = encrypt_int(state ^ delta << 64, round_keys)
 
         # tag becomes the current value of state
-        tag = state
+        return output, state
 
-        # verify whether the generated tag matches the tag to verify
-        if tag == tag_to_verify:
-            # if tag matches, return the plaintext
-            return plaintext_blocks
-        else:
-            return [-1]
+    def encrypt_many(self, messages, key):
+        """
+        Method to run GIFT-COFB over many messages under one key - same
+        results as calling encrypt for each message, but the key is expanded
+        once and the nonces of all of the messages are encrypted together in
+        one batch.
+        Parameters: iterable of (nonce, associated data blocks, plaintext
+        blocks) and the key.
+        Returns: list of (ciphertext, tag), in the order of the messages.
+        """
+
+        messages = list(messages)
+        key = self.expand_key(key)
+        states = self.encrypt_nonces([message[0] for message in messages],
+                                     key)
+
+        return [self.encrypt_from_state(state, plaintext_blocks, key,
+                                        associated_data_blocks)
+                for state, (nonce, associated_data_blocks, plaintext_blocks)
+                in zip(states, messages)]
+
+    def verify_many(self, messages, key):
+        """
+        Method to verify many GIFT-COFB messages under one key - same
+        results as calling verify for each message (see encrypt_many).
+        Parameters: iterable of (nonce, associated data blocks, ciphertext
+        blocks, tag to verify) and the key.
+        Returns: list of the plaintext if the tag is verified, [-1]
+        otherwise, in the order of the messages.
+        """
+
+        messages = list(messages)
+        key = self.expand_key(key)
+        states = self.encrypt_nonces([message[0] for message in messages],
+                                     key)
+
+        return [self.verify_from_state(state, ciphertext, key,
+                                       associated_data, tag_to_verify)
+                for state, (nonce, associated_data, ciphertext,
+                            tag_to_verify) in zip(states, messages)]
+
+    def expand_key(self, key):
+        """
+        Method to expand a key into the GIFT-128 round keys (cached by key).
+        An ExpandedKey is checked against the GIFT-128 (bit sliced) schedule
+        (see reuse_expanded_key).
+        Parameters: the key (list of nibbles) or an ExpandedKey.
+        Returns: the ExpandedKey.
+        """
+
+        if isinstance(key, ExpandedKey):
+            return self.cipher.expand_key(key)
+
+        return self.cipher.expand_key(hex_to_decimal(key))
+
+    def encrypt_nonces(self, nonces, key):
+        """
+        Method to encrypt many nonces under GIFT-128 at once - the blocks
+        share the same round keys, so they are run through the lane packed
+        encrypt_ints.
+        Parameters: list of nonces (lists of nibbles) and the key (an
+        ExpandedKey from expand_key).
+        Returns: list of the encrypted nonces (as ints).
+        """
+
+        return self.cipher.encrypt_ints(
+            [block_to_int(nonce) for nonce in nonces], key)
 
     def pho1(self, Y, M):
         """
@@ -247,8 +427,9 @@ class GiftCofb:
         Parameters: Y and M
         Returns: ρ1(Y, M)
         """
-        
-        return xor_bits(self.G(Y), M)
+
+        return int_to_block(self.pho1_int(block_to_int(Y), block_to_int(M)),
+                            32)
 
     def pho(self, Y, M):
         """
@@ -258,7 +439,9 @@ class GiftCofb:
         Returns: ρ(Y, M)
         """
 
-        return self.pho1(Y, M), xor_bits(Y, M)
+        Y, C = self.pho_int(block_to_int(Y), block_to_int(M))
+
+        return int_to_block(Y, 32), int_to_block(C, 32)
 
     def phoprime(self, Y, C):
         """
@@ -267,9 +450,40 @@ class GiftCofb:
         Parameters: Y and M
         Returns: ρ(Y, M)
         """
-        temp = xor_bits(Y, C)
 
-        return self.pho1(Y, temp), temp
+        Y, M = self.phoprime_int(block_to_int(Y), block_to_int(C))
+
+        return int_to_block(Y, 32), int_to_block(M, 32)
+
+    def pho1_int(self, Y, M):
+        """
+        Method to apply the ρ1 function to ints.
+        Parameters: Y and M (as 128-bit ints)
+        Returns: ρ1(Y, M)
+        """
+
+        return self.G_int(Y) ^ M
+
+    def pho_int(self, Y, M):
+        """
+        Method to apply the ρ function to ints.
+        Parameters: Y and M (as 128-bit ints)
+        Returns: ρ(Y, M)
+        """
+
+        return self.G_int(Y) ^ M, Y ^ M
+
+    def phoprime_int(self, Y, C):
+        """
+        Method to apply the ρ' function (used for decryption) to ints - the
+        message is recovered as Y ⊕ C and then ρ1 is applied.
+        Parameters: Y and C (as 128-bit ints)
+        Returns: ρ1(Y, M) and M
+        """
+
+        M = Y ^ C
+
+        return self.G_int(Y) ^ M, M
 
     def double(self, delta):
         """
@@ -278,22 +492,7 @@ class GiftCofb:
         Returns: L ← 2 · L
         """
 
-        # convert delta to bits and define new delta list
-        delta_bits = convert_to_bits(delta)
-        delta_bits_double = [0] * 64
-
-        # apply left shift by 1 bit
-        for i in range(1, 64):
-            delta_bits_double[i - 1] = delta_bits[i]
-        delta_bits_double[63] = 0
-
-        # if a63 = 1 apply constant x^64 + x^4 + x^3 + x + 1
-        if delta_bits[0] != 0:
-            constant = [0] * 59 + [1, 1, 0, 1, 1]
-            delta_bits_double = xor_bits(delta_bits_double, constant)
-
-        # return new delta in hex representation
-        return convert_from_bits(delta_bits_double, 64)
+        return delta_to_nibbles(double_delta(nibbles_to_delta(delta)))
 
     def triple(self, delta):
         """
@@ -302,9 +501,7 @@ class GiftCofb:
         Returns: L ← 3 · L
         """
 
-        triple = self.double(delta[:])
-
-        return xor_bits(triple, delta)
+        return delta_to_nibbles(triple_delta(nibbles_to_delta(delta)))
 
     def G(self, Y):
         """
@@ -313,25 +510,258 @@ class GiftCofb:
         Returns: the result of G(Y).
         """
 
-        # first define Y1 and Y2 as each half of Y respectively
-        length = len(Y)
-        Y1 = Y[0:length // 2]
-        Y2 = Y[length // 2:]
+        return int_to_block(self.G_int(block_to_int(Y)), 32)
+
+    def G_int(self, Y):
+        """
+        Method to apply G to an int - the low half moves to the top and the
+        top half is rotated left by 1 into the low half.
+        Parameters: Y (as a 128-bit int)
+        Returns: the result of G(Y).
+        """
+
+        Y1 = Y >> 64
+
+        return (Y & delta_mask) << 64 | (Y1 << 1 & delta_mask) | Y1 >> 63
+
+
+class GiftCofbStream:
+    """
+    Class to run GIFT-COFB incrementally over data given as bytes. The
+    associated data is given with update_ad, then the message with
+    update_encrypt (or update_decrypt), and finalize gives the tag (or
+    finalize_verify checks one). Between calls only the state Y, the mask L
+    and an incomplete (or possibly last) block are held, so memory use does
+    not depend on the message length. Gives the same ciphertext and tag as
+    GiftCofb.encrypt for the same (byte aligned) inputs.
+    """
+
+    def __init__(self, key, nonce, cofb=None):
+        # GIFT-COFB object providing the ρ, G, doubling and tripling
+        # functions and the GIFT-128 block cipher
+        self.cofb = GiftCofb() if cofb is None else cofb
+
+        # round keys of the key, expanded once
+        self.round_keys = self.cofb.cipher.expand_key(bytes(key)).round_keys
+
+        # the nonce is encrypted with GIFT-128 and set as the state, and the
+        # truncated state (y[0]) is set to delta - both held as ints
+        self.state = self.cofb.cipher.encrypt_int(
+            int.from_bytes(bytes(nonce), "big"), self.round_keys)
+        self.delta = self.state >> 64
+
+        # stage of processing ("ad", "message" or "done"), whether the
+        # associated data has been finished, the direction of the message
+        # (1 encrypt, 2 decrypt) and whether any message block has been seen
+        self.stage = "ad"
+        self.ad_finished = False
+        self.operation = 0
+        self.message_started = False
+
+        # the data not yet processed - at most one block, since the last
+        # block of the associated data or message is handled differently
+        self.buffer = b""
+
+    def encrypt_state(self):
+        """
+        Method to XOR the padded delta into the state and encrypt it.
+        Parameters: none.
+        Returns: none.
+        """
+
+        self.state = self.cofb.cipher.encrypt_int(
+            self.state ^ self.delta << 64, self.round_keys)
+
+    def whole_blocks(self, data):
+        """
+        Generator to split the buffered data and the new data into the
+        blocks known not to be the last. The new data is walked through a
+        memoryview rather than appended to the buffer, so each byte is
+        copied once, and only the final (at most one block) tail is kept in
+        the buffer.
+        Parameters: the new data (bytes, bytearray or memoryview).
+        Returns: yields each block as an int.
+        """
+
+        view = memoryview(data).cast("B")
+
+        # top up the buffered block - it is only processed once more data
+        # shows it is not the last
+        fill = min(16 - len(self.buffer), len(view))
+        self.buffer += bytes(view[0:fill])
+        view = view[fill:]
+        if not len(view):
+            return
 
-        # apply left rotation by 1 to Y1
-    
-        Y1_bits = convert_to_bits(Y1)
-        
-        Y1_bits_shifted = [0] * 64
+        yield int.from_bytes(self.buffer, "big")
 
-        # shift the bits by 1 to the left
-        for i in range(1, 64):
-            Y1_bits_shifted[i - 1] = Y1_bits[i]
+        # whole blocks of the new data, leaving its last (possibly full)
+        # block in the buffer
+        end = 16 * ((len(view) - 1) // 16)
+        self.buffer = bytes(view[end:])
+        for start in range(0, end, 16):
+            yield int.from_bytes(view[start:start + 16], "big")
+
+    def update_ad(self, data):
+        """
+        Method to add the next part of the associated data.
+        Parameters: the data (bytes, bytearray or memoryview).
+        Returns: none.
+        """
+
+        if self.stage != "ad":
+            raise ValueError("associated data must come before the message")
+
+        # process every block that is known not to be the last
+        for block in self.whole_blocks(data):
+            # L ← 2 · L, apply ρ1(Y, M) = G· Y ⊕ M and encrypt the state
+            self.delta = double_delta(self.delta)
+            self.state = self.cofb.pho1_int(self.state, block)
+            self.encrypt_state()
+
+    def finish_ad(self, empty_message):
+        """
+        Method to process the last associated data block.
+        Parameters: whether the message is empty.
+        Returns: none.
+        """
+
+        # L ← 3 · L, and again if the last block is not full
+        self.delta = triple_delta(self.delta)
+        if len(self.buffer) != 16:
+            self.delta = triple_delta(self.delta)
+
+        # L ← 3^2 · L if the message is empty
+        if empty_message:
+            self.delta = triple_delta(triple_delta(self.delta))
+
+        # pad the last block, apply ρ1(Y, M) = G· Y ⊕ M and encrypt the state
+        block = pad_block_int(bytes_to_block_int(self.buffer),
+                              2 * len(self.buffer))
+        self.state = self.cofb.pho1_int(self.state, block)
+        self.encrypt_state()
+
+        self.buffer = b""
+        self.ad_finished = True
+
+    def update(self, data, operation):
+        """
+        Method to add the next part of the message, in either direction.
+        Parameters: the data (bytes, bytearray or memoryview) and the
+        operation, 1 for encryption, 2 for decryption.
+        Returns: the output for the blocks processed, as bytes.
+        """
+
+        if self.stage == "done":
+            raise ValueError("stream has already been finalized")
+        if self.operation not in (0, operation):
+            raise ValueError("cannot mix encryption and decryption")
+
+        self.stage = "message"
+        self.operation = operation
+        data = memoryview(data).cast("B")
+        if not len(data):
+            return b""
+
+        # the message is not empty, so the associated data can be finished
+        if not self.ad_finished:
+            self.finish_ad(False)
+        self.message_started = True
+
+        output = bytearray()
+
+        # process every block that is known not to be the last
+        for block in self.whole_blocks(data):
+            # L ← 2 · L and apply ρ (or ρ' when decrypting)
+            self.delta = double_delta(self.delta)
+            if operation == 1:
+                self.state, result = self.cofb.pho_int(self.state, block)
+            else:
+                self.state, result = self.cofb.phoprime_int(self.state,
+                                                            block)
+            output += result.to_bytes(16, "big")
+
+            # xor state with padded delta and encrypt state
+            self.encrypt_state()
+
+        return bytes(output)
+
+    def update_encrypt(self, data):
+        """
+        Method to encrypt the next part of the message.
+        Parameters: the plaintext (bytes, bytearray or memoryview).
+        Returns: the ciphertext for the blocks processed, as bytes.
+        """
+
+        return self.update(data, 1)
+
+    def update_decrypt(self, data):
+        """
+        Method to decrypt the next part of the ciphertext. The plaintext
+        must not be trusted until finalize_verify has verified the tag.
+        Parameters: the ciphertext (bytes, bytearray or memoryview).
+        Returns: the plaintext for the blocks processed, as bytes.
+        """
+
+        return self.update(data, 2)
+
+    def finalize(self):
+        """
+        Method to process the last block and generate the tag.
+        Parameters: none.
+        Returns: the output for the last block and the tag, as bytes.
+        """
+
+        if self.stage == "done":
+            raise ValueError("stream has already been finalized")
+
+        output = b""
+
+        # with no message the associated data is still waiting
+        if not self.ad_finished:
+            self.finish_ad(not self.message_started)
+
+        if self.message_started:
+            length = len(self.buffer)
+            block = bytes_to_block_int(self.buffer)
+
+            # L ← 3 · L, and again if the last block is not full
+            self.delta = triple_delta(self.delta)
+            if length != 16:
+                self.delta = triple_delta(self.delta)
+
+            # apply ρ to the padded block - when decrypting, the plaintext
+            # is recovered first and then padded
+            if self.operation == 1:
+                self.state, result = self.cofb.pho_int(
+                    self.state, pad_block_int(block, 2 * length))
+            else:
+                result = truncate_block_int(block ^ self.state, 2 * length)
+                self.state = self.cofb.pho1_int(
+                    self.state, pad_block_int(result, 2 * length))
+            output = result.to_bytes(16, "big")[0:length]
+
+            # xor state with padded delta and encrypt state
+            self.encrypt_state()
+
+        self.stage = "done"
+        self.buffer = b""
+
+        # tag becomes the current value of state
+        return output, self.state.to_bytes(16, "big")
+
+    def finalize_verify(self, tag):
+        """
+        Method to process the last block and verify the tag against the one
+        generated, comparing in constant time.
+        Parameters: the tag (bytes or a hex string).
+        Returns: the output for the last block, and True if the tag matches,
+        False if not.
+        """
 
-        Y1_bits_shifted[63] = Y1_bits[0]
+        if isinstance(tag, str):
+            tag = bytes.fromhex(tag)
 
-        # convert Y1 back to hex
-        Y1 = convert_from_bits(Y1_bits_shifted, 64)
+        output, generated = self.finalize()
 
-        # return the concatenation of Y2 + Y1
-        return Y2 + Y1
+        return output, compare_digest(generated, bytes(tag))
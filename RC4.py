@@ -2,7 +2,12 @@
 Module to implement the RC4 pseudo-random number generation algorithm
 """
 
-from utils import decimal_to_hex, hex_to_decimal
+from functools import lru_cache
+from itertools import chain, cycle
+from utils import hex_to_decimal, key_cache_size, split_nibbles
+
+# number of keystream bytes generated at a time by readinto and stream
+default_chunk_size = 1 << 16
 
 
 def initialisation(key):
@@ -28,31 +33,127 @@ def initialisation(key):
     return s
 
 
-def algorithm(key, num_of_bytes):
+@lru_cache(maxsize=key_cache_size)
+def initialised_state(key):
     """
-    Function to run the RC4 algorithm to produce a random list of bytes.
-    Parameters: key and number of bytes to generate.
-    Returns: list of bytes.
+    Function to run the RC4 key scheduling for a key - results are kept in
+    an LRU cache keyed on the key bytes, so repeated keys skip it.
+    Parameters: the key as bytes.
+    Returns: the initialised s list as bytes.
     """
 
-    stream = []
+    return bytes(initialisation(key))
 
-    # initialise s list using the initialisation function
-    s = initialisation(key)
 
-    i = 0
-    j = 0
+class RC4Generator:
+    """
+    Class to generate an RC4 keystream in pieces - the state (s, i and j)
+    is kept between calls, so the keystream carries on from where the last
+    call stopped. Output goes straight into bytearrays (or any writable
+    buffer with readinto), a chunk at a time, so long keystreams never
+    exist as lists of ints.
+    """
 
-    # run the algorithm, each iteration add character to stream list
-    # repeat for the number of bytes specified
-    for k in range(0, num_of_bytes):
-        i = (i+1) % 256
-        j = (j+s[i]) % 256
-        s[i], s[j] = s[j], s[i]
-        t = s[(s[i] + s[j]) % 256]
-        stream.append(t)
+    def __init__(self, key):
+        # initialised s list for the key (from the cache when the key has
+        # been seen), copied so it can be updated
+        self.s = list(initialised_state(bytes(key)))
+
+        # the two indices of the algorithm
+        self.i = 0
+        self.j = 0
+
+    def generate_into(self, view):
+        """
+        Method to write the next bytes of the keystream straight into a
+        buffer, with no intermediate bytearray.
+        Parameters: the writable memoryview (of unsigned bytes) to fill.
+        Returns: none.
+        """
+
+        s = self.s
+        i = self.i
+        j = self.j
+
+        # i steps through i + 1, ... 255, 0, 1, ... - taken from a cycle of
+        # the indices rather than incremented on every byte, and j and the
+        # output index are reduced with a mask rather than modulo 256
+        indices = chain(range((i + 1) & 0xff, 256), cycle(range(0, 256)))
+        for k, i in zip(range(0, len(view)), indices):
+            t = s[i]
+            j = (j + t) & 0xff
+            u = s[j]
+            s[i] = u
+            s[j] = t
+            view[k] = s[(t + u) & 0xff]
+
+        self.i = i
+        self.j = j
+
+    def generate(self, num_of_bytes):
+        """
+        Method to generate the next bytes of the keystream.
+        Parameters: the number of bytes to generate.
+        Returns: the bytes as a bytearray.
+        """
+
+        stream = bytearray(num_of_bytes)
+        self.generate_into(memoryview(stream))
+
+        return stream
+
+    def readinto(self, buffer, chunk_size=default_chunk_size):
+        """
+        Method to fill a buffer with the next bytes of the keystream, a
+        chunk at a time, each chunk written in place.
+        Parameters: the writable buffer (e.g. a bytearray or memoryview) and
+        the number of bytes generated at a time.
+        Returns: the number of bytes written (the length of the buffer).
+        """
+
+        view = memoryview(buffer).cast("B")
+        for start in range(0, len(view), chunk_size):
+            self.generate_into(view[start:start + chunk_size])
+
+        return len(view)
+
+    def stream(self, num_of_bytes, chunk_size=default_chunk_size):
+        """
+        Generator to produce the next bytes of the keystream in chunks, each
+        generated into one preallocated buffer.
+        Parameters: the total number of bytes and the number of bytes in
+        each chunk.
+        Returns: yields the chunks as bytes (the last may be shorter).
+        """
+
+        view = memoryview(bytearray(min(chunk_size, num_of_bytes)))
+        for start in range(0, num_of_bytes, chunk_size):
+            chunk = view[0:min(chunk_size, num_of_bytes - start)]
+            self.generate_into(chunk)
+            yield bytes(chunk)
+
+
+@lru_cache(maxsize=key_cache_size)
+def rc4_iv(key, num_of_bytes):
+    """
+    Function to generate the IV the tool uses for a key - the first bytes
+    of the RC4 keystream. IVs are kept in an LRU cache, so repeated jobs
+    under the same key do not rerun RC4.
+    Parameters: the key (bytes) and the number of bytes.
+    Returns: the IV as bytes.
+    """
 
-    return stream
+    return bytes(RC4Generator(key).generate(num_of_bytes))
+
+
+def algorithm(key, num_of_bytes):
+    """
+    Function to run the RC4 algorithm to produce a random list of bytes.
+    Parameters: key and number of bytes to generate.
+    Returns: list of bytes.
+    """
+
+    return list(RC4Generator(key).generate(num_of_bytes))
 
 
 def run_RC4(key, num_of_bytes):
@@ -64,9 +165,7 @@ def run_RC4(key, num_of_bytes):
 
     # first convert the key from hex to byte format
     key = hex_to_decimal(key)
-    result = algorithm(key, num_of_bytes)
-
-    # return result as a list of hex converted from bytes
-    result = decimal_to_hex(result)
+    result = RC4Generator(key).generate(num_of_bytes)
 
-    return result
+    # return result as a list of hex, splitting each byte into its nibbles
+    return list(split_nibbles(result))
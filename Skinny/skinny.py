@@ -1,16 +1,32 @@
 """
 Module to implement the SKINNY block cipher and all six of its versions
 """
+from functools import lru_cache
 from utils import *
+from Skinny.skinny_packed import Skinny128Words, Skinny64Packed
 
 
 class Skinny:
-    def __init__(self, version):
+    def __init__(self, version, words=False):
         # version contains [State size, key size, number of rounds]
         self.version = version
         # z is t/n (tweakey size / state size) - is either 1, 2 or 3
         self.z = self.version[1] // self.version[0]
-        self.keys = []
+
+        # schedule the expanded keys are tagged with (see ExpandedKey)
+        self.key_schedule = ("nibbles", "SKINNY") + tuple(version)
+
+        # word oriented engine, which holds the state as packed ints (same
+        # output, but faster) - always used for blocks given as bytes
+        if self.version[0] == 128:
+            self.packed = Skinny128Words(version)
+        else:
+            self.packed = Skinny64Packed(version)
+
+        # set words to True to run nibble list blocks on it too
+        self.engine = None
+        if words:
+            self.engine = self.packed
 
         # SKINNY-64-X s-box
         self.s_box_64 = [12, 6, 9, 0, 1, 10, 2, 11, 3, 8, 5, 13, 4, 14, 7, 15]
@@ -113,6 +129,8 @@ class Skinny:
         """
 
         self.steps = True
+        # the word oriented engine has no intermediate steps to print
+        self.engine = None
 
     def encrypt_block(self, plaintext, key):
         """
@@ -121,10 +139,14 @@ class Skinny:
         Returns: the encrypted ciphertext
         """
 
-        # initialise the plaintext and key into the cipher state (IS)
-        # and key state
+        # hand the block to the word oriented engine if selected
+        if self.engine is not None:
+            return self.engine.encrypt_block(plaintext, key)
+
+        # initialise the plaintext into the cipher state (IS) and get the
+        # (cached) round tweakeys for the key
         IS = self.initialise_state(plaintext)
-        key = self.initialise_key(key)
+        round_tweakeys = self.expand_key(key).round_keys
 
         for i in range(0, self.version[2]):
 
@@ -137,7 +159,7 @@ class Skinny:
             if self.steps:
                 print("State After Add Constant: " + str(IS))
 
-            IS = self.add_round_tweakey(IS, key)
+            IS = self.apply_round_tweakey(IS, round_tweakeys[i])
             if self.steps:
                 print("State After Add TK: " + str(IS))
 
@@ -148,10 +170,6 @@ class Skinny:
             IS = self.mix_columns(IS)
             if self.steps:
                 print("State After Mix Columns: ", str(IS))
-
-            key = self.update_tweakey_arrays(key)
-            if self.steps:
-                print("Updated TK: ", str(key))
                 print()
 
         IS = sum(IS, [])
@@ -167,13 +185,15 @@ class Skinny:
         Returns: the decrypted plaintext
         """
 
-        # initialise the ciphertext and key into the cipher state (IS)
-        # and key state
-        IS = self.initialise_state(plaintext)
-        TW = self.initialise_key(TK)
+        # hand the block to the word oriented engine if selected
+        if self.engine is not None:
+            return self.engine.decrypt_block(plaintext, TK)
 
-        # as decrypting need to generate the set of round keys
-        self.keys = self.generate_round_keys(TW)
+        # initialise the ciphertext into the cipher state (IS) - as
+        # decrypting we need the full set of round tweakeys, which are
+        # taken from the (cached) key schedule
+        IS = self.initialise_state(plaintext)
+        round_tweakeys = self.expand_key(TK).round_keys
 
         for i in range(self.version[2] - 1, -1, -1):
             IS = self.mix_columns_inv(IS)
@@ -185,7 +205,7 @@ class Skinny:
             if self.steps:
                 print("State After Inv Shift Rows: " + str(IS))
 
-            IS = self.add_round_tweakey(IS, self.keys[i])
+            IS = self.apply_round_tweakey(IS, round_tweakeys[i])
             if self.steps:
                 print("State After Add TK: " + str(IS))
 
@@ -204,6 +224,85 @@ class Skinny:
 
         return IS
 
+    def expand_key(self, key):
+        """
+        Method to expand a key into an ExpandedKey holding the round tweakey
+        for every round, with TK1, TK2 and TK3 already XORed together. The
+        expansion is cached by version and key bytes, so repeated calls with
+        the same key reuse it. Keys already expanded for this schedule are
+        returned as they are, and keys expanded for another are expanded again
+        (see reuse_expanded_key).
+        Parameters: the key (list of nibbles) or an ExpandedKey.
+        Returns: the ExpandedKey.
+        """
+
+        # the word oriented engine keeps its own tweakey schedule
+        if self.engine is not None:
+            return self.engine.expand_key(key)
+
+        key = reuse_expanded_key(key, self.key_schedule)
+        if isinstance(key, ExpandedKey):
+            return key
+
+        return expand_skinny_key(tuple(self.version), bytes(key))
+
+    def encrypt_block_bytes(self, block, key):
+        """
+        Method to encrypt one block given as bytes. Runs on the word
+        oriented engine, so no nibble lists are built - see
+        Skinny128Words.encrypt_block_bytes and
+        Skinny64Packed.encrypt_block_bytes for the block and key layout.
+        Parameters: the plaintext block (bytes or memoryview) and key (bytes
+        or an ExpandedKey from expand_key_bytes).
+        Returns: the ciphertext as bytes.
+        """
+
+        return self.packed.encrypt_block_bytes(block, key)
+
+    def decrypt_block_bytes(self, block, key):
+        """
+        Method to decrypt one block given as bytes. Runs on the word
+        oriented engine, so no nibble lists are built.
+        Parameters: the ciphertext block (bytes or memoryview) and key
+        (bytes or an ExpandedKey from expand_key_bytes).
+        Returns: the plaintext as bytes.
+        """
+
+        return self.packed.decrypt_block_bytes(block, key)
+
+    def expand_key_bytes(self, key):
+        """
+        Method to expand a key given as bytes for use with
+        encrypt_block_bytes / decrypt_block_bytes.
+        Parameters: the key (bytes) or an ExpandedKey.
+        Returns: the ExpandedKey.
+        """
+
+        return self.packed.expand_key_bytes(key)
+
+    def calculate_round_tweakeys(self, key):
+        """
+        Method to determine the round tweakey of every round. Only the first
+        two rows of the tweakey arrays are added to the cipher state, so each
+        round tweakey is the 2x4 XOR of those rows of TK1, TK2 and TK3.
+        Parameters: the key (list of nibbles).
+        Returns: list of 2x4 round tweakeys, indexed by round number.
+        """
+
+        TW = self.initialise_key(key)
+        round_tweakeys = []
+
+        for i in range(0, self.version[2]):
+            # fold the first two rows of the tweakey arrays together
+            round_tweakey = self.add_round_tweakey([[0, 0, 0, 0],
+                                                    [0, 0, 0, 0]], TW)
+            round_tweakeys.append(round_tweakey)
+
+            # get the tweakey arrays for the next round
+            TW = self.update_tweakey_arrays(TW)
+
+        return round_tweakeys
+
     def initialise_key(self, key):
         """
         Method to initialise the key state. The key is stored in z 4x4 arrays,
@@ -326,24 +425,6 @@ class Skinny:
 
         return new_key
 
-    def generate_round_keys(self, key):
-        """
-        Method to generate a list of round keys. This is needed for decryption
-        as the last round is run first, as opposed to encryption where rounds
-        are run sequentially, and thus so too are the round keys.
-        Parameters: the key state.
-        Returns: a set of round keys.
-        """
-
-        # first round key is the original key (for use in round 0)
-        round_keys = [key]
-        for i in range(0, 56):
-            # get the next updated round key and append to the round_keys list
-            key = self.update_tweakey_arrays(key)
-            round_keys.append(key)
-
-        return round_keys
-
     def sub_cells(self, IS):
         """
         Method to apply an S-box to the current cipher state. A 4-bit s-box
@@ -434,6 +515,20 @@ class Skinny:
 
         return state
 
+    def apply_round_tweakey(self, state, round_tweakey):
+        """
+        Method to apply a precomputed round tweakey (see
+        calculate_round_tweakeys) to the first two rows of the cipher state.
+        Parameters: the cipher state and the 2x4 round tweakey.
+        Returns: the updated cipher state with the round tweakey added.
+        """
+
+        for i in range(0, 2):
+            for j in range(0, 4):
+                state[i][j] ^= round_tweakey[i][j]
+
+        return state
+
     def shift_rows(self, state):
         """
         Method to shift the rows of the cipher state.
@@ -537,6 +632,23 @@ class Skinny:
         return state
 
 
+@lru_cache(maxsize=key_cache_size)
+def expand_skinny_key(version, key):
+    """
+    Function to run the SKINNY tweakey schedule for a key - results are kept
+    in an LRU cache keyed on the version and key bytes.
+    Parameters: the version (tuple) and the key as bytes (one nibble per
+    byte).
+    Returns: ExpandedKey holding the round tweakeys.
+    """
+
+    key = list(key)
+    skinny = Skinny(list(version))
+
+    return ExpandedKey(key, skinny.calculate_round_tweakeys(key),
+                       skinny.key_schedule)
+
+
 def LFSR(state, TK, s):
     """
     Function to apply the SKINNY LFSR.
@@ -0,0 +1,702 @@
+"""
+Module to implement word oriented versions of the SKINNY block cipher. For
+SKINNY-128 each row of the cipher state is held as one Python int, so
+ShiftRows is a rotate, MixColumns is three row XORs and a row rotation, and
+SubCells is done with byte indexed lookup tables. For SKINNY-64 the whole
+state and each tweakey array are packed into a single 64-bit int
+"""
+from functools import lru_cache
+from utils import ExpandedKey, reuse_expanded_key, key_cache_size, \
+    nibbles_to_int, int_to_nibbles, bytes_to_nibble_int, nibble_int_to_bytes, \
+    split_nibbles
+
+
+# SKINNY-64-X s-box
+s_box_64 = [12, 6, 9, 0, 1, 10, 2, 11, 3, 8, 5, 13, 4, 14, 7, 15]
+
+
+# SKINNY-128-X s-box
+s_box_128 = [0x65, 0x4c, 0x6a, 0x42, 0x4b, 0x63, 0x43, 0x6b, 0x55, 0x75, 0x5a,
+             0x7a, 0x53, 0x73, 0x5b, 0x7b, 0x35, 0x8c, 0x3a, 0x81, 0x89, 0x33,
+             0x80, 0x3b, 0x95, 0x25, 0x98, 0x2a, 0x90, 0x23, 0x99, 0x2b, 0xe5,
+             0xcc, 0xe8, 0xc1, 0xc9, 0xe0, 0xc0, 0xe9, 0xd5, 0xf5, 0xd8, 0xf8,
+             0xd0, 0xf0, 0xd9, 0xf9, 0xa5, 0x1c, 0xa8, 0x12, 0x1b, 0xa0, 0x13,
+             0xa9, 0x05, 0xb5, 0x0a, 0xb8, 0x03, 0xb0, 0x0b, 0xb9, 0x32, 0x88,
+             0x3c, 0x85, 0x8d, 0x34, 0x84, 0x3d, 0x91, 0x22, 0x9c, 0x2c, 0x94,
+             0x24, 0x9d, 0x2d, 0x62, 0x4a, 0x6c, 0x45, 0x4d, 0x64, 0x44, 0x6d,
+             0x52, 0x72, 0x5c, 0x7c, 0x54, 0x74, 0x5d, 0x7d, 0xa1, 0x1a, 0xac,
+             0x15, 0x1d, 0xa4, 0x14, 0xad, 0x02, 0xb1, 0x0c, 0xbc, 0x04, 0xb4,
+             0x0d, 0xbd, 0xe1, 0xc8, 0xec, 0xc5, 0xcd, 0xe4, 0xc4, 0xed, 0xd1,
+             0xf1, 0xdc, 0xfc, 0xd4, 0xf4, 0xdd, 0xfd, 0x36, 0x8e, 0x38, 0x82,
+             0x8b, 0x30, 0x83, 0x39, 0x96, 0x26, 0x9a, 0x28, 0x93, 0x20, 0x9b,
+             0x29, 0x66, 0x4e, 0x68, 0x41, 0x49, 0x60, 0x40, 0x69, 0x56, 0x76,
+             0x58, 0x78, 0x50, 0x70, 0x59, 0x79, 0xa6, 0x1e, 0xaa, 0x11, 0x19,
+             0xa3, 0x10, 0xab, 0x06, 0xb6, 0x08, 0xba, 0x00, 0xb3, 0x09, 0xbb,
+             0xe6, 0xce, 0xea, 0xc2, 0xcb, 0xe3, 0xc3, 0xeb, 0xd6, 0xf6, 0xda,
+             0xfa, 0xd3, 0xf3, 0xdb, 0xfb, 0x31, 0x8a, 0x3e, 0x86, 0x8f, 0x37,
+             0x87, 0x3f, 0x92, 0x21, 0x9e, 0x2e, 0x97, 0x27, 0x9f, 0x2f, 0x61,
+             0x48, 0x6e, 0x46, 0x4f, 0x67, 0x47, 0x6f, 0x51, 0x71, 0x5e, 0x7e,
+             0x57, 0x77, 0x5f, 0x7f, 0xa2, 0x18, 0xae, 0x16, 0x1f, 0xa7, 0x17,
+             0xaf, 0x01, 0xb2, 0x0e, 0xbe, 0x07, 0xb7, 0x0f, 0xbf, 0xe2, 0xca,
+             0xee, 0xc6, 0xcf, 0xe7, 0xc7, 0xef, 0xd2, 0xf2, 0xde, 0xfe, 0xd7,
+             0xf7, 0xdf, 0xff]
+
+# round constants for SKINNY
+constants = [0x01, 0x03, 0x07, 0x0F, 0x1F, 0x3E, 0x3D, 0x3B, 0x37, 0x2F, 0x1E,
+             0x3C, 0x39, 0x33, 0x27, 0x0E, 0x1D, 0x3A, 0x35, 0x2B, 0x16, 0x2C,
+             0x18, 0x30, 0x21, 0x02, 0x05, 0x0B, 0x17, 0x2E, 0x1C, 0x38, 0x31,
+             0x23, 0x06, 0x0D, 0x1B, 0x36, 0x2D, 0x1A, 0x34, 0x29, 0x12, 0x24,
+             0x08, 0x11, 0x22, 0x04, 0x09, 0x13, 0x26, 0x0c, 0x19, 0x32, 0x25,
+             0x0a, 0x15, 0x2a, 0x14, 0x28, 0x10, 0x20]
+
+# tweakey permutation Pt
+tweakey_permutation = [9, 15, 8, 13, 10, 14, 12, 11, 0, 1, 2, 3, 4, 5, 6, 7]
+
+
+def build_inverse(box):
+    """
+    Function to build the inverse of an s-box.
+    Parameters: the s-box.
+    Returns: the inverse s-box.
+    """
+
+    inverse = [0] * len(box)
+    for i in range(0, len(box)):
+        inverse[box[i]] = i
+
+    return inverse
+
+
+def build_s_box_table_64(box):
+    """
+    Function to build a 16-bit indexed s-box table, i.e. the 4-bit s-box
+    applied to all four cells of a packed row in one lookup.
+    Parameters: the 4-bit s-box.
+    Returns: the 65536 entry lookup table.
+    """
+
+    byte_table = [box[i & 0xf] | box[i >> 4] << 4 for i in range(256)]
+
+    return [byte_table[i & 0xff] | byte_table[i >> 8] << 8
+            for i in range(65536)]
+
+
+def build_nibble_shuffle_tables(permutation):
+    """
+    Function to build byte-wise nibble shuffle tables for a permutation of
+    the 16 cells of a packed 64-bit array. Entry [b][v] holds the two cells
+    of byte value v, sitting at byte position b, moved to their new cells.
+    Parameters: the cell permutation (new cell i takes old cell
+    permutation[i]).
+    Returns: list of 8 tables of 256 entries.
+    """
+
+    # find the new position of every old cell
+    position = [0] * 16
+    for i in range(0, 16):
+        position[permutation[i]] = i
+
+    return [[(v & 0xf) << (4 * position[2 * b])
+             | (v >> 4) << (4 * position[2 * b + 1]) for v in range(256)]
+            for b in range(0, 8)]
+
+
+def build_row_tables(box):
+    """
+    Function to build byte indexed s-box tables for a 32-bit row word. Entry
+    [j][v] holds box[v] already shifted to byte j of the row, so SubCells on
+    a row is the OR of four lookups.
+    Parameters: the 8-bit s-box.
+    Returns: list of 4 tables of 256 entries.
+    """
+
+    return [[box[v] << (8 * j) for v in range(256)] for j in range(0, 4)]
+
+
+# SKINNY-128-X inverse s-box and the row tables for SubCells
+s_box_128_inv = build_inverse(s_box_128)
+row_tables_128 = build_row_tables(s_box_128)
+row_tables_128_inv = build_row_tables(s_box_128_inv)
+
+# 8-bit LFSRs applied to TK2 and TK3 cells
+lfsr_tk2_128 = [(x << 1 & 0xfe) | ((x >> 7 ^ x >> 5) & 0x1)
+                for x in range(256)]
+lfsr_tk3_128 = [x >> 1 | ((x ^ x >> 6) & 0x1) << 7 for x in range(256)]
+
+# SKINNY-64-X s-box tables and the tweakey permutation shuffle tables
+s_box_64_table = build_s_box_table_64(s_box_64)
+s_box_64_inv_table = build_s_box_table_64(build_inverse(s_box_64))
+tweakey_shuffle_tables = build_nibble_shuffle_tables(tweakey_permutation)
+
+
+class Skinny128Words:
+    def __init__(self, version):
+        # version contains [State size, key size, number of rounds]
+        self.version = version
+        # z is t/n (tweakey size / state size) - is either 1, 2 or 3
+        self.z = self.version[1] // self.version[0]
+
+        # schedule the expanded keys are tagged with (see ExpandedKey)
+        self.key_schedule = ("nibbles", "SKINNY-128 words") + tuple(version)
+
+    def encrypt_block(self, plaintext, key):
+        """
+        Method to encrypt one plaintext block with SKINNY-128. Takes and
+        returns the same nibble lists as Skinny.encrypt_block.
+        Parameters: the plaintext block to encrypt and key.
+        Returns: the encrypted ciphertext.
+        """
+
+        rows = self.encrypt_rows(self.initialise_rows(plaintext),
+                                 self.expand_key(key).round_keys)
+
+        return self.rows_to_nibbles(rows)
+
+    def decrypt_block(self, ciphertext, key):
+        """
+        Method to decrypt one ciphertext block with SKINNY-128. Takes and
+        returns the same nibble lists as Skinny.decrypt_block.
+        Parameters: the ciphertext block to decrypt and key.
+        Returns: the decrypted plaintext.
+        """
+
+        rows = self.decrypt_rows(self.initialise_rows(ciphertext),
+                                 self.expand_key(key).round_keys)
+
+        return self.rows_to_nibbles(rows)
+
+    def encrypt_block_bytes(self, block, key):
+        """
+        Method to encrypt one block given as bytes. Byte i of the 16 byte
+        block is cell i of the state (row i // 4, column i % 4) and the key
+        holds the tweakey arrays TK1, TK2 and TK3 one after another with the
+        same cell order - the hex strings of the nibble lists taken by
+        encrypt_block, read in order.
+        Parameters: the plaintext block (bytes or memoryview) and key (bytes
+        or an ExpandedKey from expand_key_bytes).
+        Returns: the ciphertext as bytes.
+        """
+
+        block = bytes(block)
+        rows = self.encrypt_rows((int.from_bytes(block[0:4], "little"),
+                                  int.from_bytes(block[4:8], "little"),
+                                  int.from_bytes(block[8:12], "little"),
+                                  int.from_bytes(block[12:16], "little")),
+                                 self.expand_key_bytes(key).round_keys)
+
+        return b"".join(row.to_bytes(4, "little") for row in rows)
+
+    def decrypt_block_bytes(self, block, key):
+        """
+        Method to decrypt one block given as bytes (layout as for
+        encrypt_block_bytes).
+        Parameters: the ciphertext block (bytes or memoryview) and key
+        (bytes or an ExpandedKey from expand_key_bytes).
+        Returns: the plaintext as bytes.
+        """
+
+        block = bytes(block)
+        rows = self.decrypt_rows((int.from_bytes(block[0:4], "little"),
+                                  int.from_bytes(block[4:8], "little"),
+                                  int.from_bytes(block[8:12], "little"),
+                                  int.from_bytes(block[12:16], "little")),
+                                 self.expand_key_bytes(key).round_keys)
+
+        return b"".join(row.to_bytes(4, "little") for row in rows)
+
+    def encrypt_rows(self, rows, round_tweakeys):
+        """
+        Method to encrypt a state held as four row words.
+        Parameters: the four 32-bit rows and the round tweakeys.
+        Returns: the encrypted rows.
+        """
+
+        t0, t1, t2, t3 = row_tables_128
+        r0, r1, r2, r3 = rows
+
+        for tk0, tk1 in round_tweakeys:
+            # SubCells - one table lookup per cell
+            r0 = (t0[r0 & 0xff] | t1[r0 >> 8 & 0xff] | t2[r0 >> 16 & 0xff]
+                  | t3[r0 >> 24])
+            r1 = (t0[r1 & 0xff] | t1[r1 >> 8 & 0xff] | t2[r1 >> 16 & 0xff]
+                  | t3[r1 >> 24])
+            r2 = (t0[r2 & 0xff] | t1[r2 >> 8 & 0xff] | t2[r2 >> 16 & 0xff]
+                  | t3[r2 >> 24])
+            r3 = (t0[r3 & 0xff] | t1[r3 >> 8 & 0xff] | t2[r3 >> 16 & 0xff]
+                  | t3[r3 >> 24])
+
+            # AddConstants and AddRoundTweakey - the c0 and c1 constants are
+            # folded into the round tweakey, c2 is always 0x2
+            r0 ^= tk0
+            r1 ^= tk1
+            r2 ^= 0x2
+
+            # ShiftRows - rotate row i right by i cells
+            r1 = (r1 << 8 | r1 >> 24) & 0xffffffff
+            r2 = (r2 << 16 | r2 >> 16) & 0xffffffff
+            r3 = (r3 << 24 | r3 >> 8) & 0xffffffff
+
+            # MixColumns - all four columns at once
+            r1 ^= r2
+            r2 ^= r0
+            r3 ^= r2
+            r0, r1, r2, r3 = r3, r0, r1, r2
+
+        return r0, r1, r2, r3
+
+    def decrypt_rows(self, rows, round_tweakeys):
+        """
+        Method to decrypt a state held as four row words.
+        Parameters: the four 32-bit rows and the round tweakeys.
+        Returns: the decrypted rows.
+        """
+
+        t0, t1, t2, t3 = row_tables_128_inv
+        r0, r1, r2, r3 = rows
+
+        for tk0, tk1 in reversed(round_tweakeys):
+            # inverse MixColumns
+            r0, r1, r2, r3 = r1, r2, r3, r0
+            r3 ^= r2
+            r2 ^= r0
+            r1 ^= r2
+
+            # inverse ShiftRows - rotate row i left by i cells
+            r1 = (r1 >> 8 | r1 << 24) & 0xffffffff
+            r2 = (r2 >> 16 | r2 << 16) & 0xffffffff
+            r3 = (r3 >> 24 | r3 << 8) & 0xffffffff
+
+            # AddRoundTweakey and AddConstants
+            r0 ^= tk0
+            r1 ^= tk1
+            r2 ^= 0x2
+
+            # inverse SubCells
+            r0 = (t0[r0 & 0xff] | t1[r0 >> 8 & 0xff] | t2[r0 >> 16 & 0xff]
+                  | t3[r0 >> 24])
+            r1 = (t0[r1 & 0xff] | t1[r1 >> 8 & 0xff] | t2[r1 >> 16 & 0xff]
+                  | t3[r1 >> 24])
+            r2 = (t0[r2 & 0xff] | t1[r2 >> 8 & 0xff] | t2[r2 >> 16 & 0xff]
+                  | t3[r2 >> 24])
+            r3 = (t0[r3 & 0xff] | t1[r3 >> 8 & 0xff] | t2[r3 >> 16 & 0xff]
+                  | t3[r3 >> 24])
+
+        return r0, r1, r2, r3
+
+    def initialise_rows(self, state):
+        """
+        Method to load a block into four row words - cell j of a row sits in
+        byte j of its word.
+        Parameters: the block as a list of nibbles.
+        Returns: the four 32-bit rows.
+        """
+
+        cells = bytes(state[i] << 4 | state[i + 1]
+                      for i in range(0, 32, 2))
+
+        return (int.from_bytes(cells[0:4], "little"),
+                int.from_bytes(cells[4:8], "little"),
+                int.from_bytes(cells[8:12], "little"),
+                int.from_bytes(cells[12:16], "little"))
+
+    def rows_to_nibbles(self, rows):
+        """
+        Method to convert four row words back into a block of nibbles.
+        Parameters: the four 32-bit rows.
+        Returns: the block as a list of nibbles.
+        """
+
+        nibbles = []
+        for row in rows:
+            for cell in row.to_bytes(4, "little"):
+                nibbles.append(cell >> 4)
+                nibbles.append(cell & 0xf)
+
+        return nibbles
+
+    def expand_key(self, key):
+        """
+        Method to expand a key into an ExpandedKey holding the round tweakey
+        words for every round. The expansion is cached by version and key
+        bytes, so repeated calls with the same key reuse it. Keys already
+        expanded for this schedule are returned as they are, and keys expanded
+        for another are expanded again (see reuse_expanded_key).
+        Parameters: the key (list of nibbles) or an ExpandedKey.
+        Returns: the ExpandedKey.
+        """
+
+        key = reuse_expanded_key(key, self.key_schedule)
+        if isinstance(key, ExpandedKey):
+            return key
+
+        return expand_skinny_128_words_key(tuple(self.version), bytes(key))
+
+    def expand_key_bytes(self, key):
+        """
+        Method to expand a key given as bytes (layout as for
+        encrypt_block_bytes) - shares the tweakey schedule cache with
+        expand_key.
+        An ExpandedKey is checked as for expand_key, so one made by another
+        engine (e.g. Gift64.expand_key) is expanded again for this one.
+        Parameters: the key (bytes) or an ExpandedKey.
+        Returns: the ExpandedKey.
+        """
+
+        if isinstance(key, ExpandedKey):
+            return self.expand_key(key)
+
+        return self.expand_key(split_nibbles(key))
+
+    def calculate_round_tweakeys(self, key, first_array=0):
+        """
+        Method to determine the round tweakey of every round as a pair of row
+        words - TK1, TK2 and TK3 are XORed together and the c0 and c1 round
+        constants are folded in. With first_array 1, TK1 is left out so it
+        can be added afterwards with add_tk1_round_tweakeys (SKINNY-AEAD
+        only changes TK1 from block to block).
+        Parameters: the key (list of nibbles) and the first tweakey array to
+        include.
+        Returns: list of (row 0, row 1) round tweakey words.
+        """
+
+        # run the schedule of each tweakey array on its own, then combine
+        return self.fold_round_tweakeys(
+            [self.array_round_tweakeys(key[32 * i:32 * i + 32], i)
+             for i in range(first_array, self.z)])
+
+    def array_round_tweakeys(self, TK, array):
+        """
+        Method to determine what one tweakey array adds to the round tweakey
+        of every round, without the round constants - the array is permuted
+        each round and, for TK2 and TK3, its first two rows go through the
+        LFSR.
+        Parameters: the tweakey array (list of 32 nibbles) and its number (0
+        for TK1, 1 for TK2, 2 for TK3).
+        Returns: list of (row 0, row 1) words.
+        """
+
+        TK = [TK[i] << 4 | TK[i + 1] for i in range(0, 32, 2)]
+        lfsr = [None, lfsr_tk2_128, lfsr_tk3_128][array]
+
+        rows = []
+        for i in range(0, self.version[2]):
+            # only the first two rows are added to the state
+            rows.append((int.from_bytes(bytes(TK[0:4]), "little"),
+                         int.from_bytes(bytes(TK[4:8]), "little")))
+
+            # update the tweakey array
+            TK = [TK[p] for p in tweakey_permutation]
+            if lfsr is not None:
+                TK[0:8] = [lfsr[c] for c in TK[0:8]]
+
+        return rows
+
+    def fold_round_tweakeys(self, arrays):
+        """
+        Method to XOR the words of several tweakey arrays together and fold
+        in the c0 and c1 round constants.
+        Parameters: list of results of array_round_tweakeys.
+        Returns: list of (row 0, row 1) round tweakey words.
+        """
+
+        round_tweakeys = []
+        for i, words in enumerate(zip(*arrays)):
+            row_0 = constants[i] & 0xf
+            row_1 = constants[i] >> 4
+            for tk0, tk1 in words:
+                row_0 ^= tk0
+                row_1 ^= tk1
+            round_tweakeys.append((row_0, row_1))
+
+        return round_tweakeys
+
+    def add_tk1_round_tweakeys(self, TK1, round_tweakeys):
+        """
+        Method to add the TK1 part of the tweakey schedule to round
+        tweakeys determined without it.
+        Parameters: TK1 (list of 32 nibbles) and the round tweakeys from
+        calculate_round_tweakeys with first_array 1.
+        Returns: list of (row 0, row 1) round tweakey words.
+        """
+
+        return [(row_0 ^ tk0, row_1 ^ tk1) for (row_0, row_1), (tk0, tk1)
+                in zip(round_tweakeys, self.array_round_tweakeys(TK1, 0))]
+
+
+@lru_cache(maxsize=key_cache_size)
+def expand_skinny_128_words_key(version, key):
+    """
+    Function to run the word oriented SKINNY-128 tweakey schedule for a key -
+    results are kept in an LRU cache keyed on the version and key bytes.
+    Parameters: the version (tuple) and the key as bytes (one nibble per
+    byte).
+    Returns: ExpandedKey holding the round tweakey words.
+    """
+
+    key = list(key)
+    skinny = Skinny128Words(list(version))
+
+    return ExpandedKey(key, skinny.calculate_round_tweakeys(key),
+                       skinny.key_schedule)
+
+
+class Skinny64Packed:
+    def __init__(self, version):
+        # version contains [State size, key size, number of rounds]
+        self.version = version
+        # z is t/n (tweakey size / state size) - is either 1, 2 or 3
+        self.z = self.version[1] // self.version[0]
+
+        # schedule the expanded keys are tagged with (see ExpandedKey)
+        self.key_schedule = ("nibbles", "SKINNY-64 packed") + tuple(version)
+
+    def encrypt_block(self, plaintext, key):
+        """
+        Method to encrypt one plaintext block with SKINNY-64. Takes and
+        returns the same nibble lists as Skinny.encrypt_block.
+        Parameters: the plaintext block to encrypt and key.
+        Returns: the encrypted ciphertext.
+        """
+
+        state = self.encrypt_int(nibbles_to_int(plaintext),
+                                 self.expand_key(key).round_keys)
+
+        return int_to_nibbles(state, 16)
+
+    def decrypt_block(self, ciphertext, key):
+        """
+        Method to decrypt one ciphertext block with SKINNY-64. Takes and
+        returns the same nibble lists as Skinny.decrypt_block.
+        Parameters: the ciphertext block to decrypt and key.
+        Returns: the decrypted plaintext.
+        """
+
+        state = self.decrypt_int(nibbles_to_int(ciphertext),
+                                 self.expand_key(key).round_keys)
+
+        return int_to_nibbles(state, 16)
+
+    def encrypt_block_bytes(self, block, key):
+        """
+        Method to encrypt one block given as bytes. Byte i of the 8 byte
+        block holds cells 2i (high nibble) and 2i + 1 (low nibble) and the
+        key holds the tweakey arrays TK1, TK2 and TK3 one after another laid
+        out the same way - the hex strings of the nibble lists taken by
+        encrypt_block, read in order.
+        Parameters: the plaintext block (bytes or memoryview) and key (bytes
+        or an ExpandedKey from expand_key_bytes).
+        Returns: the ciphertext as bytes.
+        """
+
+        state = self.encrypt_int(bytes_to_nibble_int(block),
+                                 self.expand_key_bytes(key).round_keys)
+
+        return nibble_int_to_bytes(state, 8)
+
+    def decrypt_block_bytes(self, block, key):
+        """
+        Method to decrypt one block given as bytes (layout as for
+        encrypt_block_bytes).
+        Parameters: the ciphertext block (bytes or memoryview) and key
+        (bytes or an ExpandedKey from expand_key_bytes).
+        Returns: the plaintext as bytes.
+        """
+
+        state = self.decrypt_int(bytes_to_nibble_int(block),
+                                 self.expand_key_bytes(key).round_keys)
+
+        return nibble_int_to_bytes(state, 8)
+
+    def encrypt_int(self, state, round_tweakeys):
+        """
+        Method to encrypt a packed state - cell i of the state sits in
+        nibble i of the int, so row i is bits 16i to 16i + 15.
+        Parameters: the packed 64-bit state and the packed round tweakeys.
+        Returns: the packed ciphertext.
+        """
+
+        s = s_box_64_table
+
+        for round_tweakey in round_tweakeys:
+            # SubCells - one table lookup per row
+            state = (s[state & 0xffff] | s[state >> 16 & 0xffff] << 16
+                     | s[state >> 32 & 0xffff] << 32 | s[state >> 48] << 48)
+
+            # AddConstants and AddRoundTweakey - the constants are folded
+            # into the round tweakey
+            state ^= round_tweakey
+
+            # ShiftRows - rotate row i right by i cells
+            state = (state & 0xffff
+                     | state << 4 & 0xfff00000 | state >> 12 & 0xf0000
+                     | state << 8 & 0xff0000000000
+                     | state >> 8 & 0xff00000000
+                     | state << 12 & 0xf000000000000000
+                     | state >> 4 & 0xfff000000000000)
+
+            # MixColumns - all four columns at once
+            state ^= state >> 16 & 0xffff0000
+            state ^= state << 32 & 0xffff00000000
+            state ^= state << 16 & 0xffff000000000000
+            state = (state << 16 | state >> 48) & 0xffffffffffffffff
+
+        return state
+
+    def decrypt_int(self, state, round_tweakeys):
+        """
+        Method to decrypt a packed state.
+        Parameters: the packed 64-bit state and the packed round tweakeys.
+        Returns: the packed plaintext.
+        """
+
+        s = s_box_64_inv_table
+
+        for round_tweakey in reversed(round_tweakeys):
+            # inverse MixColumns
+            state = (state >> 16 | state << 48) & 0xffffffffffffffff
+            state ^= state << 16 & 0xffff000000000000
+            state ^= state << 32 & 0xffff00000000
+            state ^= state >> 16 & 0xffff0000
+
+            # inverse ShiftRows - rotate row i left by i cells
+            state = (state & 0xffff
+                     | state >> 4 & 0xfff0000 | state << 12 & 0xf0000000
+                     | state << 8 & 0xff0000000000
+                     | state >> 8 & 0xff00000000
+                     | state << 4 & 0xfff0000000000000
+                     | state >> 12 & 0xf000000000000)
+
+            # AddRoundTweakey and AddConstants
+            state ^= round_tweakey
+
+            # inverse SubCells
+            state = (s[state & 0xffff] | s[state >> 16 & 0xffff] << 16
+                     | s[state >> 32 & 0xffff] << 32 | s[state >> 48] << 48)
+
+        return state
+
+    def permute_tweakey(self, TK):
+        """
+        Method to apply the tweakey permutation Pt to a packed tweakey array,
+        one nibble shuffle table lookup per byte.
+        Parameters: the packed tweakey array.
+        Returns: the permuted tweakey array.
+        """
+
+        t = tweakey_shuffle_tables
+        return (t[0][TK & 0xff] | t[1][TK >> 8 & 0xff]
+                | t[2][TK >> 16 & 0xff] | t[3][TK >> 24 & 0xff]
+                | t[4][TK >> 32 & 0xff] | t[5][TK >> 40 & 0xff]
+                | t[6][TK >> 48 & 0xff] | t[7][TK >> 56])
+
+    def lfsr_tk2(self, TK):
+        """
+        Method to apply the TK2 LFSR to the first two rows of a packed
+        tweakey array - all eight cells at once.
+        (x3||x2||x1||x0) → (x2||x1||x0||x3 ⊕ x2)
+        Parameters: the packed tweakey array.
+        Returns: the tweakey array with the LFSR applied.
+        """
+
+        rows = TK & 0xffffffff
+        rows = rows << 1 & 0xeeeeeeee | (rows >> 3 ^ rows >> 2) & 0x11111111
+
+        return TK & 0xffffffff00000000 | rows
+
+    def lfsr_tk3(self, TK):
+        """
+        Method to apply the TK3 LFSR to the first two rows of a packed
+        tweakey array - all eight cells at once.
+        (x3||x2||x1||x0) → (x0 ⊕ x3||x3||x2||x1)
+        Parameters: the packed tweakey array.
+        Returns: the tweakey array with the LFSR applied.
+        """
+
+        rows = TK & 0xffffffff
+        rows = rows >> 1 & 0x77777777 | (rows ^ rows << 3) & 0x88888888
+
+        return TK & 0xffffffff00000000 | rows
+
+    def expand_key(self, key):
+        """
+        Method to expand a key into an ExpandedKey holding the packed round
+        tweakeys for every round. The expansion is cached by version and key
+        bytes, so repeated calls with the same key reuse it. Keys already
+        expanded for this schedule are returned as they are, and keys expanded
+        for another are expanded again (see reuse_expanded_key).
+        Parameters: the key (list of nibbles) or an ExpandedKey.
+        Returns: the ExpandedKey.
+        """
+
+        key = reuse_expanded_key(key, self.key_schedule)
+        if isinstance(key, ExpandedKey):
+            return key
+
+        return expand_skinny_64_packed_key(tuple(self.version), bytes(key))
+
+    def expand_key_bytes(self, key):
+        """
+        Method to expand a key given as bytes (layout as for
+        encrypt_block_bytes) - shares the tweakey schedule cache with
+        expand_key.
+        An ExpandedKey is checked as for expand_key, so one made by another
+        engine (e.g. Gift64.expand_key) is expanded again for this one.
+        Parameters: the key (bytes) or an ExpandedKey.
+        Returns: the ExpandedKey.
+        """
+
+        if isinstance(key, ExpandedKey):
+            return self.expand_key(key)
+
+        return self.expand_key(split_nibbles(key))
+
+    def calculate_round_tweakeys(self, key):
+        """
+        Method to determine the packed round tweakey of every round - the
+        first two rows of TK1, TK2 and TK3 XORed together, with the round
+        constants folded in.
+        Parameters: the key (list of nibbles).
+        Returns: list of packed round tweakeys, indexed by round number.
+        """
+
+        # split the key into the z packed tweakey arrays
+        TKs = [nibbles_to_int(key[16 * i:16 * i + 16])
+               for i in range(0, self.z)]
+
+        round_tweakeys = []
+        for i in range(0, self.version[2]):
+            # XOR the first two rows of the tweakey arrays together and add
+            # c0, c1 and c2 to cells 0, 4 and 8
+            round_tweakey = 0
+            for TK in TKs:
+                round_tweakey ^= TK & 0xffffffff
+            round_tweakey ^= (constants[i] & 0xf
+                              | (constants[i] >> 4) << 16 | 0x2 << 32)
+            round_tweakeys.append(round_tweakey)
+
+            # update the tweakey arrays - permute every array, then apply the
+            # LFSRs to TK2 and TK3
+            TKs = [self.permute_tweakey(TK) for TK in TKs]
+            if self.z >= 2:
+                TKs[1] = self.lfsr_tk2(TKs[1])
+            if self.z == 3:
+                TKs[2] = self.lfsr_tk3(TKs[2])
+
+        return round_tweakeys
+
+
+@lru_cache(maxsize=key_cache_size)
+def expand_skinny_64_packed_key(version, key):
+    """
+    Function to run the packed SKINNY-64 tweakey schedule for a key -
+    results are kept in an LRU cache keyed on the version and key bytes.
+    Parameters: the version (tuple) and the key as bytes (one nibble per
+    byte).
+    Returns: ExpandedKey holding the packed round tweakeys.
+    """
+
+    key = list(key)
+    skinny = Skinny64Packed(list(version))
+
+    return ExpandedKey(key, skinny.calculate_round_tweakeys(key),
+                       skinny.key_schedule)
@@ -3,7 +3,11 @@ Module to implement the SKINNY-AEAD construct, including versions M1, M2
 M3 and M4
 """
 
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from os import cpu_count
 from utils import *
+from Skinny.skinny_packed import Skinny128Words
 
 domain_separation = {"M1": [[0, 0, 0, 0, 0, 0, 0, 0], [0, 0, 0, 0, 0, 0, 0, 1],
                             [0, 0, 0, 0, 0, 0, 1, 0], [0, 0, 0, 0, 0, 0, 1, 1],
@@ -25,6 +29,187 @@ domain_separation = {"M1": [[0, 0, 0, 0, 0, 0, 0, 0], [0, 0, 0, 0, 0, 0, 0, 1],
                             [0, 0, 0, 1, 1, 1, 0, 0],
                             [0, 0, 0, 1, 1, 1, 0, 1]]}
 
+# the LFSR is held as a 64-bit int (first bit of the LFSR as the most
+# significant bit) - each step is a multiplication by x modulo
+# x^64 + x^4 + x^3 + x + 1
+lfsr_mask = (1 << 64) - 1
+lfsr_feedback = 0x1b
+
+# number of block counters kept in the precomputed LFSR table
+lfsr_table_size = 1024
+
+
+def lfsr_step(lfsr):
+    """
+    Function to update the LFSR by one step.
+    Parameters: the LFSR as an int.
+    Returns: the updated LFSR.
+    """
+
+    return (lfsr << 1 & lfsr_mask) ^ (lfsr_feedback if lfsr >> 63 else 0)
+
+
+def lfsr_multiply(a, b):
+    """
+    Function to multiply two LFSR values as polynomials modulo
+    x^64 + x^4 + x^3 + x + 1.
+    Parameters: the two values as ints.
+    Returns: the product.
+    """
+
+    product = 0
+    while b:
+        if b & 0x1:
+            product ^= a
+        a = lfsr_step(a)
+        b >>= 1
+
+    return product
+
+
+def lfsr_jump(block_num):
+    """
+    Function to determine the LFSR value of a block directly - the initial
+    value 1 stepped block_num times is x^block_num, found by square and
+    multiply.
+    Parameters: the block number.
+    Returns: the LFSR as an int.
+    """
+
+    lfsr = 1
+    power = 2
+    while block_num:
+        if block_num & 0x1:
+            lfsr = lfsr_multiply(lfsr, power)
+        power = lfsr_multiply(power, power)
+        block_num >>= 1
+
+    return lfsr
+
+
+def reverse_lfsr(lfsr):
+    """
+    Function to convert an LFSR value to the byte reversed nibble list used
+    in the tweakey.
+    Parameters: the LFSR as an int.
+    Returns: tuple of 16 nibbles.
+    """
+
+    return tuple(split_nibbles(lfsr.to_bytes(8, "little")))
+
+
+def build_lfsr_table(size):
+    """
+    Function to build the table of byte reversed LFSR values for the first
+    blocks.
+    Parameters: the number of blocks.
+    Returns: list of nibble tuples, indexed by block number.
+    """
+
+    table = []
+    lfsr = 1
+    for i in range(0, size):
+        table.append(reverse_lfsr(lfsr))
+        lfsr = lfsr_step(lfsr)
+
+    return table
+
+
+# byte reversed LFSR values of the first blocks, shared by every SkinnyAead
+# object and member
+lfsr_table = build_lfsr_table(lfsr_table_size)
+
+
+def reversed_lfsr(block_num):
+    """
+    Function to get the byte reversed LFSR value of a block - from the
+    table for the first blocks, otherwise by jumping straight to it.
+    Parameters: the block number.
+    Returns: tuple of 16 nibbles.
+    """
+
+    if block_num < lfsr_table_size:
+        return lfsr_table[block_num]
+
+    return reverse_lfsr(lfsr_jump(block_num))
+
+
+# number of messages encrypt_many and verify_many run at a time, so memory
+# use is bounded by the batch rather than the whole input
+many_batch_size = 4096
+
+# SKINNY-AEAD object held by each worker process of the parallel methods -
+# set once per worker by init_aead_worker, with the tweakey template and
+# the TK3 round tweakeys it was sent with
+worker_aead = None
+
+
+def run_jobs(skinny, jobs):
+    """
+    Function to run independent block cipher calls.
+    Parameters: the SKINNY object and the jobs - a list (or iterable) of
+    (whether to decrypt, block, tweakey) triples.
+    Returns: list of the resulting blocks, in order.
+    """
+
+    return [skinny.decrypt_block(block, TK) if decrypt
+            else skinny.encrypt_block(block, TK)
+            for decrypt, block, TK in jobs]
+
+
+def split_groups(groups, size):
+    """
+    Function to split groups of block jobs into chunks, a group being split
+    across chunks where needed.
+    Parameters: list of (nonce, jobs) groups and the largest number of jobs
+    in a chunk.
+    Returns: list of chunks, each a list of (nonce, jobs) groups.
+    """
+
+    chunks = []
+    chunk = []
+    space = size
+    for nonce, jobs in groups:
+        start = 0
+        while start < len(jobs):
+            # fill the rest of the chunk from the group
+            part = jobs[start:start + space]
+            chunk.append((nonce, part))
+            start += len(part)
+            space -= len(part)
+
+            # start a new chunk once this one is full
+            if not space:
+                chunks.append(chunk)
+                chunk = []
+                space = size
+
+    if chunk:
+        chunks.append(chunk)
+
+    return chunks
+
+
+def init_aead_worker(aead):
+    """
+    Function to set up a worker process with the SKINNY-AEAD object.
+    Parameters: the SKINNY-AEAD object (with its key set).
+    Returns: none.
+    """
+
+    global worker_aead
+    worker_aead = aead
+
+
+def run_aead_chunk(groups):
+    """
+    Function to run a chunk of block jobs in a worker process.
+    Parameters: the chunk (as for SkinnyAead.run_groups).
+    Returns: list of the resulting blocks, in order.
+    """
+
+    return worker_aead.run_groups(groups)
+
 
 class SkinnyAead:
     def __init__(self, member, skinny):
@@ -40,6 +225,22 @@ class SkinnyAead:
         self.nonce_size = -1
         self.key_size = -1
 
+        # domain separation bytes of the member, as pairs of nibbles
+        self.domain_nibbles = [self.get_domain_separation(d)
+                               for d in range(0, 6)]
+
+        # the (nonce, key) the tweakey template was built for, and the
+        # template - the fixed nonce and key part of the TK, with the
+        # TK2/TK3 part of the round tweakeys when SKINNY runs on the word
+        # oriented engine
+        self.template_inputs = None
+        self.template = None
+
+        # the key the TK3 words were determined for, and what TK3 adds to
+        # the round tweakeys - shared by every nonce under the key
+        self.key_rounds_inputs = None
+        self.key_rounds = None
+
     def encrypt(self, plaintext, key, associated_data, nonce):
         """
         Method to encrypt plaintext message and generate a tag using
@@ -109,32 +310,13 @@ class SkinnyAead:
         Returns: updated LFSR (in hexadecimal).
         """
 
-        # First convert the current lfsr into its bit representation
-        lfsr = convert_to_bits(lfsr)
-
-        # Calculate final four bits of the updated lfsr
-        updatedLFSR = []
-        y0 = lfsr[0]
-        y1 = lfsr[63] ^ lfsr[0]
-        y2 = lfsr[62]
-        y3 = lfsr[61] ^ lfsr[0]
-        y4 = lfsr[60] ^ lfsr[0]
-
-        #  Rest of the bits are shifted by 1
-        for i in range(0, 59):
-            updatedLFSR.append(lfsr[i + 1])
-
-        # Append the final four bits to the updated lfsr
-        updatedLFSR.append(y4)
-        updatedLFSR.append(y3)
-        updatedLFSR.append(y2)
-        updatedLFSR.append(y1)
-        updatedLFSR.append(y0)
-
-        # Convert the updated lfsr back to hex
-        updatedLFSR = convert_from_bits(updatedLFSR, 64)
+        # pack the lfsr into an int, step it and unpack it again
+        value = 0
+        for nibble in lfsr:
+            value = value << 4 | nibble
+        value = lfsr_step(value)
 
-        return updatedLFSR
+        return [value >> (60 - 4 * i) & 0xf for i in range(0, 16)]
 
     def rev64(self, lfsr):
         """
@@ -178,39 +360,86 @@ class SkinnyAead:
         """
         Method to generate the TK for a given block.
         Parameters: d - the domain separation to use, and the
-        LFSR value (in hexadecimal).
+        LFSR value (in hexadecimal) or the block number - the byte reversed
+        LFSR value is then taken from the precomputed table.
         Returns: the TK.
         """
 
-        TK = []
         # Get the domain separation byte (returned as two nibbles)
-        d1, d2 = self.get_domain_separation(d)
+        d1, d2 = self.domain_nibbles[d]
 
         # Reverse the bytes order of the LFSR
-        lfsr = self.rev64(lfsr)
+        if isinstance(lfsr, int):
+            lfsr = reversed_lfsr(lfsr)
+        else:
+            lfsr = self.rev64(lfsr)
 
-        # Add the LFSR to the TK
-        TK += lfsr
+        # the TK is the LFSR, 0*56 bits (14 nibbles), the domain separation,
+        # then the nonce and key from the template
+        TK = list(lfsr) + [0] * 14 + [d1, d2]
+        TK += self.get_template()[0]
 
-        # Add 0*56 bits to the TK (14 nibbles)
-        for i in range(0, 14):
-            TK.append(0)
+        return TK
 
-        # Add the domain separation to the TK
-        TK.append(d1)
-        TK.append(d2)
+    def get_template(self):
+        """
+        Method to get the tweakey template for the current nonce and key,
+        building it if the nonce or key has changed. The template holds the
+        nonce (padded with 0*32 bits for M2 and M4) and key part of the TK,
+        and - when SKINNY runs on the word oriented engine - the TK2/TK3
+        part of the round tweakeys for every round, as these only depend on
+        the nonce and key.
+        Parameters: none.
+        Returns: the TK tail (tuple of nibbles) and the TK2/TK3 round
+        tweakeys (None if not precomputed).
+        """
 
-        # Finally, add the nonce and key to the TK
-        TK += self.nonce
+        inputs = (tuple(self.nonce), tuple(self.key))
+        if inputs != self.template_inputs:
+            tail = list(self.nonce)
+            if self.member == "M2" or self.member == "M4":
+                # Add 0*32 bits to the TK (8 nibbles)
+                tail += [0] * 8
+            tail += self.key
+
+            # run the TK2/TK3 part of the tweakey schedule once
+            engine = getattr(self.skinny, "engine", None)
+            round_tweakeys = None
+            if isinstance(engine, Skinny128Words) and len(tail) == 64:
+                # TK2 (the nonce) is run for every nonce, TK3 (the key)
+                # only when the key changes
+                key_part = tuple(tail[32:])
+                if key_part != self.key_rounds_inputs:
+                    self.key_rounds = engine.array_round_tweakeys(
+                        tail[32:], 2)
+                    self.key_rounds_inputs = key_part
+                round_tweakeys = engine.fold_round_tweakeys(
+                    [engine.array_round_tweakeys(tail[0:32], 1),
+                     self.key_rounds])
+
+            self.template = (tuple(tail), round_tweakeys)
+            self.template_inputs = inputs
+
+        return self.template
+
+    def block_tweakey(self, d, block_num):
+        """
+        Method to get the key to give SKINNY for a block - the TK, expanded
+        by adding the TK1 part of the tweakey schedule to the precomputed
+        TK2/TK3 part when the template has it.
+        Parameters: d - the domain separation to use, and the block number.
+        Returns: the TK or an ExpandedKey.
+        """
 
-        if self.member == "M2" or self.member == "M4":
-            # Add 0*56 bits to the TK (14 nibbles)
-            for i in range(0, 8):
-                TK.append(0)
+        TK = self.generate_tweakey(d, block_num)
+        round_tweakeys = self.template[1]
+        if round_tweakeys is None:
+            return TK
 
-        TK += self.key
+        engine = self.skinny.engine
 
-        return TK
+        return ExpandedKey(TK, engine.add_tk1_round_tweakeys(
+            TK[0:32], round_tweakeys), engine.key_schedule)
 
     def calculate_sigma(self, blocks):
         """
@@ -261,9 +490,10 @@ class SkinnyAead:
         # Initialise auth to 0*128
         auth = [0] * 128
 
-        # Initialise the LFSR and generate the first TK value
-        lfsr = self.generate_LFSR()
-        TK = self.generate_tweakey(2, lfsr)
+        # Initialise the LFSR (held as the block number, the LFSR value is
+        # looked up from it) and generate the first TK value
+        lfsr = 0
+        TK = self.block_tweakey(2, lfsr)
 
         # First check if authenticated data is not empty -
         # if it is, the initialised auth is returned
@@ -277,8 +507,8 @@ class SkinnyAead:
                 auth = xor_bits(auth, convert_to_bits(encryptedBlock))
 
                 # Update the LFSR and generate the new TK
-                lfsr = self.apply_LFSR(lfsr)
-                TK = self.generate_tweakey(2, lfsr)
+                lfsr += 1
+                TK = self.block_tweakey(2, lfsr)
 
             # Get the last block of authenticated data
             lastBlock = blocksAD[-1]
@@ -289,7 +519,7 @@ class SkinnyAead:
 
                 # Pad the last block and specify domain separation 3 for the TK
                 padLastBlock = apply_padding(lastBlock, 128)
-                TK = self.generate_tweakey(3, lfsr)
+                TK = self.block_tweakey(3, lfsr)
 
                 # Encrypt the padded associated data and XOR it
                 # to the auth variable
@@ -308,15 +538,16 @@ class SkinnyAead:
         Returns: the ciphertext and T
         """
 
-        # Initialise the LFSR and ciphertext list
-        lfsr = self.generate_LFSR()
+        # Initialise the LFSR (held as the block number, the LFSR value is
+        # looked up from it) and ciphertext list
+        lfsr = 0
         ciphertext = []
 
         # First check whether the plaintext is empty
         if blocks == [[]]:
             # If no plaintext is supplied, generate the TK and encrypt
             # 0*128 under it
-            TK = self.generate_tweakey(4, lfsr)
+            TK = self.block_tweakey(4, lfsr)
             T = self.skinny.encrypt_block([0] * 128, TK)
 
         else:
@@ -324,12 +555,12 @@ class SkinnyAead:
             for i in range(0, len(blocks) - 1):
                 # Generate the TK with domain separation d0 and
                 # encrypt each plaintext block
-                TK = self.generate_tweakey(0, lfsr)
+                TK = self.block_tweakey(0, lfsr)
                 C = self.skinny.encrypt_block(blocks[i], TK)
                 ciphertext.append(C)
 
                 # Update the LFSR
-                lfsr = self.apply_LFSR(lfsr)
+                lfsr += 1
 
             # Get the final block in the plaintext
             lastBlock = blocks[-1]
@@ -337,7 +568,7 @@ class SkinnyAead:
             if len(lastBlock) != 32:
 
                 # If the last block is not full
-                TK = self.generate_tweakey(1, lfsr)
+                TK = self.block_tweakey(1, lfsr)
 
                 # Encrypt 0*128
                 R = self.skinny.encrypt_block([0] * 32, TK)
@@ -353,21 +584,21 @@ class SkinnyAead:
                 ciphertext.append(clm)
 
                 # Update LFSR
-                lfsr = self.apply_LFSR(lfsr)
-                TK = self.generate_tweakey(5, lfsr)
+                lfsr += 1
+                TK = self.block_tweakey(5, lfsr)
 
                 # Encrypt sigma under the TK
                 T = self.skinny.encrypt_block(self.calculate_sigma(blocks), TK)
 
             else:
                 # If final block is full
-                TK = self.generate_tweakey(0, lfsr)
+                TK = self.block_tweakey(0, lfsr)
                 C = self.skinny.encrypt_block(lastBlock, TK)
                 ciphertext.append(C)
 
                 # Update LFSR and encrypt sigma
-                lfsr = self.apply_LFSR(lfsr)
-                TK = self.generate_tweakey(4, lfsr)
+                lfsr += 1
+                TK = self.block_tweakey(4, lfsr)
                 T = self.skinny.encrypt_block(self.calculate_sigma(blocks), TK)
 
         return ciphertext, T
@@ -379,15 +610,16 @@ class SkinnyAead:
         Returns: the plaintext and T.
         """
 
-        # Initialise the LFSR and ciphertext list
-        lfsr = self.generate_LFSR()
+        # Initialise the LFSR (held as the block number, the LFSR value is
+        # looked up from it) and ciphertext list
+        lfsr = 0
         plaintext = []
 
         # First check whether the plaintext is empty
         if blocks == [[]]:
             # If no plaintext is supplied, generate the TK and encrypt
             # 0*128 under it
-            TK = self.generate_tweakey(4, lfsr)
+            TK = self.block_tweakey(4, lfsr)
             T = self.skinny.encrypt_block([0] * 128, TK)
 
         else:
@@ -395,19 +627,19 @@ class SkinnyAead:
             for i in range(0, len(blocks) - 1):
                 # Generate the TK with domain separation d0 and
                 # encrypt each plaintext block
-                TK = self.generate_tweakey(0, lfsr)
+                TK = self.block_tweakey(0, lfsr)
                 C = self.skinny.decrypt_block(blocks[i], TK)
                 plaintext.append(C)
 
                 # Update the LFSR
-                lfsr = self.apply_LFSR(lfsr)
+                lfsr += 1
 
             # Get the final block in the plaintext
             lastBlock = blocks[-1]
 
             if len(lastBlock) != 32:
                 # If final block not full
-                TK = self.generate_tweakey(1, lfsr)
+                TK = self.block_tweakey(1, lfsr)
 
                 # Encrypt 0*128
                 R = self.skinny.encrypt_block([0] * 32, TK)
@@ -424,8 +656,8 @@ class SkinnyAead:
                 plaintext.append(clm)
 
                 # Update LFSR
-                lfsr = self.apply_LFSR(lfsr)
-                TK = self.generate_tweakey(5, lfsr)
+                lfsr += 1
+                TK = self.block_tweakey(5, lfsr)
                 T = self.skinny.encrypt_block(self.calculate_sigma(
                     plaintext[:]), TK)
 
@@ -433,14 +665,438 @@ class SkinnyAead:
 
             else:
                 # If final block is full
-                TK = self.generate_tweakey(0, lfsr)
+                TK = self.block_tweakey(0, lfsr)
                 C = self.skinny.decrypt_block(lastBlock, TK)
                 plaintext.append(C)
 
                 # Update LFSR and encrypt sigma
-                lfsr = self.apply_LFSR(lfsr)
-                TK = self.generate_tweakey(4, lfsr)
+                lfsr += 1
+                TK = self.block_tweakey(4, lfsr)
                 T = self.skinny.encrypt_block(self.calculate_sigma(
                     plaintext), TK)
 
         return plaintext, T
+
+    def encrypt_parallel(self, plaintext, key, associated_data, nonce,
+                         workers=None, chunk_blocks=None):
+        """
+        Method to encrypt plaintext message and generate a tag using
+        authenticated data - same result as encrypt, but every block
+        encryption is run as an independent job across a pool of worker
+        processes (each block's tweakey only depends on its block number,
+        through the LFSR, the domain separation, nonce and key).
+        Parameters: the plaintext to encrypt, the key, associated data,
+        nonce, the number of worker processes (defaults to the number of
+        CPUs) and the number of blocks per chunk.
+        Return: the ciphertext and the tag.
+        """
+
+        self.nonce = nonce  # the nonce
+        self.key = key  # the key
+        self.nonce_size = len(nonce) * 4  # size of the nonce (bits)
+        self.key_size = len(key) * 4  # size of the key (bits)
+
+        # run the associated data and plaintext blocks together
+        ad_jobs = self.ad_jobs(associated_data)
+        results = self.run_jobs_parallel(
+            [(nonce, ad_jobs + self.message_jobs(plaintext, False))],
+            workers, chunk_blocks)
+
+        # combine the results into the ciphertext and tag
+        ciphertext, T = self.finish_message(plaintext, results[len(ad_jobs):],
+                                            False)
+
+        return ciphertext, self.finish_tag(T, results[:len(ad_jobs)])
+
+    def verify_parallel(self, ciphertext, key, associated_data, nonce,
+                        tag_to_verify, workers=None, chunk_blocks=None):
+        """
+        Method to decrypt ciphertext with the provided authenticated data -
+        same result as verify, but with the block cipher calls run across a
+        pool of worker processes (see encrypt_parallel).
+        Parameters: the ciphertext to decrypt, the key, associated data,
+        nonce, the tag that is to be verified, the number of worker
+        processes (defaults to the number of CPUs) and the number of blocks
+        per chunk.
+        Returns: the plaintext if tag is verified, [-1] otherwise.
+        """
+
+        self.nonce = nonce  # the nonce
+        self.key = key  # the key
+        self.nonce_size = len(nonce) * 4  # size of the nonce (bits)
+        self.key_size = len(key) * 4  # size of the key (bits)
+
+        # run the associated data and ciphertext blocks together
+        ad_jobs = self.ad_jobs(associated_data)
+        results = self.run_jobs_parallel(
+            [(nonce, ad_jobs + self.message_jobs(ciphertext, True))],
+            workers, chunk_blocks)
+
+        # combine the results into the plaintext and tag
+        plaintext, T = self.finish_message(ciphertext, results[len(ad_jobs):],
+                                           True)
+
+        # if generated tag matches provided one, return plaintext
+        if tag_to_verify == self.finish_tag(T, results[:len(ad_jobs)]):
+            return plaintext
+        else:
+            return [-1]
+
+    def encrypt_many(self, messages, key, workers=None, chunk_blocks=None,
+                     batch_size=many_batch_size):
+        """
+        Method to encrypt many messages under one key - same results as
+        calling encrypt for each message, but the messages are taken in
+        batches, and the block cipher calls of every message in a batch are
+        run together in two rounds (the blocks, then the tags) through
+        run_jobs_parallel, sharing one pool of worker processes. SKINNY has
+        no batched engine, so on a single CPU this is no faster than calling
+        encrypt for each message.
+        Parameters: iterable of (nonce, associated data, plaintext), the
+        key, the number of worker processes (defaults to the number of
+        CPUs), the number of blocks per chunk and the number of messages per
+        batch.
+        Returns: list of (ciphertext, tag), in the order of the messages.
+        """
+
+        return [result for message, result in self.run_many(
+            messages, key, False, workers, chunk_blocks, batch_size)]
+
+    def verify_many(self, messages, key, workers=None, chunk_blocks=None,
+                    batch_size=many_batch_size):
+        """
+        Method to verify many messages under one key - same results as
+        calling verify for each message (see encrypt_many).
+        Parameters: iterable of (nonce, associated data, ciphertext, tag to
+        verify), the key, the number of worker processes (defaults to the
+        number of CPUs), the number of blocks per chunk and the number of
+        messages per batch.
+        Returns: list of the plaintext if the tag is verified, [-1]
+        otherwise, in the order of the messages.
+        """
+
+        return [plaintext if message[3] == tag else [-1]
+                for message, (plaintext, tag) in self.run_many(
+                    messages, key, True, workers, chunk_blocks, batch_size)]
+
+    def run_many(self, messages, key, decrypt, workers, chunk_blocks,
+                 batch_size):
+        """
+        Generator to run many messages a batch at a time. The pool of worker
+        processes is started by the first batch that needs it and shared by
+        the rest.
+        Parameters: iterable of messages (nonce, associated data, plaintext
+        or ciphertext, then for verify_many the tag), the key, whether
+        decrypting, the number of worker processes, the number of blocks per
+        chunk and the number of messages per batch.
+        Returns: yields each message with its (ciphertext or plaintext,
+        tag).
+        """
+
+        messages = iter(messages)
+        pool = []
+        try:
+            batch = list(islice(messages, batch_size))
+            while batch:
+                results = self.run_batch([message[0:3] for message in batch],
+                                         key, decrypt, workers, chunk_blocks,
+                                         pool)
+                for message, result in zip(batch, results):
+                    yield message, result
+                batch = list(islice(messages, batch_size))
+        finally:
+            for executor in pool:
+                executor.shutdown()
+
+    def run_batch(self, messages, key, decrypt, workers, chunk_blocks, pool):
+        """
+        Method to run the block cipher calls of a batch of messages in two
+        rounds - first the associated data and message blocks of every
+        message, then the encryptions of sigma, which need the plaintext.
+        Parameters: list of (nonce, associated data, plaintext or
+        ciphertext), the key, whether decrypting, the number of worker
+        processes, the number of blocks per chunk and the list holding the
+        shared pool of worker processes.
+        Returns: list of (ciphertext or plaintext, tag).
+        """
+
+        previous_key = self.key, self.key_size
+        self.key = key  # the key
+        self.key_size = len(key) * 4  # size of the key (bits)
+        try:
+            return self.run_batch_jobs(messages, decrypt, workers,
+                                       chunk_blocks, pool)
+        finally:
+            # leave the key as it was before the batch
+            self.key, self.key_size = previous_key
+
+    def run_batch_jobs(self, messages, decrypt, workers, chunk_blocks, pool):
+        """
+        Method to run the two rounds of block cipher calls for a batch of
+        messages under the key that has been set (see run_batch).
+        Parameters: as for run_batch, without the key.
+        Returns: list of (ciphertext or plaintext, tag).
+        """
+
+        # group the jobs of every message under its nonce, keeping how many
+        # jobs each message has
+        groups = []
+        layouts = []
+        for nonce, associated_data, blocks in messages:
+            ad_jobs = self.ad_jobs(associated_data)
+            message_jobs = self.message_jobs(blocks, decrypt)
+            layouts.append((len(ad_jobs), len(message_jobs)))
+            groups.append((nonce, ad_jobs + message_jobs))
+        results = self.run_jobs_parallel(groups, workers, chunk_blocks,
+                                         pool)
+
+        # build the output of every message and list the tag jobs
+        outputs = []
+        tag_groups = []
+        position = 0
+        for (nonce, associated_data, blocks), layout in zip(messages,
+                                                            layouts):
+            num_ad, num_message = layout
+            ad_results = results[position:position + num_ad]
+            position += num_ad
+            output = self.message_output(
+                blocks, results[position:position + num_message])
+            position += num_message
+
+            outputs.append((output, ad_results))
+            tag_groups.append((nonce, [
+                (False, self.tag_block(blocks, output, decrypt))
+                + self.tag_domain(blocks)]))
+        tag_results = self.run_jobs_parallel(tag_groups, workers,
+                                             chunk_blocks, pool)
+
+        return [(output, self.finish_tag(T, ad_results))
+                for (output, ad_results), T in zip(outputs, tag_results)]
+
+    def ad_jobs(self, blocksAD):
+        """
+        Method to list the block encryptions for the authenticated data
+        (as process_ad).
+        Parameters: authenticated data blocks.
+        Returns: list of jobs (as taken by run_groups).
+        """
+
+        # with no authenticated data there is nothing to encrypt
+        if blocksAD == [[]]:
+            return []
+
+        # every block but the last is encrypted with domain separation 2
+        jobs = [(False, blocksAD[i], 2, i)
+                for i in range(0, len(blocksAD) - 1)]
+
+        # the last block is padded with domain separation 3 if not full
+        lastBlock = blocksAD[-1]
+        if len(lastBlock) != 32:
+            jobs.append((False, apply_padding(lastBlock[:], 128), 3,
+                         len(blocksAD) - 1))
+        else:
+            jobs.append((False, lastBlock, 2, len(blocksAD) - 1))
+
+        return jobs
+
+    def message_jobs(self, blocks, decrypt):
+        """
+        Method to list the block cipher calls for the message (as
+        process_plaintext and process_plaintext_dec), excluding the tag.
+        Parameters: the plaintext (or ciphertext) blocks and whether
+        decrypting.
+        Returns: list of jobs (as taken by run_groups).
+        """
+
+        # with no message only the tag is encrypted
+        if blocks == [[]]:
+            return []
+
+        # every full block is encrypted (or decrypted) with domain
+        # separation 0
+        jobs = [(decrypt, blocks[i], 0, i)
+                for i in range(0, len(blocks) - 1)]
+
+        # an incomplete last block is XORed with the encryption of 0*128
+        # under domain separation 1
+        lastBlock = blocks[-1]
+        if len(lastBlock) != 32:
+            jobs.append((False, [0] * 32, 1, len(blocks) - 1))
+        else:
+            jobs.append((decrypt, lastBlock, 0, len(blocks) - 1))
+
+        return jobs
+
+    def finish_message(self, blocks, results, decrypt):
+        """
+        Method to build the output blocks from the results of the message
+        jobs and encrypt sigma to give T.
+        Parameters: the plaintext (or ciphertext) blocks, the results of
+        the message jobs and whether decrypting.
+        Returns: the ciphertext (or plaintext) and T.
+        """
+
+        output = self.message_output(blocks, results)
+        T = self.skinny.encrypt_block(self.tag_block(blocks, output, decrypt),
+                                      self.tag_tweakey(blocks))
+
+        return output, T
+
+    def message_output(self, blocks, results):
+        """
+        Method to build the output blocks from the results of the message
+        jobs.
+        Parameters: the plaintext (or ciphertext) blocks and the results of
+        the message jobs.
+        Returns: the ciphertext (or plaintext).
+        """
+
+        # with no message there is no output
+        if blocks == [[]]:
+            return []
+
+        output = results[0:len(blocks) - 1]
+        lastBlock = blocks[-1]
+
+        # truncate R to the length of an incomplete last block and XOR it
+        # with the block
+        if len(lastBlock) != 32:
+            output.append(xor_bits(results[-1][0:len(lastBlock)], lastBlock))
+        else:
+            output.append(results[-1])
+
+        return output
+
+    def tag_block(self, blocks, output, decrypt):
+        """
+        Method to get the block encrypted to give T - sigma, taken over the
+        plaintext, or 0*128 with no message.
+        Parameters: the plaintext (or ciphertext) blocks, the output blocks
+        and whether decrypting.
+        Returns: the block to encrypt.
+        """
+
+        if blocks == [[]]:
+            return [0] * 128
+
+        return self.calculate_sigma(output if decrypt else blocks)
+
+    def tag_tweakey(self, blocks):
+        """
+        Method to get the tweakey T is encrypted under.
+        Parameters: the plaintext (or ciphertext) blocks.
+        Returns: the TK (as for block_tweakey).
+        """
+
+        return self.block_tweakey(*self.tag_domain(blocks))
+
+    def tag_domain(self, blocks):
+        """
+        Method to get the domain separation and block number of the tweakey
+        T is encrypted under - domain separation 4 (or 5 after an incomplete
+        last block), with the LFSR one past the last message block.
+        Parameters: the plaintext (or ciphertext) blocks.
+        Returns: the domain separation and the block number.
+        """
+
+        if blocks == [[]]:
+            return 4, 0
+
+        d = 5 if len(blocks[-1]) != 32 else 4
+
+        return d, len(blocks)
+
+    def finish_tag(self, T, ad_results):
+        """
+        Method to generate the tag - T XORed with auth, the XOR of all of the
+        encrypted authenticated data blocks.
+        Parameters: T and the results of the authenticated data jobs.
+        Returns: the tag.
+        """
+
+        tag = T
+        for block in ad_results:
+            tag = xor_bits(tag, block)
+
+        # if using M3 or M4 SKINNY-AEAD truncate tag to 64 bits
+        if self.member == "M3" or self.member == "M4":
+            tag = tag[0:16]
+
+        return tag
+
+    def run_groups(self, groups):
+        """
+        Method to run groups of block jobs, each block's tweakey being built
+        here from the template for the group's nonce (kept while the nonce
+        stays the same), so a job only carries its block, domain separation
+        and block number.
+        Parameters: list of (nonce, jobs) groups - the jobs are (whether to
+        decrypt, block, domain separation, block number) tuples.
+        Returns: list of the resulting blocks, in order.
+        """
+
+        previous_nonce = self.nonce
+        results = []
+        try:
+            for nonce, jobs in groups:
+                self.nonce = nonce
+                results += run_jobs(self.skinny, (
+                    (decrypt, block, self.block_tweakey(d, block_num))
+                    for decrypt, block, d, block_num in jobs))
+        finally:
+            # leave the nonce as it was before the jobs
+            self.nonce = previous_nonce
+
+        return results
+
+    def run_jobs_parallel(self, groups, workers, chunk_blocks, pool=None):
+        """
+        Method to run independent block cipher calls across a pool of worker
+        processes.
+        Parameters: the groups of jobs (as for run_groups), the number of
+        worker processes (None for the number of CPUs), the number of jobs
+        per chunk (None for at least min_chunk_blocks) and a list holding a
+        pool shared between calls - started on first use and shut down by
+        the caller - or None for a pool for this call only.
+        Returns: list of the resulting blocks, in order.
+        """
+
+        if workers is None:
+            workers = cpu_count() or 1
+
+        # split the jobs into chunks - with one chunk or worker, run the
+        # jobs in this process
+        size = chunk_blocks
+        if size is None:
+            total = sum(len(jobs) for nonce, jobs in groups)
+            size = max(min_chunk_blocks, -(-total // (4 * workers)))
+        chunks = split_groups(groups, size)
+        if len(chunks) <= 1 or workers <= 1:
+            return self.run_groups(groups)
+
+        # this object is sent to each worker once, with the template for
+        # the first nonce and the TK3 round tweakeys for the key, so the
+        # workers expand the tweakeys
+        if pool:
+            executor = pool[0]
+        else:
+            previous_nonce = self.nonce
+            self.nonce = groups[0][0]
+            self.get_template()
+            self.nonce = previous_nonce
+            executor = ProcessPoolExecutor(max_workers=workers,
+                                           initializer=init_aead_worker,
+                                           initargs=(self,))
+            if pool is not None:
+                pool.append(executor)
+
+        # map returns the results in chunk order
+        results = []
+        try:
+            for chunk_results in executor.map(run_aead_chunk, chunks):
+                results += chunk_results
+        finally:
+            if pool is None:
+                executor.shutdown()
+
+        return results
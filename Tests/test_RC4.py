@@ -23,5 +23,122 @@ class TestRC4(unittest.TestCase):
         self.assertEqual(algorithm(key, no_bytes), correct, "Incorrect RC4")
 
 
+class TestRC4Generator(unittest.TestCase):
+    """
+    Run unit and integration tests on the RC4 generator object and IV cache
+    """
+
+    def setUp(self):
+        # key and first 32 bytes of its keystream
+        self.key = bytes(range(16))
+        self.correct = [233, 156, 64, 249, 71, 226, 25, 204, 6, 219, 151,
+                        198, 14, 221, 42, 79, 211, 113, 129, 95, 242, 183, 66,
+                        238, 143, 158, 165, 217, 249, 55, 227, 2]
+
+    def test_generate(self):
+        """
+        The keystream carries on between calls to generate
+        """
+
+        generator = RC4Generator(self.key)
+        stream = generator.generate(5) + generator.generate(0) \
+            + generator.generate(27)
+
+        self.assertEqual(list(stream), self.correct, "Incorrect RC4")
+
+    def test_cached_state(self):
+        """
+        Generators for the same key share the cached key scheduling but not
+        the state
+        """
+
+        first = RC4Generator(self.key)
+        first.generate(10)
+        second = RC4Generator(list(self.key))
+
+        self.assertEqual(list(second.generate(32)), self.correct,
+                         "Incorrect RC4")
+        self.assertEqual(bytes(initialisation(list(self.key))),
+                         initialised_state(self.key), "Incorrect state")
+
+    def test_rc4_iv(self):
+        """
+        The IV is the start of the keystream
+        """
+
+        self.assertEqual(rc4_iv(self.key, 16), bytes(self.correct[0:16]),
+                         "Incorrect IV")
+        self.assertEqual(rc4_iv(self.key, 8), bytes(self.correct[0:8]),
+                         "Incorrect IV")
+
+
+class TestBulkKeystream(unittest.TestCase):
+    """
+    Run integration tests on generating long keystreams in chunks - must
+    match the one-shot keystream
+    """
+
+    def setUp(self):
+        # key and a keystream long enough to wrap the indices several times
+        self.key = bytes(range(16))
+        self.correct = RC4Generator(self.key).generate(5000)
+
+    def test_readinto(self):
+        """
+        Fill a bytearray and part of another through a memoryview, in
+        chunks that do not line up with the index wrapping
+        """
+
+        generator = RC4Generator(self.key)
+        first = bytearray(1000)
+        second = bytearray(4100)
+
+        self.assertEqual(generator.readinto(first, 300), 1000,
+                         "Incorrect length")
+        self.assertEqual(generator.readinto(memoryview(second)[0:4000], 777),
+                         4000, "Incorrect length")
+        self.assertEqual(first + second[0:4000], self.correct,
+                         "Incorrect keystream")
+        self.assertEqual(second[4000:], bytes(100), "Buffer overrun")
+
+    def test_generate_into(self):
+        """
+        Write into slices of one buffer, leaving the rest of it untouched
+        """
+
+        generator = RC4Generator(self.key)
+        buffer = bytearray(5100)
+        view = memoryview(buffer)
+        generator.generate_into(view[0:1])
+        generator.generate_into(view[1:2999])
+        generator.generate_into(view[2999:5000])
+
+        self.assertEqual(buffer[0:5000], self.correct, "Incorrect keystream")
+        self.assertEqual(buffer[5000:], bytes(100), "Buffer overrun")
+
+    def test_stream(self):
+        """
+        Consume the keystream from the iterator
+        """
+
+        chunks = list(RC4Generator(self.key).stream(5000, 1024))
+
+        self.assertEqual([len(chunk) for chunk in chunks],
+                         [1024, 1024, 1024, 1024, 904], "Incorrect chunks")
+        self.assertEqual(b"".join(chunks), self.correct,
+                         "Incorrect keystream")
+
+    def test_run_RC4(self):
+        """
+        The hex keystream splits each byte into two nibbles
+        """
+
+        key = [0, 0, 0, 1, 0, 2, 0, 3, 0, 4, 0, 5, 0, 6, 0, 7, 0, 8, 0, 9, 0,
+               10, 0, 11, 0, 12, 0, 13, 0, 14, 0, 15]
+
+        self.assertEqual(run_RC4(key, 3), [14, 9, 9, 12, 4, 0],
+                         "Incorrect RC4")
+
+
 if __name__ == '__main__':
     unittest.main()
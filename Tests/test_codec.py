@@ -0,0 +1,103 @@
+"""
+This file runs unit tests for the hex codec functions
+"""
+
+import sys
+sys.path.append('..')
+import unittest
+from codec import *
+
+
+class TestHexToNibbles(unittest.TestCase):
+    """
+    Unit tests for converting hex strings into nibble lists
+    """
+
+    def test_hex_to_nibbles(self):
+        """
+        Unit test for upper and lower case digits
+        """
+
+        self.assertEqual(hex_to_nibbles("0123456789ABCDEFabcdef"),
+                         list(range(16)) + [10, 11, 12, 13, 14, 15],
+                         "Hex to nibbles conversion incorrect")
+
+    def test_odd_length(self):
+        """
+        Unit test for strings with an odd number of digits
+        """
+
+        self.assertEqual(hex_to_nibbles("ABC"), [10, 11, 12],
+                         "Hex to nibbles conversion incorrect")
+        self.assertEqual(hex_to_nibbles("7"), [7],
+                         "Hex to nibbles conversion incorrect")
+        self.assertEqual(hex_to_nibbles(""), [],
+                         "Hex to nibbles conversion incorrect")
+
+    def test_invalid(self):
+        """
+        Unit test for strings that are not hex - a ValueError, as int gives
+        """
+
+        for string in ["G", "0x", " 1"]:
+            with self.assertRaises(ValueError):
+                hex_to_nibbles(string)
+
+
+class TestNibblesToHex(unittest.TestCase):
+    """
+    Unit tests for converting nibble lists into hex strings
+    """
+
+    def test_nibbles_to_hex(self):
+        """
+        Unit test for a nibble list
+        """
+
+        self.assertEqual(nibbles_to_hex(list(range(16))), "0123456789ABCDEF",
+                         "Nibbles to hex conversion incorrect")
+        self.assertEqual(nibbles_to_hex([]), "",
+                         "Nibbles to hex conversion incorrect")
+
+    def test_blocks(self):
+        """
+        Unit test for a list of blocks, including an incomplete and an empty
+        block
+        """
+
+        self.assertEqual(nibbles_to_hex([[1, 2, 3], [], [15]]), "123F",
+                         "Nibbles to hex conversion incorrect")
+        self.assertEqual(nibbles_to_hex([[]]), "",
+                         "Nibbles to hex conversion incorrect")
+
+    def test_other_values(self):
+        """
+        Unit test for values that are not nibbles - written out in full, as
+        list_to_string does
+        """
+
+        self.assertEqual(nibbles_to_hex([1, 255, 16]), "1FF10",
+                         "Nibbles to hex conversion incorrect")
+        self.assertEqual(nibbles_to_hex([-1]), "1",
+                         "Nibbles to hex conversion incorrect")
+
+
+class TestBytesHex(unittest.TestCase):
+    """
+    Unit tests for converting between hex strings and bytes
+    """
+
+    def test_bytes_hex(self):
+        """
+        Unit test for a round trip through bytes
+        """
+
+        data = hex_to_bytes("00ff10Ab")
+        self.assertEqual(data, b"\x00\xff\x10\xab", "Incorrect bytes")
+        self.assertEqual(bytes_to_hex(data), "00FF10AB", "Incorrect hex")
+        self.assertEqual(bytes_to_hex(memoryview(data)[1:3]), "FF10",
+                         "Incorrect hex")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,6 +7,7 @@ import sys
 sys.path.append('..')
 import unittest
 from Gift.gift_128 import *
+from Gift.gift128bitsliced import Gift128BitSliced
 
 
 class TestApplySBox(unittest.TestCase):
@@ -430,5 +431,77 @@ class TestDecryptBlock(unittest.TestCase):
                          "Block not decrypted correctly")
 
 
+class TestExpandKey(unittest.TestCase):
+    """
+    Integration tests for the expand_key method of the GIFT-128 class - an
+    expanded key can be used in place of the key, and the key schedule is
+    cached per key.
+    """
+
+    def setUp(self):
+        # set up GIFT-128 object
+        self.gift128 = Gift128()
+
+    def test_expand_key_cached(self):
+        """
+        Test vector 1
+        """
+
+        key = [7, 3, 8, 13, 10, 0, 9, 15, 9, 10, 15, 8, 2, 0, 9, 9, 7, 14, 3,
+               13, 0, 0, 7, 7, 10, 9, 5, 12, 5, 15, 0, 13]
+
+        expanded = self.gift128.expand_key(key)
+
+        self.assertIs(self.gift128.expand_key(key[:]), expanded,
+                      "Key schedule not cached")
+
+    def test_encrypt_decrypt_expanded_key(self):
+        """
+        Test vector 2
+        """
+
+        state = [1, 12, 6, 8, 15, 1, 9, 10, 6, 11, 5, 8, 10, 8, 0, 15, 3, 4,
+                 10, 11, 13, 7, 5, 10, 15, 1, 4, 1, 12, 9, 3, 14]
+        key = [7, 3, 8, 13, 10, 0, 9, 15, 9, 10, 15, 8, 2, 0, 9, 9, 7, 14, 3,
+               13, 0, 0, 7, 7, 10, 9, 5, 12, 5, 15, 0, 13]
+        correct = [10, 14, 5, 6, 2, 7, 7, 9, 6, 13, 2, 6, 10, 0, 0, 4, 15, 11,
+                   13, 3, 12, 12, 13, 11, 12, 7, 6, 14, 13, 14, 3, 1]
+        expanded = self.gift128.expand_key(key)
+
+        self.assertEqual(self.gift128.encrypt_block(state[:], expanded),
+                         correct, "Block not encrypted correctly")
+        self.assertEqual(self.gift128.decrypt_block(correct, expanded), state,
+                         "Block not decrypted correctly")
+
+
+    def test_other_layout(self):
+        """
+        Unit test for a key expanded by the bit sliced GIFT-128, which takes
+        its key as bytes rather than nibbles - rejected
+        """
+
+        expanded = Gift128BitSliced().expand_key(list(range(16)))
+
+        with self.assertRaises(ValueError):
+            self.gift128.expand_key(expanded)
+
+    def test_block_bytes_expanded_key(self):
+        """
+        Test vector 2 - a key from expand_key given to the bytes API is
+        expanded again for the table driven engine
+        """
+
+        state = bytes.fromhex("1C68F19A6B58A80F34ABD75AF141C93E")
+        key = [7, 3, 8, 13, 10, 0, 9, 15, 9, 10, 15, 8, 2, 0, 9, 9, 7, 14, 3,
+               13, 0, 0, 7, 7, 10, 9, 5, 12, 5, 15, 0, 13]
+        correct = bytes.fromhex("AE5627796D26A004FBD3CCDBC76EDE31")
+        expanded = self.gift128.expand_key(key)
+
+        self.assertEqual(self.gift128.encrypt_block_bytes(state, expanded),
+                         correct, "Block not encrypted correctly")
+        self.assertEqual(self.gift128.decrypt_block_bytes(correct, expanded),
+                         state, "Block not decrypted correctly")
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -9,6 +9,42 @@ from Gift.gift128bitsliced import Gift128BitSliced
 from utils import hex_to_decimal
 
 
+class TestPermBits(unittest.TestCase):
+    """
+    Unit tests for the perm_bits method of the class.
+    """
+
+    def setUp(self):
+        # Set up GIFT-128-bit-sliced object
+        self.gift_128_bit_sliced = Gift128BitSliced()
+
+    def test_perm_bits(self):
+        """
+        Test vector 1
+        """
+
+        self.gift_128_bit_sliced.state = [0x01234567, 0x89abcdef, 0xfedcba98,
+                                          0x76543210]
+        correct = [0x330f0055, 0x0fff5533, 0xffaaccf0, 0xaaccf000]
+
+        self.gift_128_bit_sliced.perm_bits()
+        self.assertEqual(self.gift_128_bit_sliced.state, correct,
+                         "P-box not applied correctly")
+
+    def test_perm_bits2(self):
+        """
+        Test vector 2
+        """
+
+        self.gift_128_bit_sliced.state = [0xffffffff, 0x00000000, 0x80000001,
+                                          0x0f0f0f0f]
+        correct = [0xffffffff, 0x00000000, 0x80010000, 0x55555555]
+
+        self.gift_128_bit_sliced.perm_bits()
+        self.assertEqual(self.gift_128_bit_sliced.state, correct,
+                         "P-box not applied correctly")
+
+
 class TestEncryptBlock(unittest.TestCase):
     """
     Integration tests for the encrypt_block method of the
@@ -52,5 +88,128 @@ class TestEncryptBlock(unittest.TestCase):
                          correct, "Block not encrypted correctly")
 
 
+class TestEncryptBlocks(unittest.TestCase):
+    """
+    Integration tests for the encrypt_blocks method of the class - every
+    block must encrypt as it does with encrypt_block.
+    """
+
+    def setUp(self):
+        # Set up GIFT-128-bit-sliced object
+        self.gift_128_bit_sliced = Gift128BitSliced()
+
+    def test_encrypt_blocks(self):
+        """
+        Official test vector 1 alongside other blocks under the same key
+        """
+
+        key = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]
+        blocks = [[0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15],
+                  [0] * 16, [255] * 16, list(range(240, 256))]
+        correct = [10, 9, 4, 10, 15, 7, 15, 9, 11, 10, 1, 8, 1, 13, 15, 9, 11,
+                   2, 11, 0, 0, 14, 11, 7, 13, 11, 15, 10, 9, 3, 13, 15]
+
+        ciphertexts = self.gift_128_bit_sliced.encrypt_blocks(blocks, key)
+
+        self.assertEqual(ciphertexts[0], correct,
+                         "Block not encrypted correctly")
+        for i in range(1, 4):
+            self.assertEqual(ciphertexts[i],
+                             self.gift_128_bit_sliced.encrypt_block(blocks[i],
+                                                                    key),
+                             "Block not encrypted correctly")
+
+    def test_encrypt_blocks_empty(self):
+        """
+        No blocks to encrypt
+        """
+
+        key = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]
+
+        self.assertEqual(self.gift_128_bit_sliced.encrypt_blocks([], key),
+                         [], "Empty list not returned")
+
+
+class TestEncryptInt(unittest.TestCase):
+    """
+    Integration tests for the encrypt_int and encrypt_ints methods of the
+    class - blocks held as 128-bit ints.
+    """
+
+    def setUp(self):
+        # Set up GIFT-128-bit-sliced object
+        self.gift_128_bit_sliced = Gift128BitSliced()
+
+    def test_encrypt_int(self):
+        """
+        Official test vector 1
+        """
+
+        key = self.gift_128_bit_sliced.expand_key(list(range(16)))
+        block = 0x000102030405060708090A0B0C0D0E0F
+        correct = 0xA94AF7F9BA181DF9B2B00EB7DBFA93DF
+
+        self.assertEqual(self.gift_128_bit_sliced.encrypt_int(
+            block, key.round_keys), correct, "Block not encrypted correctly")
+
+    def test_encrypt_ints(self):
+        """
+        Official test vector 1 alongside other blocks under the same key
+        """
+
+        key = list(range(16))
+        blocks = [0x000102030405060708090A0B0C0D0E0F, 0, (1 << 128) - 1]
+        ciphertexts = self.gift_128_bit_sliced.encrypt_ints(blocks, key)
+
+        self.assertEqual(ciphertexts[0], 0xA94AF7F9BA181DF9B2B00EB7DBFA93DF,
+                         "Block not encrypted correctly")
+        for i in range(1, 3):
+            self.assertEqual(ciphertexts[i],
+                             self.gift_128_bit_sliced.encrypt_int(
+                                 blocks[i],
+                                 self.gift_128_bit_sliced.expand_key(
+                                     key).round_keys),
+                             "Block not encrypted correctly")
+        self.assertEqual(self.gift_128_bit_sliced.encrypt_ints([], key), [],
+                         "Empty list not returned")
+
+
+class TestBlockBytes(unittest.TestCase):
+    """
+    Integration tests for the encrypt_block_bytes and decrypt_block_bytes
+    methods of the class.
+    """
+
+    def setUp(self):
+        # Set up GIFT-128-bit-sliced object
+        self.gift_128_bit_sliced = Gift128BitSliced()
+
+    def test_encrypt_block_bytes(self):
+        """
+        Official test vector 2
+        """
+
+        key = bytes.fromhex("e0841f8fb90783136aa8b7f192f5c474")
+        state = bytes.fromhex("e491c665522031cf033bf71b9989ecb3")
+        correct = bytes.fromhex("3331efc3a6604f9599ed42b7dbc02a38")
+
+        self.assertEqual(self.gift_128_bit_sliced.encrypt_block_bytes(state,
+                                                                      key),
+                         correct, "Block not encrypted correctly")
+
+    def test_decrypt_block_bytes(self):
+        """
+        Official test vector 2
+        """
+
+        key = bytes.fromhex("e0841f8fb90783136aa8b7f192f5c474")
+        state = memoryview(bytes.fromhex("3331efc3a6604f9599ed42b7dbc02a38"))
+        correct = bytes.fromhex("e491c665522031cf033bf71b9989ecb3")
+
+        self.assertEqual(self.gift_128_bit_sliced.decrypt_block_bytes(state,
+                                                                      key),
+                         correct, "Block not decrypted correctly")
+
+
 if __name__ == '__main__':
     unittest.main()
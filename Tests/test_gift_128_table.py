@@ -0,0 +1,201 @@
+"""
+This file runs unit and integration tests for the table driven GIFT-128
+class - test vectors are those used for the GIFT-128 class
+"""
+
+import sys
+sys.path.append('..')
+import unittest
+from Gift.gift_128_table import *
+
+
+class TestRoundFunction(unittest.TestCase):
+    """
+    Unit tests for the fused s-box and p-box lookup tables of the table
+    driven GIFT-128 class.
+    """
+
+    def test_sp_tables(self):
+        """
+        Test vector 1 - one round with no round key matches S-box then P-box
+        """
+
+        state = nibbles_to_int([0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13,
+                                14, 15, 0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11,
+                                12, 13, 14, 15])
+        correct = [15, 10, 0, 9, 15, 10, 0, 9, 0, 7, 15, 8, 0, 7, 15, 8, 8,
+                   13, 11, 6, 8, 13, 11, 6, 4, 3, 7, 4, 4, 3, 7, 4]
+
+        cipher = Gift128Table()
+        self.assertEqual(int_to_nibbles(cipher.encrypt_int(state, [0]), 32),
+                         correct, "S-box and P-box not applied correctly")
+
+    def test_round_keys(self):
+        """
+        Test vector 2 - decrypting a single round undoes encrypting it
+        """
+
+        cipher = Gift128Table()
+        key = [7, 3, 8, 13, 10, 0, 9, 15, 9, 10, 15, 8, 2, 0, 9, 9, 7, 14, 3,
+               13, 0, 0, 7, 7, 10, 9, 5, 12, 5, 15, 0, 13]
+        round_keys = cipher.calculate_round_keys(key)[:1]
+        state = 0x0123456789abcdef0123456789abcdef
+
+        self.assertEqual(cipher.decrypt_int(
+            cipher.encrypt_int(state, round_keys), round_keys), state,
+            "Round not inverted correctly")
+
+
+# INTEGRATION TESTS
+class TestEncryptBlock(unittest.TestCase):
+    """
+    Integration tests for the encrypt_block method of the table driven
+    GIFT-128 class. The test vectors match those of the GIFT-128 class.
+    """
+
+    def setUp(self):
+        # Set up table driven GIFT-128 object
+        self.gift128 = Gift128Table()
+
+    def test_encrypt_block(self):
+        """
+        Test vector 1
+        """
+
+        state = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15,
+                 0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]
+        key = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15,
+               0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]
+        correct = [2, 5, 1, 0, 14, 14, 9, 0, 4, 8, 6, 4, 15, 10, 6, 4, 3, 9,
+                   10, 5, 15, 11, 13, 6, 10, 1, 4, 2, 2, 2, 4, 8]
+
+        self.assertEqual(self.gift128.encrypt_block(state, key), correct,
+                         "Block not encrypted correctly")
+
+    def test_encrypt_block2(self):
+        """
+        Test vector 2
+        """
+
+        state = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+                 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
+        key = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+               0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
+        correct = [2, 9, 15, 15, 6, 11, 14, 12, 6, 3, 10, 5, 1, 11, 8, 6, 6,
+                   15, 3, 13, 10, 8, 8, 3, 8, 3, 7, 13, 11, 0, 13, 12]
+
+        self.assertEqual(self.gift128.encrypt_block(state, key), correct,
+                         "Block not encrypted correctly")
+
+    def test_encrypt_block3(self):
+        """
+        Test vector 3
+        """
+
+        state = [1, 12, 6, 8, 15, 1, 9, 10, 6, 11, 5, 8, 10, 8, 0, 15, 3, 4,
+                 10, 11, 13, 7, 5, 10, 15, 1, 4, 1, 12, 9, 3, 14]
+        key = [7, 3, 8, 13, 10, 0, 9, 15, 9, 10, 15, 8, 2, 0, 9, 9, 7, 14, 3,
+               13, 0, 0, 7, 7, 10, 9, 5, 12, 5, 15, 0, 13]
+
+        correct = [10, 14, 5, 6, 2, 7, 7, 9, 6, 13, 2, 6, 10, 0, 0, 4, 15, 11,
+                   13, 3, 12, 12, 13, 11, 12, 7, 6, 14, 13, 14, 3, 1]
+
+        self.assertEqual(self.gift128.encrypt_block(state, key), correct,
+                         "Block not encrypted correctly")
+
+
+class TestDecryptBlock(unittest.TestCase):
+    """
+    Integration tests for the decrypt_block method of the table driven
+    GIFT-128 class. The test vectors match those of the GIFT-128 class.
+    """
+
+    def setUp(self):
+        # Set up table driven GIFT-128 object
+        self.gift128 = Gift128Table()
+
+    def test_decrypt_block(self):
+        """
+        Test vector 1
+        """
+
+        state = [2, 5, 1, 0, 14, 14, 9, 0, 4, 8, 6, 4, 15, 10, 6, 4, 3, 9,
+                 10, 5, 15, 11, 13, 6, 10, 1, 4, 2, 2, 2, 4, 8]
+        key = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15,
+               0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]
+        correct = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15,
+                   0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]
+
+        self.assertEqual(self.gift128.decrypt_block(state, key), correct,
+                         "Block not decrypted correctly")
+
+    def test_decrypt_block2(self):
+        """
+        Test vector 2
+        """
+
+        state = [2, 9, 15, 15, 6, 11, 14, 12, 6, 3, 10, 5, 1, 11, 8, 6, 6,
+                 15, 3, 13, 10, 8, 8, 3, 8, 3, 7, 13, 11, 0, 13, 12]
+        key = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+               0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
+        correct = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+                   0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
+
+        self.assertEqual(self.gift128.decrypt_block(state, key), correct,
+                         "Block not decrypted correctly")
+
+    def test_decrypt_block3(self):
+        """
+        Test vector 3
+        """
+
+        state = [10, 14, 5, 6, 2, 7, 7, 9, 6, 13, 2, 6, 10, 0, 0, 4, 15, 11,
+                 13, 3, 12, 12, 13, 11, 12, 7, 6, 14, 13, 14, 3, 1]
+        key = [7, 3, 8, 13, 10, 0, 9, 15, 9, 10, 15, 8, 2, 0, 9, 9, 7, 14, 3,
+               13, 0, 0, 7, 7, 10, 9, 5, 12, 5, 15, 0, 13]
+
+        correct = [1, 12, 6, 8, 15, 1, 9, 10, 6, 11, 5, 8, 10, 8, 0, 15, 3, 4,
+                   10, 11, 13, 7, 5, 10, 15, 1, 4, 1, 12, 9, 3, 14]
+
+        self.assertEqual(self.gift128.decrypt_block(state, key), correct,
+                         "Block not decrypted correctly")
+
+
+class TestBlockBytes(unittest.TestCase):
+    """
+    Integration tests for the encrypt_block_bytes and decrypt_block_bytes
+    methods of the table driven GIFT-128 class.
+    """
+
+    def setUp(self):
+        # set up table driven GIFT-128 object
+        self.gift128 = Gift128Table()
+
+    def test_encrypt_block_bytes(self):
+        """
+        Test vector 1
+        """
+
+        state = bytes.fromhex("0123456789abcdef0123456789abcdef")
+        key = bytes.fromhex("0123456789abcdef0123456789abcdef")
+        correct = bytes.fromhex("2510ee904864fa6439a5fbd6a1422248")
+
+        self.assertEqual(self.gift128.encrypt_block_bytes(state, key),
+                         correct, "Block not encrypted correctly")
+
+    def test_decrypt_block_bytes(self):
+        """
+        Test vector 1
+        """
+
+        state = memoryview(bytes.fromhex("2510ee904864fa6439a5fbd6a1422248"))
+        key = self.gift128.expand_key_bytes(
+            bytes.fromhex("0123456789abcdef0123456789abcdef"))
+        correct = bytes.fromhex("0123456789abcdef0123456789abcdef")
+
+        self.assertEqual(self.gift128.decrypt_block_bytes(state, key),
+                         correct, "Block not decrypted correctly")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -378,5 +378,83 @@ class TestDecryptBlock(unittest.TestCase):
                          "Block not decrypted correctly")
 
 
+class TestExpandKey(unittest.TestCase):
+    """
+    Integration tests for the expand_key method of the GIFT-64 class - an
+    expanded key can be used in place of the key, and the key schedule is
+    cached per key.
+    """
+
+    def setUp(self):
+        # set up GIFT-64 object
+        self.gift64 = Gift64()
+
+    def test_expand_key_cached(self):
+        """
+        Test vector 1
+        """
+
+        key = [7, 14, 4, 4, 0, 5, 7, 12, 15, 15, 6, 15, 9, 15, 1, 10, 3, 1, 7,
+               2, 12, 11, 6, 11, 14, 1, 3, 7, 1, 9, 13, 11]
+
+        expanded = self.gift64.expand_key(key)
+
+        self.assertIs(self.gift64.expand_key(key[:]), expanded,
+                      "Key schedule not cached")
+
+    def test_encrypt_decrypt_expanded_key(self):
+        """
+        Test vector 2
+        """
+
+        state = [13, 7, 10, 8, 11, 9, 10, 7, 2, 7, 7, 12, 0, 5, 4, 12]
+        key = [7, 14, 4, 4, 0, 5, 7, 12, 15, 15, 6, 15, 9, 15, 1, 10, 3, 1, 7,
+               2, 12, 11, 6, 11, 14, 1, 3, 7, 1, 9, 13, 11]
+        correct = [11, 8, 10, 11, 4, 9, 10, 15, 5, 8, 8, 2, 7, 2, 3, 14]
+        expanded = self.gift64.expand_key(key)
+
+        self.assertEqual(self.gift64.encrypt_block(state[:], expanded),
+                         correct, "Block not encrypted correctly")
+        self.assertEqual(self.gift64.decrypt_block(correct, expanded), state,
+                         "Block not decrypted correctly")
+
+
+    def test_other_engine(self):
+        """
+        Test vector 2 - a key expanded by the packed GIFT-64 (round keys as
+        ints) is expanded again for this class, and the other way round
+        """
+
+        state = [13, 7, 10, 8, 11, 9, 10, 7, 2, 7, 7, 12, 0, 5, 4, 12]
+        key = [7, 14, 4, 4, 0, 5, 7, 12, 15, 15, 6, 15, 9, 15, 1, 10, 3, 1, 7,
+               2, 12, 11, 6, 11, 14, 1, 3, 7, 1, 9, 13, 11]
+        correct = [11, 8, 10, 11, 4, 9, 10, 15, 5, 8, 8, 2, 7, 2, 3, 14]
+        packed = Gift64Packed()
+
+        self.assertEqual(self.gift64.encrypt_block(
+            state[:], packed.expand_key(key)), correct,
+            "Block not encrypted correctly")
+        self.assertEqual(packed.decrypt_block(
+            correct, self.gift64.expand_key(key)), state,
+            "Block not decrypted correctly")
+
+    def test_block_bytes_expanded_key(self):
+        """
+        Test vector 2 - a key from expand_key given to the bytes API is
+        expanded again for the packed engine
+        """
+
+        state = bytes.fromhex("d7a8b9a7277c054c")
+        key = [7, 14, 4, 4, 0, 5, 7, 12, 15, 15, 6, 15, 9, 15, 1, 10, 3, 1, 7,
+               2, 12, 11, 6, 11, 14, 1, 3, 7, 1, 9, 13, 11]
+        correct = bytes.fromhex("b8ab49af5882723e")
+        expanded = self.gift64.expand_key(key)
+
+        self.assertEqual(self.gift64.encrypt_block_bytes(state, expanded),
+                         correct, "Block not encrypted correctly")
+        self.assertEqual(self.gift64.decrypt_block_bytes(correct, expanded),
+                         state, "Block not decrypted correctly")
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,210 @@
+"""
+This file runs unit and integration tests for the packed integer GIFT-64
+class - test vectors are those used for the GIFT-64 class
+"""
+
+import sys
+sys.path.append('..')
+import unittest
+from Gift.gift_64_packed import *
+
+
+class TestSubCells(unittest.TestCase):
+    """
+    Unit tests for the sub_cells method of the packed GIFT-64 class.
+    """
+
+    def setUp(self):
+        # set up packed GIFT-64 object
+        self.gift64 = Gift64Packed()
+
+    def test_sub_cells(self):
+        """
+        Test vector 1
+        """
+
+        state = nibbles_to_int([13, 7, 10, 8, 11, 9, 10, 7, 2, 7, 7, 12, 0,
+                                5, 4, 12])
+        correct = [0, 9, 11, 2, 7, 13, 11, 9, 4, 9, 9, 5, 1, 15, 6, 5]
+        self.assertEqual(int_to_nibbles(self.gift64.sub_cells(state), 16),
+                         correct, "S-box not applied correctly")
+
+    def test_sub_cells_inv(self):
+        """
+        Test vector 2
+        """
+
+        state = nibbles_to_int([0, 9, 11, 2, 7, 13, 11, 9, 4, 9, 9, 5, 1,
+                                15, 6, 5])
+        correct = [13, 7, 10, 8, 11, 9, 10, 7, 2, 7, 7, 12, 0, 5, 4, 12]
+        self.assertEqual(int_to_nibbles(self.gift64.sub_cells_inv(state), 16),
+                         correct, "Inverse S-box not applied correctly")
+
+
+class TestPermBits(unittest.TestCase):
+    """
+    Unit tests for the perm_bits method of the packed GIFT-64 class.
+    """
+
+    def setUp(self):
+        # set up packed GIFT-64 object
+        self.gift64 = Gift64Packed()
+
+    def test_perm_bits(self):
+        """
+        Test vector 1
+        """
+
+        state = nibbles_to_int([1, 10, 4, 12, 6, 15, 3, 9, 2, 13, 11, 7, 5,
+                                0, 8, 14])
+        correct = [15, 10, 0, 9, 0, 7, 15, 8, 8, 13, 11, 6, 4, 3, 7, 4]
+        self.assertEqual(int_to_nibbles(self.gift64.perm_bits(state), 16),
+                         correct, "P-box not applied correctly")
+
+    def test_perm_bits_inv(self):
+        """
+        Test vector 2
+        """
+
+        state = nibbles_to_int([0, 9, 0, 7, 8, 15, 9, 5, 11, 13, 13, 8, 3,
+                                3, 5, 7])
+        correct = [0, 9, 11, 2, 7, 13, 11, 9, 4, 9, 9, 5, 1, 15, 6, 5]
+        self.assertEqual(int_to_nibbles(self.gift64.perm_bits_inv(state), 16),
+                         correct, "Inverse P-box not applied correctly")
+
+
+# INTEGRATION TESTS
+class TestEncryptBlock(unittest.TestCase):
+    """
+    Integration tests for the encrypt_block method of the packed GIFT-64
+    class. The test vectors match those of the GIFT-64 class.
+    """
+
+    def setUp(self):
+        # set up packed GIFT-64 object
+        self.gift64 = Gift64Packed()
+
+    def test_encrypt_block(self):
+        """
+        Test vector 1
+        """
+
+        state = [13, 7, 10, 8, 11, 9, 10, 7, 2, 7, 7, 12, 0, 5, 4, 12]
+        key = [7, 14, 4, 4, 0, 5, 7, 12, 15, 15, 6, 15, 9, 15, 1, 10, 3, 1, 7,
+               2, 12, 11, 6, 11, 14, 1, 3, 7, 1, 9, 13, 11]
+        correct = [11, 8, 10, 11, 4, 9, 10, 15, 5, 8, 8, 2, 7, 2, 3, 14]
+        self.assertEqual(self.gift64.encrypt_block(state, key), correct,
+                         "Block not encrypted correctly")
+
+    def test_encrypt_block2(self):
+        """
+        Test vector 2
+        """
+
+        state = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]
+        key = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15,
+               0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]
+        correct = [7, 8, 5, 15, 15, 0, 6, 1, 6, 6, 15, 1, 7, 11, 1, 12]
+
+        self.assertEqual(self.gift64.encrypt_block(state, key), correct,
+                         "Block not encrypted correctly")
+
+    def test_encrypt_block3(self):
+        """
+        Test vector 3
+        """
+
+        state = [0] * 16
+        key = [0] * 32
+        correct = [12, 10, 5, 7, 7, 15, 4, 3, 15, 14, 3, 12, 11, 2, 6, 15]
+
+        self.assertEqual(self.gift64.encrypt_block(state, key), correct,
+                         "Block not encrypted correctly")
+
+
+class TestDecryptBlock(unittest.TestCase):
+    """
+    Integration tests for the decrypt_block method of the packed GIFT-64
+    class. The test vectors match those of the GIFT-64 class.
+    """
+
+    def setUp(self):
+        # set up packed GIFT-64 object
+        self.gift64 = Gift64Packed()
+
+    def test_decrypt_block(self):
+        """
+        Test vector 1
+        """
+
+        correct = [13, 7, 10, 8, 11, 9, 10, 7, 2, 7, 7, 12, 0, 5, 4, 12]
+        key = [7, 14, 4, 4, 0, 5, 7, 12, 15, 15, 6, 15, 9, 15, 1, 10, 3, 1, 7,
+               2, 12, 11, 6, 11, 14, 1, 3, 7, 1, 9, 13, 11]
+        state = [11, 8, 10, 11, 4, 9, 10, 15, 5, 8, 8, 2, 7, 2, 3, 14]
+        self.assertEqual(self.gift64.decrypt_block(state, key), correct,
+                         "Block not decrypted correctly")
+
+    def test_decrypt_block2(self):
+        """
+        Test vector 2
+        """
+
+        correct = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]
+        key = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15,
+               0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]
+        state = [7, 8, 5, 15, 15, 0, 6, 1, 6, 6, 15, 1, 7, 11, 1, 12]
+
+        self.assertEqual(self.gift64.decrypt_block(state, key), correct,
+                         "Block not decrypted correctly")
+
+    def test_decrypt_block3(self):
+        """
+        Test vector 3
+        """
+
+        correct = [0] * 16
+        key = [0] * 32
+        state = [12, 10, 5, 7, 7, 15, 4, 3, 15, 14, 3, 12, 11, 2, 6, 15]
+
+        self.assertEqual(self.gift64.decrypt_block(state, key), correct,
+                         "Block not decrypted correctly")
+
+
+class TestBlockBytes(unittest.TestCase):
+    """
+    Integration tests for the encrypt_block_bytes and decrypt_block_bytes
+    methods of the packed GIFT-64 class.
+    """
+
+    def setUp(self):
+        # set up packed GIFT-64 object
+        self.gift64 = Gift64Packed()
+
+    def test_encrypt_block_bytes(self):
+        """
+        Test vector 1
+        """
+
+        state = bytes.fromhex("d7a8b9a7277c054c")
+        key = bytes.fromhex("7e44057cff6f9f1a3172cb6be13719db")
+        correct = bytes.fromhex("b8ab49af5882723e")
+
+        self.assertEqual(self.gift64.encrypt_block_bytes(state, key),
+                         correct, "Block not encrypted correctly")
+
+    def test_decrypt_block_bytes(self):
+        """
+        Test vector 1
+        """
+
+        state = memoryview(bytes.fromhex("b8ab49af5882723e"))
+        key = self.gift64.expand_key_bytes(
+            bytes.fromhex("7e44057cff6f9f1a3172cb6be13719db"))
+        correct = bytes.fromhex("d7a8b9a7277c054c")
+
+        self.assertEqual(self.gift64.decrypt_block_bytes(state, key),
+                         correct, "Block not decrypted correctly")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -106,6 +106,102 @@ class TestTriple(unittest.TestCase):
         self.assertEqual(c.triple(L), correct, "Triple applied incorrectly")
 
 
+class TestDeltaInt(unittest.TestCase):
+    """
+    Unit tests for L held as an int and the ladder of masks
+    """
+
+    def test_double_delta(self):
+        """
+        Unit test for doubling and tripling L as an int - same test vector as
+        the double and triple methods
+        """
+
+        L = 0xA94AF7F9BA181DF9
+        self.assertEqual(double_delta(L), 0x5295EFF374303BE9,
+                         "Double incorrectly applied")
+        self.assertEqual(triple_delta(L), 0xFBDF180ACE282610,
+                         "Triple applied incorrectly")
+
+    def test_nibbles_to_delta(self):
+        """
+        Unit test for converting L between nibbles and an int
+        """
+
+        L = [10, 9, 4, 10, 15, 7, 15, 9, 11, 10, 1, 8, 1, 13, 15, 9]
+        self.assertEqual(nibbles_to_delta(L), 0xA94AF7F9BA181DF9,
+                         "Incorrect int")
+        self.assertEqual(delta_to_nibbles(0xA94AF7F9BA181DF9), L,
+                         "Incorrect nibbles")
+
+    def test_ladder_mask(self):
+        """
+        Unit test for fetching 3^k · 2^j · L from the ladder - must match
+        doubling and tripling step by step
+        """
+
+        L = 0xA94AF7F9BA181DF9
+        ladder = delta_ladder(L, 12)
+        for doublings in range(0, 6):
+            for triplings in range(0, 5):
+                correct = L
+                for i in range(0, doublings):
+                    correct = double_delta(correct)
+                for i in range(0, triplings):
+                    correct = triple_delta(correct)
+                self.assertEqual(ladder_mask(ladder, doublings, triplings),
+                                 correct, "Incorrect mask")
+
+
+class TestBlockInt(unittest.TestCase):
+    """
+    Unit tests for holding blocks as 128-bit ints
+    """
+
+    def test_block_to_int(self):
+        """
+        Unit test for packing and unpacking a block, including a short block
+        with an odd number of nibbles
+        """
+
+        block = list(range(16)) * 2
+        value = 0x0123456789ABCDEF0123456789ABCDEF
+        self.assertEqual(block_to_int(block), value, "Incorrect int")
+        self.assertEqual(int_to_block(value, 32), block, "Incorrect block")
+
+        self.assertEqual(block_to_int([10, 11, 12]), 0xABC << 116,
+                         "Incorrect int")
+        self.assertEqual(int_to_block(0xABC << 116, 3), [10, 11, 12],
+                         "Incorrect block")
+        self.assertEqual(block_to_int([]), 0, "Incorrect int")
+
+    def test_pad_block_int(self):
+        """
+        Unit test for padding a block held as an int - must match
+        apply_padding
+        """
+
+        for length in [0, 1, 5, 31, 32]:
+            block = [(3 * i + 1) % 16 for i in range(length)]
+            self.assertEqual(pad_block_int(block_to_int(block), length),
+                             block_to_int(apply_padding(block[:], 128)),
+                             "Incorrect padding")
+            self.assertEqual(truncate_block_int((1 << 128) - 1, length),
+                             block_to_int([15] * length),
+                             "Incorrect truncation")
+
+    def test_G_int(self):
+        """
+        Unit test for G on an int
+        """
+
+        c = GiftCofb()
+        Y = 0x0123456789ABCDEFFEDCBA9876543210
+        self.assertEqual(c.G_int(Y), 0xFEDCBA987654321002468ACF13579BDE,
+                         "Incorrect result")
+        self.assertEqual(c.G_int(1 << 127), 1, "Incorrect rotation")
+
+
 class TestG(unittest.TestCase):
     """
     Unit tests for the G method of GIFT-COFB
@@ -357,5 +453,210 @@ class TestVerify(unittest.TestCase):
                          "Incorrect result")
 
 
+class TestGiftCofbStream(unittest.TestCase):
+    """
+    Integration tests for the incremental GIFT-COFB class - same test
+    vectors as the GIFT COFB class tests
+    """
+
+    def setUp(self):
+        # key and nonce shared by the test vectors
+        self.K = bytes.fromhex("000102030405060708090A0B0C0D0E0F")
+        self.N = bytes.fromhex("000102030405060708090A0B0C0D0E0F")
+
+    def test_encrypt_empty(self):
+        """
+        Integration test - encrypt empty P and AD
+        """
+
+        stream = GiftCofbStream(self.K, self.N)
+
+        self.assertEqual(stream.finalize(), (b"", bytes.fromhex(
+            "368965836D36614DE2FC24D0F801B9AF")), "Incorrect result")
+
+    def test_encrypt_incomplete(self):
+        """
+        Integration test - encrypt incomplete P and AD, given in parts
+        """
+
+        stream = GiftCofbStream(self.K, self.N)
+        stream.update_ad(bytes.fromhex("0001"))
+        stream.update_ad(bytes.fromhex("020304"))
+        ciphertext = stream.update_encrypt(bytes.fromhex("0001"))
+        last, tag = stream.finalize()
+
+        self.assertEqual(ciphertext + last, bytes.fromhex("C439"),
+                         "Incorrect ciphertext")
+        self.assertEqual(tag, bytes.fromhex(
+            "E8423E2707410956CC3B3A1E07AC6EE2"), "Incorrect tag")
+
+    def test_encrypt_complete(self):
+        """
+        Integration test - encrypt complete P and AD, split part way through
+        a block
+        """
+
+        data = bytes.fromhex("000102030405060708090A0B0C0D0E0F"
+                             "101112131415161718191A1B1C1D1E1F")
+        stream = GiftCofbStream(self.K, self.N)
+        stream.update_ad(data)
+        ciphertext = stream.update_encrypt(data[:20])
+        ciphertext += stream.update_encrypt(data[20:])
+        last, tag = stream.finalize()
+
+        self.assertEqual(ciphertext + last, bytes.fromhex(
+            "BAF563C60FBEDDC5662995F4C678BE80"
+            "A7F7DE9B3AD8C97AA6CA17016D2AE650"), "Incorrect ciphertext")
+        self.assertEqual(tag, bytes.fromhex(
+            "8E6FB3F79B412A1627AB7DFA755E0A22"), "Incorrect tag")
+
+    def test_decrypt_complete(self):
+        """
+        Integration test - decrypt complete C and AD
+        """
+
+        data = bytes.fromhex("000102030405060708090A0B0C0D0E0F"
+                             "101112131415161718191A1B1C1D1E1F")
+        stream = GiftCofbStream(self.K, self.N)
+        stream.update_ad(data)
+        plaintext = stream.update_decrypt(bytes.fromhex(
+            "BAF563C60FBEDDC5662995F4C678BE80"
+            "A7F7DE9B3AD8C97AA6CA17016D2AE650"))
+        last, tag = stream.finalize()
+
+        self.assertEqual(plaintext + last, data, "Incorrect plaintext")
+        self.assertEqual(tag, bytes.fromhex(
+            "8E6FB3F79B412A1627AB7DFA755E0A22"), "Incorrect tag")
+
+    def test_finalize_verify(self):
+        """
+        Integration test - decrypt and verify complete C and AD, with the
+        correct tag and a tampered one
+        """
+
+        data = bytes.fromhex("000102030405060708090A0B0C0D0E0F"
+                             "101112131415161718191A1B1C1D1E1F")
+        ciphertext = bytes.fromhex("BAF563C60FBEDDC5662995F4C678BE80"
+                                   "A7F7DE9B3AD8C97AA6CA17016D2AE650")
+        tags = ["8E6FB3F79B412A1627AB7DFA755E0A22",
+                "8E6FB3F79B412A1627AB7DFA755E0A23"]
+
+        for tag, correct in zip(tags, [True, False]):
+            stream = GiftCofbStream(self.K, self.N)
+            stream.update_ad(data)
+            plaintext = stream.update_decrypt(ciphertext)
+            last, verified = stream.finalize_verify(bytes.fromhex(tag))
+
+            self.assertEqual(plaintext + last, data, "Incorrect plaintext")
+            self.assertEqual(verified, correct, "Incorrect verification")
+
+        stream = GiftCofbStream(self.K, self.N)
+        stream.update_ad(data)
+        stream.update_decrypt(ciphertext)
+        self.assertEqual(stream.finalize_verify(tags[0]), (data[16:], True),
+                         "Incorrect verification")
+
+    def test_split_calls(self):
+        """
+        Integration test - one call with many blocks (as a memoryview) gives
+        the same result as one call per byte
+        """
+
+        data = bytes(range(0, 200))
+        stream = GiftCofbStream(self.K, self.N)
+        stream.update_ad(memoryview(data))
+        ciphertext = stream.update_encrypt(memoryview(data))
+        correct = (ciphertext,) + stream.finalize()
+
+        stream = GiftCofbStream(self.K, self.N)
+        for i in range(0, len(data)):
+            stream.update_ad(data[i:i + 1])
+        ciphertext = b"".join(stream.update_encrypt(data[i:i + 1])
+                              for i in range(0, len(data)))
+
+        self.assertEqual((ciphertext,) + stream.finalize(), correct,
+                         "Incorrect result")
+
+    def test_order(self):
+        """
+        Unit test for calls in the wrong order
+        """
+
+        stream = GiftCofbStream(self.K, self.N)
+        stream.update_encrypt(b"\x00")
+        with self.assertRaises(ValueError):
+            stream.update_ad(b"\x00")
+        with self.assertRaises(ValueError):
+            stream.update_decrypt(b"\x00")
+        stream.finalize()
+        with self.assertRaises(ValueError):
+            stream.finalize()
+
+    def test_blocks_unchanged(self):
+        """
+        Unit test for GiftCofb.encrypt leaving the caller's blocks unpadded
+        """
+
+        K = list(split_nibbles(self.K))
+        M = [[0, 0]]
+        A = [[0, 0, 0, 1]]
+        GiftCofb().encrypt(M, K, A, K[:])
+
+        self.assertEqual((M, A), ([[0, 0]], [[0, 0, 0, 1]]),
+                         "Blocks changed")
+
+
+class TestMany(unittest.TestCase):
+    """
+    Integration tests for encrypting and verifying many GIFT-COFB messages
+    under one key - must match encrypt and verify
+    """
+
+    def setUp(self):
+        # key and a set of messages with different nonces, associated data
+        # and plaintext lengths (empty, incomplete, full and several blocks)
+        self.c = GiftCofb()
+        self.K = [i % 16 for i in range(32)]
+        self.messages = []
+        for i, (m_len, a_len) in enumerate([(0, 0), (4, 0), (0, 10),
+                                            (32, 32), (70, 40)]):
+            N = [(i + 3 * j) % 16 for j in range(32)]
+            A = divide_into_blocks([(7 * j) % 16 for j in range(a_len)],
+                                   128, 3)
+            M = divide_into_blocks([(5 * j + i) % 16 for j in range(m_len)],
+                                   128, 3)
+            self.messages.append((N, A, M))
+
+    def test_encrypt_many(self):
+        """
+        Integration test for encrypt_many and verify_many
+        """
+
+        correct = [self.c.encrypt(M, self.K, A, N)
+                   for N, A, M in self.messages]
+        results = self.c.encrypt_many(self.messages, self.K)
+        self.assertEqual(results, correct, "Incorrect result")
+
+        # every tag verifies, bar one that has been changed - an empty
+        # ciphertext is given as [[]], as for verify
+        to_verify = [(N, A, C or [[]], T) for (N, A, M), (C, T)
+                     in zip(self.messages, results)]
+        to_verify[1] = to_verify[1][0:3] + ([0] * 32,)
+        plaintexts = self.c.verify_many(to_verify, self.K)
+        self.assertEqual(plaintexts[1], [-1], "Incorrect tag verified")
+        self.assertEqual([plaintexts[0]] + plaintexts[2:],
+                         [self.c.verify(C, self.K, A, N, T)
+                          for N, A, C, T in [to_verify[0]] + to_verify[2:]],
+                         "Incorrect plaintext")
+
+    def test_encrypt_many_empty(self):
+        """
+        Unit test for encrypt_many with no messages
+        """
+
+        self.assertEqual(self.c.encrypt_many([], self.K), [],
+                         "Incorrect result")
+
+
 if __name__ == '__main__':
     unittest.main()
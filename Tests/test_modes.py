@@ -8,6 +8,9 @@ sys.path.append('..')
 import unittest
 from Gift.gift_64 import *
 from RC4 import *
+from Gift.gift_64_packed import Gift64Packed
+from Gift.gift_128_table import Gift128Table
+from modes import *
 
 
 class TestECBMode(unittest.TestCase):
@@ -207,5 +210,305 @@ class TestECBMode(unittest.TestCase):
                          "Decrypted message does not equal original message")
 
 
+class TestModesModule(unittest.TestCase):
+    """
+    Unit tests for the buffer based modes in the modes module - compared
+    against the nibble list code extracted from main.py above
+    """
+
+    def setUp(self):
+        # Set up GIFT-64 objects and a four block message
+        self.gift64 = Gift64()
+        self.packed = Gift64Packed()
+        self.key = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15,
+                    0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]
+        self.key_bytes = bytes.fromhex(list_to_string(self.key))
+        self.state = [[i, 15 - i, 3, 9, 1, 12, 7, 0, 5, i, 2, 14, 8, 6, 11, 4]
+                      for i in range(4)]
+        self.data = bytes.fromhex(list_to_string(self.state))
+
+    def test_ecb(self):
+        """
+        Unit test for ECB mode - must match encrypting each block, and
+        decrypting must give the original message
+        """
+
+        correct = [self.gift64.encrypt_block(block[:], self.key)
+                   for block in self.state]
+        ciphertext = ecb_encrypt(self.packed, self.key_bytes, self.data, 64)
+
+        self.assertEqual(ciphertext.hex().upper(), list_to_string(correct),
+                         "Incorrect ciphertext")
+        self.assertEqual(ecb_decrypt(self.packed, self.key_bytes, ciphertext,
+                                     64), self.data, "Incorrect plaintext")
+
+    def test_cbc(self):
+        """
+        Unit test for CBC mode - must match the extracted CBC code, and
+        decrypting in place must give the original message
+        """
+
+        IV = run_RC4(self.key, 64 // 8)
+        y = IV
+        correct = []
+        for block in self.state:
+            y = self.gift64.encrypt_block(xor_bits(block, y), self.key)
+            correct.append(y)
+
+        IV = bytes.fromhex(list_to_string(IV))
+        ciphertext = cbc_encrypt(self.packed, self.key_bytes, IV, self.data,
+                                 64)
+        self.assertEqual(ciphertext.hex().upper(), list_to_string(correct),
+                         "Incorrect ciphertext")
+
+        # decrypt in place, writing over the ciphertext buffer
+        result = cbc_decrypt(self.packed, self.key_bytes, IV, ciphertext, 64,
+                             out=memoryview(ciphertext))
+        self.assertEqual(ciphertext, self.data, "Incorrect plaintext")
+        self.assertIsInstance(result, memoryview, "Output buffer not returned")
+
+    def test_ctr(self):
+        """
+        Unit test for CTR mode - must match encrypting each counter block
+        and XORing it to the message, and running it twice must give the
+        original message
+        """
+
+        counter = bytes.fromhex(list_to_string(run_RC4(self.key, 64 // 8)))
+        value = int.from_bytes(counter, "big")
+        correct = []
+        for i, block in enumerate(self.state):
+            IV = string_to_list("%016X" % (value + i))
+            correct.append(xor_bits(block,
+                                    self.gift64.encrypt_block(IV, self.key)))
+
+        out = bytearray(len(self.data))
+        ciphertext = ctr_encrypt(self.packed, self.key_bytes, counter,
+                                 self.data, 64, out=out)
+        self.assertIs(ciphertext, out, "Output buffer not used")
+        self.assertEqual(ciphertext.hex().upper(), list_to_string(correct),
+                         "Incorrect ciphertext")
+        self.assertEqual(ctr_encrypt(self.packed, self.key_bytes, counter,
+                                     ciphertext, 64), self.data,
+                         "Incorrect plaintext")
+
+    def test_ctr_counter_carry(self):
+        """
+        Unit test for the CTR counter - a full width counter, so incrementing
+        carries past the last byte and wraps round to all zeros
+        """
+
+        counter = bytes.fromhex("FFFFFFFFFFFFFFFE")
+        blocks = bytes.fromhex("FFFFFFFFFFFFFFFEFFFFFFFFFFFFFFFF"
+                               "0000000000000000")
+
+        self.assertEqual(keystream_at(self.packed, self.key_bytes, counter, 0,
+                                      64, 3),
+                         bytes(ecb_encrypt(self.packed, self.key_bytes,
+                                           blocks, 64)),
+                         "Incorrect keystream")
+
+    def test_ctr_block_range(self):
+        """
+        Unit test for decrypting a range of blocks on its own in CTR mode
+        """
+
+        counter = bytes(range(8))
+        ciphertext = ctr_encrypt(self.packed, self.key_bytes, counter,
+                                 self.data, 64)
+
+        self.assertEqual(keystream_at(self.packed, self.key_bytes, counter, 2,
+                                      64), xor_bytes(ciphertext[16:24],
+                                                     self.data[16:24]),
+                         "Incorrect keystream")
+        self.assertEqual(ctr_encrypt(self.packed, self.key_bytes, counter,
+                                     ciphertext[8:24], 64, first_block=1),
+                         self.data[8:24], "Incorrect plaintext")
+
+    def test_chunk_boundary(self):
+        """
+        Unit test for messages longer than one chunk of min_chunk_blocks
+        blocks - CTR must match the keystream, and CBC decryption in place
+        must carry the chain across the chunks
+        """
+
+        data = bytes(range(256)) * (8 * min_chunk_blocks // 256 + 1)
+        counter = bytes(range(8))
+        keystream = keystream_at(self.packed, self.key_bytes, counter, 0, 64,
+                                 len(data) // 8)
+
+        self.assertEqual(ctr_encrypt(self.packed, self.key_bytes, counter,
+                                     data, 64), xor_bytes(data, keystream),
+                         "Incorrect ciphertext")
+
+        IV = bytes(range(8, 16))
+        ciphertext = cbc_encrypt(self.packed, self.key_bytes, IV, data, 64)
+        cbc_decrypt(self.packed, self.key_bytes, IV, ciphertext, 64,
+                    out=ciphertext)
+        self.assertEqual(ciphertext, data, "Incorrect plaintext")
+
+    def test_cbc_mac(self):
+        """
+        Unit test for CBC-MAC - must match the extracted CBC-MAC code
+        """
+
+        tag = [0] * 16
+        for block in self.state:
+            tag = self.gift64.encrypt_block(xor_bits(block, tag), self.key)
+
+        self.assertEqual(cbc_mac(self.packed, self.key_bytes, self.data,
+                                 64).hex().upper(), list_to_string(tag),
+                         "Incorrect tag")
+
+    def test_gift_128(self):
+        """
+        Unit test for a 128-bit block cipher - CBC decryption must reverse
+        CBC encryption
+        """
+
+        cipher = Gift128Table()
+        data = bytes(range(48))
+        IV = bytes(range(100, 116))
+
+        ciphertext = cbc_encrypt(cipher, self.key_bytes, IV, data, 128)
+        self.assertEqual(cbc_decrypt(cipher, self.key_bytes, IV, ciphertext,
+                                     128), data, "Incorrect plaintext")
+
+    def test_partial_block(self):
+        """
+        Unit test for input errors - data must be a whole number of blocks
+        and the output buffer must be the same length
+        """
+
+        with self.assertRaises(ValueError):
+            ecb_encrypt(self.packed, self.key_bytes, self.data[:-1], 64)
+        with self.assertRaises(ValueError):
+            ecb_encrypt(self.packed, self.key_bytes, self.data, 64,
+                        out=bytearray(8))
+
+
+class TestParallelModes(unittest.TestCase):
+    """
+    Unit tests for the parallel modes - must match the serial modes
+    """
+
+    def setUp(self):
+        # Set up a packed GIFT-64 object, key and a ten block message
+        self.packed = Gift64Packed()
+        self.key = bytes(range(16))
+        self.data = bytes(range(80))
+
+    def test_ecb_parallel(self):
+        """
+        Unit test for parallel ECB mode, split across two worker processes
+        """
+
+        correct = ecb_encrypt(self.packed, self.key, self.data, 64)
+        ciphertext = ecb_encrypt_parallel(self.packed, self.key, self.data, 64,
+                                          workers=2, chunk_blocks=3)
+
+        self.assertEqual(ciphertext, correct, "Incorrect ciphertext")
+        self.assertEqual(ecb_decrypt_parallel(self.packed, self.key,
+                                              ciphertext, 64, workers=2,
+                                              chunk_blocks=4), self.data,
+                         "Incorrect plaintext")
+
+    def test_ecb_parallel_one_worker(self):
+        """
+        Unit test for parallel ECB mode run in this process, writing into a
+        supplied buffer
+        """
+
+        correct = ecb_encrypt(self.packed, self.key, self.data, 64)
+        out = bytearray(len(self.data))
+
+        self.assertIs(ecb_encrypt_parallel(self.packed, self.key, self.data,
+                                           64, out=out, workers=1,
+                                           chunk_blocks=3), out,
+                      "Output buffer not used")
+        self.assertEqual(out, correct, "Incorrect ciphertext")
+
+    def test_cbc_decrypt_parallel(self):
+        """
+        Unit test for parallel CBC decryption, split across two worker
+        processes and writing over the ciphertext buffer
+        """
+
+        IV = bytes(range(8, 16))
+        ciphertext = cbc_encrypt(self.packed, self.key, IV, self.data, 64)
+
+        cbc_decrypt_parallel(self.packed, self.key, IV, ciphertext, 64,
+                             out=ciphertext, workers=2, chunk_blocks=3)
+        self.assertEqual(ciphertext, self.data, "Incorrect plaintext")
+
+    def test_ctr_parallel(self):
+        """
+        Unit test for parallel CTR mode, split across two worker processes
+        """
+
+        counter = bytes(range(8))
+        correct = ctr_encrypt(self.packed, self.key, counter, self.data, 64)
+
+        self.assertEqual(ctr_encrypt_parallel(self.packed, self.key, counter,
+                                              self.data, 64, workers=2,
+                                              chunk_blocks=3), correct,
+                         "Incorrect ciphertext")
+
+
+class TestCbcMac(unittest.TestCase):
+    """
+    Unit tests for the incremental CBC-MAC object
+    """
+
+    def setUp(self):
+        # Set up a packed GIFT-64 object, key and a 21 byte message
+        self.packed = Gift64Packed()
+        self.key = bytes(range(16))
+        self.message = bytes(range(21))
+
+    def test_update(self):
+        """
+        Unit test for giving the message in parts - must match cbc_mac over
+        the padded message however the message is split
+        """
+
+        correct = cbc_mac(self.packed, self.key,
+                          pad_bytes(self.message, 64), 64)
+
+        for split in [0, 3, 8, 13, 21]:
+            mac = CbcMac(self.packed, self.key, 64, self.message[:split])
+            mac.update(memoryview(self.message)[split:])
+            self.assertEqual(mac.digest(), correct, "Incorrect tag")
+            self.assertLess(len(mac.buffer), 8, "Whole block buffered")
+
+    def test_matches_tool(self):
+        """
+        Unit test for the tag - must match the extracted CBC-MAC code over
+        the message padded by divide_into_blocks
+        """
+
+        blocks = divide_into_blocks(string_to_list(self.message.hex()), 64, 1)
+        key = string_to_list(self.key.hex())
+        tag = [0] * 16
+        for block in blocks:
+            tag = Gift64().encrypt_block(xor_bits(block, tag), key)
+
+        mac = CbcMac(self.packed, self.key, 64, self.message)
+        self.assertEqual(mac.hexdigest(), list_to_string(tag),
+                         "Incorrect tag")
+
+    def test_verify(self):
+        """
+        Unit test for verifying a correct and an incorrect tag
+        """
+
+        mac = CbcMac(self.packed, self.key, 64, self.message)
+        tag = mac.digest()
+
+        self.assertTrue(mac.verify(tag), "Correct tag not verified")
+        self.assertTrue(mac.verify(tag.hex()), "Correct tag not verified")
+        self.assertFalse(mac.verify(bytes(8)), "Incorrect tag verified")
+
+
 if __name__ == '__main__':
     unittest.main()
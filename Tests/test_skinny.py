@@ -6,6 +6,8 @@ methods
 import sys
 sys.path.append('..')
 import unittest
+from contextlib import redirect_stdout
+from io import StringIO
 from Skinny.skinny import *
 
 
@@ -1357,5 +1359,101 @@ class TestDecryptBlock(unittest.TestCase):
                          "Block not decrypted correctly")
 
 
+class TestExpandKey(unittest.TestCase):
+    """
+    Integration tests for the expand_key method of the SKINNY class - an
+    expanded key can be used in place of the key, and the tweakey schedule
+    is cached per version and key.
+    """
+
+    def test_expand_key_cached(self):
+        """
+        Integration test for caching the SKINNY-64-128 tweakey schedule
+        """
+
+        skinny = Skinny([64, 128, 36])
+
+        key = [9, 14, 11, 9, 3, 6, 4, 0, 13, 0, 8, 8, 13, 10, 6, 3, 7, 6, 10,
+               3, 9, 13, 1, 12, 8, 11, 14, 10, 7, 1, 14, 1]
+
+        expanded = skinny.expand_key(key)
+
+        self.assertIs(Skinny([64, 128, 36]).expand_key(key[:]), expanded,
+                      "Tweakey schedule not cached")
+        self.assertEqual(len(expanded.round_keys), 36,
+                         "Wrong number of round tweakeys")
+
+    def test_calculate_round_tweakeys(self):
+        """
+        Integration test for folding the SKINNY-64-192 tweakey arrays
+        """
+
+        skinny = Skinny([64, 192, 40])
+
+        key = [14, 13, 0, 0, 12, 8, 5, 11, 1, 2, 0, 13, 6, 8, 6, 1, 8, 7, 5,
+               3, 14, 2, 4, 11, 15, 13, 9, 0, 8, 15, 6, 0, 11, 2, 13, 11,
+               11, 4, 1, 11, 4, 2, 2, 13, 15, 12, 13, 0]
+
+        # fold the first two rows of the tweakey arrays round by round
+        TW = skinny.initialise_key(key)
+        correct = []
+        for i in range(0, 40):
+            correct.append(skinny.add_round_tweakey([[0] * 4, [0] * 4], TW))
+            TW = skinny.update_tweakey_arrays(TW)
+
+        self.assertEqual(skinny.calculate_round_tweakeys(key), correct,
+                         "Round tweakeys not calculated correctly")
+
+    def test_encrypt_decrypt_expanded_key(self):
+        """
+        Integration test for SKINNY-128-256 with an expanded key
+        """
+
+        skinny = Skinny([128, 256, 48])
+
+        plaintext = [3, 10, 0, 12, 4, 7, 7, 6, 7, 10, 2, 6, 10, 6, 8, 13, 13,
+                     3, 8, 2, 10, 6, 9, 5, 14, 7, 0, 2, 2, 14, 2, 5]
+        key = [0, 0, 9, 12, 14, 12, 8, 1, 6, 0, 5, 13, 4, 10, 12, 1, 13, 2, 10,
+               14, 9, 14, 3, 0, 8, 5, 13, 7, 10, 1, 15, 3, 1, 10, 12, 1, 2, 3,
+               14, 11, 15, 12, 0, 0, 15, 13, 13, 12, 15, 0, 1, 0, 4, 6, 12,
+               14, 14, 13, 13, 15, 12, 10, 11, 3]
+        correct = [11, 7, 3, 1, 13, 9, 8, 10, 4, 11, 13, 14, 1, 4, 7, 10, 7,
+                   14, 13, 4, 10, 6, 15, 1, 6, 11, 9, 11, 5, 8, 7, 15]
+        expanded = skinny.expand_key(key)
+
+        self.assertEqual(skinny.encrypt_block(plaintext[:], expanded),
+                         correct, "Block not encrypted correctly")
+        self.assertEqual(skinny.decrypt_block(correct, expanded), plaintext,
+                         "Block not decrypted correctly")
+
+
+    def test_set_steps(self):
+        """
+        Integration test for a key expanded by the word oriented engine,
+        then used once set_steps has switched to the nibble based rounds -
+        the tweakey schedule is expanded again
+        """
+
+        skinny = Skinny([128, 256, 48], words=True)
+
+        plaintext = [3, 10, 0, 12, 4, 7, 7, 6, 7, 10, 2, 6, 10, 6, 8, 13, 13,
+                     3, 8, 2, 10, 6, 9, 5, 14, 7, 0, 2, 2, 14, 2, 5]
+        key = [0, 0, 9, 12, 14, 12, 8, 1, 6, 0, 5, 13, 4, 10, 12, 1, 13, 2, 10,
+               14, 9, 14, 3, 0, 8, 5, 13, 7, 10, 1, 15, 3, 1, 10, 12, 1, 2, 3,
+               14, 11, 15, 12, 0, 0, 15, 13, 13, 12, 15, 0, 1, 0, 4, 6, 12,
+               14, 14, 13, 13, 15, 12, 10, 11, 3]
+        correct = [11, 7, 3, 1, 13, 9, 8, 10, 4, 11, 13, 14, 1, 4, 7, 10, 7,
+                   14, 13, 4, 10, 6, 15, 1, 6, 11, 9, 11, 5, 8, 7, 15]
+        expanded = skinny.expand_key(key)
+        skinny.set_steps()
+
+        # the intermediate steps printed are not needed
+        with redirect_stdout(StringIO()):
+            self.assertEqual(skinny.encrypt_block(plaintext[:], expanded),
+                             correct, "Block not encrypted correctly")
+        self.assertEqual(skinny.expand_key(expanded).schedule,
+                         skinny.key_schedule, "Key not expanded again")
+
+
 if __name__ == '__main__':
     unittest.main()
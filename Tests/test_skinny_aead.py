@@ -35,6 +35,47 @@ class TestApplyLFSR(unittest.TestCase):
                          "Incorrect result")
 
 
+class TestLFSRInt(unittest.TestCase):
+    """
+    Unit tests for the int LFSR functions - must match the LFSR methods
+    """
+
+    def setUp(self):
+        # set up the SKINNY AEAD object(s)
+        self.SKINNY_AEAD = SkinnyAead("M1", Skinny([128, 384, 56]))
+
+    def test_lfsr_step(self):
+        """
+        Unit test for stepping the LFSR, including the feedback
+        """
+
+        self.assertEqual(lfsr_step(1), 2, "Incorrect result")
+        self.assertEqual(lfsr_step(0x8000000000000001), 0x19,
+                         "Incorrect result")
+
+    def test_lfsr_jump(self):
+        """
+        Unit test for jumping to the LFSR value of a block
+        """
+
+        lfsr = 1
+        for i in range(0, 300):
+            self.assertEqual(lfsr_jump(i), lfsr, "Incorrect result")
+            lfsr = lfsr_step(lfsr)
+
+    def test_reversed_lfsr(self):
+        """
+        Unit test for the byte reversed LFSR values, from the table and
+        past the end of it
+        """
+
+        lfsr = self.SKINNY_AEAD.generate_LFSR()
+        for i in range(0, lfsr_table_size + 70):
+            self.assertEqual(list(reversed_lfsr(i)),
+                             self.SKINNY_AEAD.rev64(lfsr), "Incorrect result")
+            lfsr = self.SKINNY_AEAD.apply_LFSR(lfsr)
+
+
 class TestGenerateLFSR(unittest.TestCase):
     """
     Unit tests for the generate LFSR method of the SKINNY AEAD class
@@ -192,6 +233,9 @@ class TestGenerateTK(unittest.TestCase):
 
         d = 2
         LFSR = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 4]
+        self.assertEqual(self.SKINNY_AEAD.generate_tweakey(d, 2),
+                         self.SKINNY_AEAD.generate_tweakey(d, LFSR),
+                         "Incorrect result for block number")
         correct = [0, 4, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
                    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2, 0, 0, 0, 1, 0, 2,
                    0, 3, 0, 4, 0, 5, 0, 6, 0, 7, 0, 8, 0, 9, 0, 10, 0, 11, 0,
@@ -925,5 +969,220 @@ class TestVerify(unittest.TestCase):
                          "Incorrect result")
 
 
+class TestParallel(unittest.TestCase):
+    """
+    Integration tests for the parallel SKINNY-AEAD methods - must match
+    encrypt and verify
+    """
+
+    def setUp(self):
+        # set up the SKINNY AEAD object(s), key, nonce and a message of
+        # three and a half blocks with associated data of two blocks
+        self.skinny = Skinny([128, 384, 56], words=True)
+        self.K = [i % 16 for i in range(32)]
+        self.N = [(3 * i) % 16 for i in range(32)]
+        self.P = divide_into_blocks([(5 * i) % 16 for i in range(112)], 128,
+                                    3)
+        self.A = divide_into_blocks([(7 * i) % 16 for i in range(64)], 128, 3)
+
+    def test_encrypt_parallel(self):
+        """
+        Integration test for parallel encryption and verification, split
+        across two worker processes
+        """
+
+        for member in ["M1", "M2", "M3", "M4"]:
+            aead = SkinnyAead("SKINNY-AEAD-" + member, self.skinny)
+            N = self.N[0:24] if member in ["M2", "M4"] else self.N
+            correct = aead.encrypt([block[:] for block in self.P], self.K,
+                                   [block[:] for block in self.A], N)
+
+            result = aead.encrypt_parallel(self.P, self.K, self.A, N,
+                                           workers=2, chunk_blocks=2)
+            self.assertEqual(result, correct, "Incorrect result")
+
+            plaintext = aead.verify_parallel(result[0], self.K, self.A, N,
+                                             result[1], workers=2,
+                                             chunk_blocks=2)
+            self.assertEqual(plaintext, self.P, "Incorrect plaintext")
+
+    def test_empty(self):
+        """
+        Integration test for empty plaintext and associated data, and a
+        tag that does not verify
+        """
+
+        aead = SkinnyAead("SKINNY-AEAD-M1", self.skinny)
+        correct = aead.encrypt([[]], self.K, [[]], self.N)
+
+        self.assertEqual(aead.encrypt_parallel([[]], self.K, [[]], self.N),
+                         correct, "Incorrect result")
+        self.assertEqual(aead.verify_parallel([[]], self.K, [[]], self.N,
+                                              [0] * 32), [-1],
+                         "Incorrect tag verified")
+
+
+class TestTweakeyTemplate(unittest.TestCase):
+    """
+    Unit and integration tests for the per (nonce, key) tweakey template
+    """
+
+    def setUp(self):
+        # set up a key, nonce and a message of three and a half blocks with
+        # associated data of two blocks
+        self.K = [i % 16 for i in range(32)]
+        self.N = [(3 * i) % 16 for i in range(32)]
+        self.P = divide_into_blocks([(5 * i) % 16 for i in range(112)], 128,
+                                    3)
+        self.A = divide_into_blocks([(7 * i) % 16 for i in range(64)], 128, 3)
+
+    def test_words_engine(self):
+        """
+        Integration test for encryption with the TK2/TK3 round tweakeys
+        precomputed - must match the nibble based SKINNY
+        """
+
+        for member in ["M1", "M2", "M3", "M4"]:
+            N = self.N[0:24] if member in ["M2", "M4"] else self.N
+            results = []
+            for words in [True, False]:
+                aead = SkinnyAead("SKINNY-AEAD-" + member,
+                                  Skinny([128, 384, 56], words=words))
+                results.append(aead.encrypt([block[:] for block in self.P],
+                                            self.K,
+                                            [block[:] for block in self.A],
+                                            N))
+            self.assertEqual(results[0], results[1], "Incorrect result")
+
+    def test_template_reuse(self):
+        """
+        Unit test for the template - kept while the nonce and key are the
+        same, and rebuilt when the nonce changes
+        """
+
+        aead = SkinnyAead("SKINNY-AEAD-M1", Skinny([128, 384, 56],
+                                                   words=True))
+        aead.nonce = self.N
+        aead.key = self.K
+        template = aead.get_template()
+        self.assertIs(aead.get_template(), template, "Template not reused")
+
+        tk = aead.block_tweakey(2, 5)
+        self.assertEqual(tk.key, aead.generate_tweakey(2, 5),
+                         "Incorrect TK")
+        self.assertEqual(tk.round_keys,
+                         aead.skinny.engine.calculate_round_tweakeys(tk.key),
+                         "Incorrect round tweakeys")
+
+        aead.nonce = self.K
+        self.assertIsNot(aead.get_template(), template,
+                         "Template not rebuilt")
+
+
+class TestMany(unittest.TestCase):
+    """
+    Integration tests for encrypting and verifying many SKINNY-AEAD messages
+    under one key - must match encrypt and verify
+    """
+
+    def setUp(self):
+        # key and a set of messages with different nonces, associated data
+        # and plaintext lengths (empty, incomplete, full and several blocks)
+        self.skinny = Skinny([128, 384, 56], words=True)
+        self.K = [i % 16 for i in range(32)]
+        self.messages = []
+        for i, (m_len, a_len) in enumerate([(0, 0), (4, 0), (0, 10),
+                                            (32, 32), (70, 40)]):
+            N = [(i + 3 * j) % 16 for j in range(32)]
+            A = divide_into_blocks([(7 * j) % 16 for j in range(a_len)],
+                                   128, 3)
+            M = divide_into_blocks([(5 * j + i) % 16 for j in range(m_len)],
+                                   128, 3)
+            self.messages.append((N, A, M))
+
+    def test_encrypt_many(self):
+        """
+        Integration test for encrypt_many and verify_many, for every member
+        """
+
+        for member in ["M1", "M2", "M3", "M4"]:
+            aead = SkinnyAead("SKINNY-AEAD-" + member, self.skinny)
+            messages = [(N[0:24] if member in ["M2", "M4"] else N, A, M)
+                        for N, A, M in self.messages]
+
+            correct = [aead.encrypt([block[:] for block in M], self.K,
+                                    [block[:] for block in A], N)
+                       for N, A, M in messages]
+            results = aead.encrypt_many(messages, self.K)
+            self.assertEqual(results, correct, "Incorrect result")
+
+            # every tag verifies, bar one that has been changed - an empty
+            # ciphertext is given as [[]], as for verify
+            to_verify = [(N, A, C or [[]], T) for (N, A, M), (C, T)
+                         in zip(messages, results)]
+            to_verify[3] = to_verify[3][0:3] + ([0] * len(results[3][1]),)
+            plaintexts = aead.verify_many(to_verify, self.K, workers=2,
+                                          chunk_blocks=2)
+            self.assertEqual(plaintexts[3], [-1], "Incorrect tag verified")
+            self.assertEqual(plaintexts[0:3] + plaintexts[4:],
+                             [[] if M == [[]] else M
+                              for N, A, M in messages[0:3] + messages[4:]],
+                             "Incorrect plaintext")
+
+    def test_batches(self):
+        """
+        Integration test for encrypt_many and verify_many with the messages
+        split into several batches, sharing two worker processes
+        """
+
+        aead = SkinnyAead("SKINNY-AEAD-M1", self.skinny)
+        correct = [aead.encrypt([block[:] for block in M], self.K,
+                                [block[:] for block in A], N)
+                   for N, A, M in self.messages]
+
+        results = aead.encrypt_many(iter(self.messages), self.K, workers=2,
+                                    chunk_blocks=2, batch_size=2)
+        self.assertEqual(results, correct, "Incorrect result")
+
+        to_verify = [(N, A, C or [[]], T) for (N, A, M), (C, T)
+                     in zip(self.messages, results)]
+        self.assertEqual(aead.verify_many(to_verify, self.K, workers=2,
+                                          chunk_blocks=2, batch_size=3),
+                         [[] if M == [[]] else M
+                          for N, A, M in self.messages],
+                         "Incorrect plaintext")
+
+    def test_state_kept(self):
+        """
+        Unit test for encrypt_many and verify_many leaving the nonce and
+        key of the object as they were
+        """
+
+        aead = SkinnyAead("SKINNY-AEAD-M1", self.skinny)
+        aead.encrypt([[]], self.K, [[]], self.messages[0][0])
+        state = (aead.nonce, aead.key, aead.nonce_size, aead.key_size)
+
+        results = aead.encrypt_many(self.messages[1:], self.K[::-1],
+                                    workers=2, chunk_blocks=2)
+        aead.verify_many([(N, A, C or [[]], T) for (N, A, M), (C, T)
+                          in zip(self.messages[1:], results)], self.K[::-1])
+
+        self.assertEqual((aead.nonce, aead.key, aead.nonce_size,
+                          aead.key_size), state, "State changed")
+
+    def test_nibble_skinny(self):
+        """
+        Integration test for encrypt_many with the nibble based SKINNY
+        """
+
+        aead = SkinnyAead("SKINNY-AEAD-M1", Skinny([128, 384, 56]))
+        correct = [aead.encrypt([block[:] for block in M], self.K,
+                                [block[:] for block in A], N)
+                   for N, A, M in self.messages]
+
+        self.assertEqual(aead.encrypt_many(iter(self.messages), self.K),
+                         correct, "Incorrect result")
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,398 @@
+"""
+This file runs unit and integration tests for the word oriented SKINNY
+classes - test vectors are those used for the SKINNY class
+"""
+
+import sys
+sys.path.append('..')
+import unittest
+from Skinny.skinny import Skinny, LFSR
+from Skinny.skinny_packed import *
+from utils import nibbles_to_int, int_to_nibbles
+
+
+class TestLFSR(unittest.TestCase):
+    """
+    Unit tests for the LFSR tables of the word oriented SKINNY classes.
+    """
+
+    def test_lfsr_tk2_128(self):
+        """
+        Test the TK2 LFSR table against the SKINNY LFSR function
+        """
+
+        correct = [LFSR(x, 2, 8) for x in range(256)]
+        self.assertEqual(lfsr_tk2_128, correct, "TK2 LFSR table incorrect")
+
+    def test_lfsr_tk3_128(self):
+        """
+        Test the TK3 LFSR table against the SKINNY LFSR function
+        """
+
+        correct = [LFSR(x, 3, 8) for x in range(256)]
+        self.assertEqual(lfsr_tk3_128, correct, "TK3 LFSR table incorrect")
+
+    def test_lfsr_tk2_64(self):
+        """
+        Test the packed TK2 LFSR against the SKINNY LFSR function - only the
+        first two rows are updated
+        """
+
+        skinny = Skinny64Packed([64, 128, 36])
+        TK = list(range(16))
+        correct = [LFSR(x, 2, 4) for x in TK[0:8]] + TK[8:16]
+
+        self.assertEqual(int_to_nibbles(skinny.lfsr_tk2(nibbles_to_int(TK)),
+                                        16), correct, "TK2 LFSR incorrect")
+
+    def test_lfsr_tk3_64(self):
+        """
+        Test the packed TK3 LFSR against the SKINNY LFSR function - only the
+        first two rows are updated
+        """
+
+        skinny = Skinny64Packed([64, 192, 40])
+        TK = list(range(15, -1, -1))
+        correct = [LFSR(x, 3, 4) for x in TK[0:8]] + TK[8:16]
+
+        self.assertEqual(int_to_nibbles(skinny.lfsr_tk3(nibbles_to_int(TK)),
+                                        16), correct, "TK3 LFSR incorrect")
+
+
+class TestPermuteTweakey(unittest.TestCase):
+    """
+    Unit tests for the permute_tweakey method of the packed SKINNY-64 class.
+    """
+
+    def test_permute_tweakey(self):
+        """
+        Test vector 1
+        """
+
+        skinny = Skinny64Packed([64, 64, 32])
+        TK = nibbles_to_int(list(range(16)))
+        correct = [9, 15, 8, 13, 10, 14, 12, 11, 0, 1, 2, 3, 4, 5, 6, 7]
+
+        self.assertEqual(int_to_nibbles(skinny.permute_tweakey(TK), 16),
+                         correct, "Tweakey permutation incorrect")
+
+
+class TestRows(unittest.TestCase):
+    """
+    Unit tests for loading a block into row words.
+    """
+
+    def test_initialise_rows(self):
+        """
+        Test vector 1
+        """
+
+        skinny = Skinny128Words([128, 128, 40])
+
+        state = [15, 2, 0, 10, 13, 11, 0, 14, 11, 0, 8, 11, 6, 4, 8, 10,
+                 3, 11, 2, 14, 14, 14, 13, 1, 15, 0, 10, 13, 13, 10, 1, 4]
+        correct = (0x0edb0af2, 0x8a648bb0, 0xd1ee2e3b, 0x14daadf0)
+
+        self.assertEqual(skinny.initialise_rows(state), correct,
+                         "Rows not initialised correctly")
+        self.assertEqual(skinny.rows_to_nibbles(correct), state,
+                         "Rows not converted back correctly")
+
+
+# INTEGRATION TESTS
+class TestEncryptBlock(unittest.TestCase):
+    """
+    Integration tests for the encrypt_block method of the SKINNY class with
+    the word oriented engine selected. The test vectors match those of the
+    SKINNY class.
+    """
+
+    def test_encrypt_block_128_128(self):
+        """
+        Integration test for encrypting SKINNY-128-128
+        """
+
+        skinny = Skinny([128, 128, 40], words=True)
+        plaintext = [15, 2, 0, 10, 13, 11, 0, 14, 11, 0, 8, 11, 6, 4, 8, 10,
+                     3, 11, 2, 14, 14, 14, 13, 1, 15, 0, 10, 13, 13, 10, 1, 4]
+        key = [4, 15, 5, 5, 12, 15, 11, 0, 5, 2, 0, 12, 10, 12, 5, 2, 15, 13,
+               9, 2, 12, 1, 5, 15, 3, 7, 0, 7, 3, 14, 9, 3]
+        correct = [2, 2, 15, 15, 3, 0, 13, 4, 9, 8, 14, 10, 6, 2, 13, 7, 14,
+                   4, 5, 11, 4, 7, 6, 14, 3, 3, 6, 7, 5, 11, 7, 4]
+        self.assertEqual(skinny.encrypt_block(plaintext, key), correct,
+                         "Block not encrypted correctly")
+
+    def test_encrypt_block_128_256(self):
+        """
+        Integration test for encrypting SKINNY-128-256
+        """
+
+        skinny = Skinny([128, 256, 48], words=True)
+        plaintext = [3, 10, 0, 12, 4, 7, 7, 6, 7, 10, 2, 6, 10, 6, 8, 13, 13,
+                     3, 8, 2, 10, 6, 9, 5, 14, 7, 0, 2, 2, 14, 2, 5]
+        key = [0, 0, 9, 12, 14, 12, 8, 1, 6, 0, 5, 13, 4, 10, 12, 1, 13, 2, 10,
+               14, 9, 14, 3, 0, 8, 5, 13, 7, 10, 1, 15, 3, 1, 10, 12, 1, 2, 3,
+               14, 11, 15, 12, 0, 0, 15, 13, 13, 12, 15, 0, 1, 0, 4, 6, 12,
+               14, 14, 13, 13, 15, 12, 10, 11, 3]
+        correct = [11, 7, 3, 1, 13, 9, 8, 10, 4, 11, 13, 14, 1, 4, 7, 10, 7,
+                   14, 13, 4, 10, 6, 15, 1, 6, 11, 9, 11, 5, 8, 7, 15]
+
+        self.assertEqual(skinny.encrypt_block(plaintext, key), correct,
+                         "Block not encrypted correctly")
+
+    def test_encrypt_block_128_384(self):
+        """
+        Integration test for encrypting SKINNY-128-384
+        """
+
+        skinny = Skinny([128, 384, 56], words=True)
+
+        plaintext = [10, 3, 9, 9, 4, 11, 6, 6, 10, 13, 8, 5, 10, 3, 4, 5, 9,
+                     15, 4, 4, 14, 9, 2, 11, 0, 8, 15, 5, 5, 0, 12, 11]
+        key = [13, 15, 8, 8, 9, 5, 4, 8, 12, 15, 12, 7, 14, 10, 5, 2, 13, 2,
+               9, 6, 3, 3, 9, 3, 0, 1, 7, 9, 7, 4, 4, 9, 10, 11, 5, 8, 8, 10,
+               3, 4, 10, 4, 7, 15, 1, 10, 11, 2, 13, 15, 14, 9, 12, 8, 2, 9,
+               3, 15, 11, 14, 10, 9, 10, 5, 10, 11, 1, 10, 15, 10, 12, 2, 6,
+               1, 1, 0, 1, 2, 12, 13, 8, 12, 14, 15, 9, 5, 2, 6, 1, 8, 12, 3,
+               14, 11, 14, 8]
+        correct = [9, 4, 14, 12, 15, 5, 8, 9, 14, 2, 0, 1, 7, 12, 6, 0, 1, 11,
+                   3, 8, 12, 6, 3, 4, 6, 10, 1, 0, 13, 12, 15, 10]
+
+        self.assertEqual(skinny.encrypt_block(plaintext, key), correct,
+                         "Block not encrypted correctly")
+
+    def test_encrypt_block_64_64(self):
+        """
+        Integration test for encrypting SKINNY-64-64
+        """
+
+        skinny = Skinny([64, 64, 32], words=True)
+
+        plaintext = [0, 6, 0, 3, 4, 15, 9, 5, 7, 7, 2, 4, 13, 1, 9, 13]
+        key = [15, 5, 2, 6, 9, 8, 2, 6, 15, 12, 6, 8, 1, 2, 3, 8]
+        correct = [11, 11, 3, 9, 13, 15, 11, 2, 4, 2, 9, 11, 8, 10, 12, 7]
+
+        self.assertEqual(skinny.encrypt_block(plaintext, key), correct,
+                         "Block not encrypted correctly")
+
+    def test_encrypt_block_64_128(self):
+        """
+        Integration test for encrypting SKINNY-64-128
+        """
+
+        skinny = Skinny([64, 128, 36], words=True)
+
+        plaintext = [12, 15, 1, 6, 12, 15, 14, 8, 15, 13, 0, 15, 9, 8, 10, 10]
+        key = [9, 14, 11, 9, 3, 6, 4, 0, 13, 0, 8, 8, 13, 10, 6, 3, 7, 6, 10,
+               3, 9, 13, 1, 12, 8, 11, 14, 10, 7, 1, 14, 1]
+        correct = [6, 12, 14, 13, 10, 1, 15, 4, 3, 13, 14, 9, 2, 11, 9, 14]
+
+        self.assertEqual(skinny.encrypt_block(plaintext, key), correct,
+                         "Block not encrypted correctly")
+
+    def test_encrypt_block_64_192(self):
+        """
+        Integration test for encrypting SKINNY-64-192
+        """
+
+        skinny = Skinny([64, 192, 40], words=True)
+
+        plaintext = [5, 3, 0, 12, 6, 1, 13, 3, 5, 14, 8, 6, 6, 3, 12, 3]
+        key = [14, 13, 0, 0, 12, 8, 5, 11, 1, 2, 0, 13, 6, 8, 6, 1, 8, 7, 5,
+               3, 14, 2, 4, 11, 15, 13, 9, 0, 8, 15, 6, 0, 11, 2, 13, 11,
+               11, 4, 1, 11, 4, 2, 2, 13, 15, 12, 13, 0]
+        correct = [13, 13, 2, 12, 15, 1, 10, 8, 15, 3, 3, 0, 3, 0, 3, 12]
+
+        self.assertEqual(skinny.encrypt_block(plaintext, key), correct,
+                         "Block not encrypted correctly")
+
+
+class TestDecryptBlock(unittest.TestCase):
+    """
+    Integration tests for the decrypt_block method of the SKINNY class with
+    the word oriented engine selected. The test vectors match those of the
+    SKINNY class.
+    """
+
+    def test_decrypt_block_64_64(self):
+        """
+        Integration test for decrypting SKINNY-64-64
+        """
+
+        skinny = Skinny([64, 64, 32], words=True)
+
+        plaintext = [11, 11, 3, 9, 13, 15, 11, 2, 4, 2, 9, 11, 8, 10, 12, 7]
+        key = [15, 5, 2, 6, 9, 8, 2, 6, 15, 12, 6, 8, 1, 2, 3, 8]
+        correct = [0, 6, 0, 3, 4, 15, 9, 5, 7, 7, 2, 4, 13, 1, 9, 13]
+
+        self.assertEqual(skinny.decrypt_block(plaintext, key), correct,
+                         "Block not decrypted correctly")
+
+    def test_decrypt_block_64_128(self):
+        """
+        Integration test for decrypting SKINNY-64-128
+        """
+
+        skinny = Skinny([64, 128, 36], words=True)
+
+        plaintext = [6, 12, 14, 13, 10, 1, 15, 4, 3, 13, 14, 9, 2, 11, 9, 14]
+        key = [9, 14, 11, 9, 3, 6, 4, 0, 13, 0, 8, 8, 13, 10, 6, 3, 7, 6, 10,
+               3, 9, 13, 1, 12, 8, 11, 14, 10, 7, 1, 14, 1]
+        correct = [12, 15, 1, 6, 12, 15, 14, 8, 15, 13, 0, 15, 9, 8, 10, 10]
+
+        self.assertEqual(skinny.decrypt_block(plaintext, key), correct,
+                         "Block not decrypted correctly")
+
+    def test_decrypt_block_64_192(self):
+        """
+        Integration test for decrypting SKINNY-64-192
+        """
+
+        skinny = Skinny([64, 192, 40], words=True)
+
+        plaintext = [13, 13, 2, 12, 15, 1, 10, 8, 15, 3, 3, 0, 3, 0, 3, 12]
+        key = [14, 13, 0, 0, 12, 8, 5, 11, 1, 2, 0, 13, 6, 8, 6, 1, 8, 7, 5,
+               3, 14, 2, 4, 11, 15, 13, 9, 0, 8, 15, 6, 0, 11, 2, 13, 11,
+               11, 4, 1, 11, 4, 2, 2, 13, 15, 12, 13, 0]
+        correct = [5, 3, 0, 12, 6, 1, 13, 3, 5, 14, 8, 6, 6, 3, 12, 3]
+
+        self.assertEqual(skinny.decrypt_block(plaintext, key), correct,
+                         "Block not decrypted correctly")
+
+    def test_decrypt_block_128_128(self):
+        """
+        Integration test for decrypting SKINNY-128-128
+        """
+
+        skinny = Skinny([128, 128, 40], words=True)
+
+        plaintext = [2, 2, 15, 15, 3, 0, 13, 4, 9, 8, 14, 10, 6, 2, 13, 7, 14,
+                     4, 5, 11, 4, 7, 6, 14, 3, 3, 6, 7, 5, 11, 7, 4]
+        key = [4, 15, 5, 5, 12, 15, 11, 0, 5, 2, 0, 12, 10, 12, 5, 2, 15, 13,
+               9, 2, 12, 1, 5, 15, 3, 7, 0, 7, 3, 14, 9, 3]
+        correct = [15, 2, 0, 10, 13, 11, 0, 14, 11, 0, 8, 11, 6, 4, 8, 10,
+                   3, 11, 2, 14, 14, 14, 13, 1, 15, 0, 10, 13, 13, 10, 1, 4]
+
+        self.assertEqual(skinny.decrypt_block(plaintext, key), correct,
+                         "Block not decrypted correctly")
+
+    def test_decrypt_block_128_256(self):
+        """
+        Integration test for decrypting SKINNY-128-256
+        """
+
+        skinny = Skinny([128, 256, 48], words=True)
+
+        plaintext = [11, 7, 3, 1, 13, 9, 8, 10, 4, 11, 13, 14, 1, 4, 7, 10, 7,
+                     14, 13, 4, 10, 6, 15, 1, 6, 11, 9, 11, 5, 8, 7, 15]
+        key = [0, 0, 9, 12, 14, 12, 8, 1, 6, 0, 5, 13, 4, 10, 12, 1, 13, 2, 10,
+               14, 9, 14, 3, 0, 8, 5, 13, 7, 10, 1, 15, 3, 1, 10, 12, 1, 2, 3,
+               14, 11, 15, 12, 0, 0, 15, 13, 13, 12, 15, 0, 1, 0, 4, 6, 12,
+               14, 14, 13, 13, 15, 12, 10, 11, 3]
+        correct = [3, 10, 0, 12, 4, 7, 7, 6, 7, 10, 2, 6, 10, 6, 8, 13, 13,
+                   3, 8, 2, 10, 6, 9, 5, 14, 7, 0, 2, 2, 14, 2, 5]
+
+        self.assertEqual(skinny.decrypt_block(plaintext, key), correct,
+                         "Block not decrypted correctly")
+
+    def test_decrypt_block_128_384(self):
+        """
+        Integration test for decrypting SKINNY-128-384
+        """
+
+        skinny = Skinny([128, 384, 56], words=True)
+
+        plaintext = [9, 4, 14, 12, 15, 5, 8, 9, 14, 2, 0, 1, 7, 12, 6, 0, 1,
+                     11, 3, 8, 12, 6, 3, 4, 6, 10, 1, 0, 13, 12, 15, 10]
+        key = [13, 15, 8, 8, 9, 5, 4, 8, 12, 15, 12, 7, 14, 10, 5, 2, 13, 2,
+               9, 6, 3, 3, 9, 3, 0, 1, 7, 9, 7, 4, 4, 9, 10, 11, 5, 8, 8, 10,
+               3, 4, 10, 4, 7, 15, 1, 10, 11, 2, 13, 15, 14, 9, 12, 8, 2, 9,
+               3, 15, 11, 14, 10, 9, 10, 5, 10, 11, 1, 10, 15, 10, 12, 2, 6,
+               1, 1, 0, 1, 2, 12, 13, 8, 12, 14, 15, 9, 5, 2, 6, 1, 8, 12, 3,
+               14, 11, 14, 8]
+        correct = [10, 3, 9, 9, 4, 11, 6, 6, 10, 13, 8, 5, 10, 3, 4, 5, 9,
+                   15, 4, 4, 14, 9, 2, 11, 0, 8, 15, 5, 5, 0, 12, 11]
+
+        self.assertEqual(skinny.decrypt_block(plaintext, key), correct,
+                         "Block not decrypted correctly")
+
+
+class TestBlockBytes(unittest.TestCase):
+    """
+    Integration tests for the encrypt_block_bytes and decrypt_block_bytes
+    methods of the SKINNY class. The test vectors match those of the SKINNY
+    class.
+    """
+
+    def test_block_bytes_64_192(self):
+        """
+        Integration test for SKINNY-64-192
+        """
+
+        skinny = Skinny([64, 192, 40])
+
+        plaintext = bytes.fromhex("530c61d35e8663c3")
+        key = bytes.fromhex("ed00c85b120d68618753e24bfd908f60"
+                            "b2dbb41b422dfcd0")
+        correct = bytes.fromhex("dd2cf1a8f330303c")
+
+        self.assertEqual(skinny.encrypt_block_bytes(plaintext, key), correct,
+                         "Block not encrypted correctly")
+        self.assertEqual(skinny.decrypt_block_bytes(correct, key), plaintext,
+                         "Block not decrypted correctly")
+
+    def test_block_bytes_128_384(self):
+        """
+        Integration test for SKINNY-128-384
+        """
+
+        skinny = Skinny([128, 384, 56])
+
+        plaintext = bytes.fromhex("a3994b66ad85a3459f44e92b08f550cb")
+        key = bytes.fromhex("df889548cfc7ea52d296339301797449"
+                            "ab588a34a47f1ab2dfe9c8293fbea9a5"
+                            "ab1afac2611012cd8cef952618c3ebe8")
+        correct = bytes.fromhex("94ecf589e2017c601b38c6346a10dcfa")
+
+        self.assertEqual(skinny.encrypt_block_bytes(plaintext, key), correct,
+                         "Block not encrypted correctly")
+        self.assertEqual(skinny.decrypt_block_bytes(memoryview(correct), key),
+                         plaintext, "Block not decrypted correctly")
+
+
+class TestSplitTweakey(unittest.TestCase):
+    """
+    Unit tests for splitting the 128-bit tweakey schedule into a TK2/TK3
+    part and a TK1 part.
+    """
+
+    def test_split_tweakey_128_384(self):
+        """
+        Unit test for calculate_round_tweakeys from the second array plus
+        add_tk1_round_tweakeys - must match the full schedule
+        """
+
+        skinny = Skinny128Words([128, 384, 56])
+        key = [(7 * i + 3) % 16 for i in range(96)]
+
+        fixed = skinny.calculate_round_tweakeys([0] * 32 + key[32:], 1)
+        self.assertEqual(skinny.add_tk1_round_tweakeys(key[0:32], fixed),
+                         skinny.calculate_round_tweakeys(key),
+                         "Incorrect round tweakeys")
+
+    def test_split_tweakey_128_256(self):
+        """
+        Unit test for splitting the SKINNY-128-256 schedule
+        """
+
+        skinny = Skinny128Words([128, 256, 48])
+        key = [(5 * i + 1) % 16 for i in range(64)]
+
+        fixed = skinny.calculate_round_tweakeys([0] * 32 + key[32:], 1)
+        self.assertEqual(skinny.add_tk1_round_tweakeys(key[0:32], fixed),
+                         skinny.calculate_round_tweakeys(key),
+                         "Incorrect round tweakeys")
+
+
+if __name__ == '__main__':
+    unittest.main()
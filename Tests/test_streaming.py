@@ -0,0 +1,140 @@
+"""
+This module runs unit tests for streaming file encryption, decryption and
+CBC-MAC
+"""
+
+import sys
+sys.path.append('..')
+import os
+import shutil
+import tempfile
+import unittest
+from Gift.gift_64_packed import Gift64Packed
+from Gift.gift_128_table import Gift128Table
+from streaming import *
+from modes import *
+
+
+class TestPadding(unittest.TestCase):
+    """
+    Unit tests for 10* padding of bytes
+    """
+
+    def test_pad_bytes(self):
+        """
+        Unit test for padding a short and a full last block
+        """
+
+        self.assertEqual(pad_bytes(b"\x01\x02", 64),
+                         b"\x01\x02\x80\x00\x00\x00\x00\x00",
+                         "Incorrect padding")
+        self.assertEqual(pad_bytes(bytes(8), 64), bytes(8) + b"\x80"
+                         + bytes(7), "Incorrect padding")
+
+    def test_unpad_bytes(self):
+        """
+        Unit test for removing padding, and rejecting invalid padding
+        """
+
+        self.assertEqual(unpad_bytes(b"\x01\x00\x80\x00"), b"\x01\x00",
+                         "Incorrect data")
+        with self.assertRaises(ValueError):
+            unpad_bytes(b"\x01\x00\x00\x00")
+
+
+class TestStreaming(unittest.TestCase):
+    """
+    Unit tests for encrypting and decrypting files in chunks - must match
+    running the mode over the whole message at once
+    """
+
+    def setUp(self):
+        # Set up a temporary directory holding a 100 byte message
+        self.directory = tempfile.mkdtemp()
+        self.plaintext_path = os.path.join(self.directory, "plaintext")
+        self.ciphertext_path = os.path.join(self.directory, "ciphertext")
+        self.decrypted_path = os.path.join(self.directory, "decrypted")
+        self.message = bytes(range(100))
+        self.key = bytes(range(16))
+        self.iv = bytes(range(16, 32))
+        with open(self.plaintext_path, "wb") as file:
+            file.write(self.message)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_file(self, cipher, mode, block_size):
+        """
+        Method to encrypt and decrypt the message file in 32 byte chunks.
+        Parameters: the block cipher, mode and block size.
+        Returns: the ciphertext and decrypted message.
+        """
+
+        iv = self.iv[:block_size // 8]
+        encrypt_file(cipher, self.key, mode, self.plaintext_path,
+                     self.ciphertext_path, block_size, iv, chunk_size=32)
+        decrypt_file(cipher, self.key, mode, self.ciphertext_path,
+                     self.decrypted_path, block_size, iv, chunk_size=32)
+
+        with open(self.ciphertext_path, "rb") as file:
+            ciphertext = file.read()
+        with open(self.decrypted_path, "rb") as file:
+            decrypted = file.read()
+
+        return ciphertext, decrypted
+
+    def test_ecb(self):
+        """
+        Unit test for streaming ECB mode
+        """
+
+        cipher = Gift64Packed()
+        ciphertext, decrypted = self.run_file(cipher, "ECB", 64)
+
+        self.assertEqual(ciphertext, ecb_encrypt(cipher, self.key,
+                                                 pad_bytes(self.message, 64),
+                                                 64), "Incorrect ciphertext")
+        self.assertEqual(decrypted, self.message, "Incorrect plaintext")
+
+    def test_cbc(self):
+        """
+        Unit test for streaming CBC mode - chaining carried across chunks
+        """
+
+        cipher = Gift128Table()
+        ciphertext, decrypted = self.run_file(cipher, "CBC", 128)
+
+        self.assertEqual(ciphertext, cbc_encrypt(cipher, self.key, self.iv,
+                                                 pad_bytes(self.message, 128),
+                                                 128), "Incorrect ciphertext")
+        self.assertEqual(decrypted, self.message, "Incorrect plaintext")
+
+    def test_ctr(self):
+        """
+        Unit test for streaming CTR mode - counter carried across chunks, and
+        the ciphertext is the same length as the message
+        """
+
+        cipher = Gift64Packed()
+        ciphertext, decrypted = self.run_file(cipher, "CTR", 64)
+        correct = ctr_encrypt(cipher, self.key, self.iv[:8],
+                              self.message + bytes(4), 64)[:100]
+
+        self.assertEqual(ciphertext, correct, "Incorrect ciphertext")
+        self.assertEqual(decrypted, self.message, "Incorrect plaintext")
+
+    def test_mac_file(self):
+        """
+        Unit test for streaming CBC-MAC
+        """
+
+        cipher = Gift64Packed()
+
+        self.assertEqual(mac_file(cipher, self.key, self.plaintext_path, 64,
+                                  chunk_size=16),
+                         cbc_mac(cipher, self.key, pad_bytes(self.message, 64),
+                                 64), "Incorrect tag")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -518,5 +518,63 @@ class TestExtractInputs(unittest.TestCase):
                          "Incorrect validity")
 
 
+class TestBlockBytes(unittest.TestCase):
+    """
+    Unit tests for the functions converting blocks given as bytes
+    """
+
+    def test_bytes_to_nibble_int(self):
+        """
+        Unit test for packing bytes - must match packing the nibble list
+        """
+
+        data = bytes([0x12, 0x34, 0xab, 0xcd])
+        correct = nibbles_to_int([1, 2, 3, 4, 10, 11, 12, 13])
+
+        self.assertEqual(bytes_to_nibble_int(data), correct,
+                         "Incorrect packed int")
+        self.assertEqual(nibble_int_to_bytes(correct, 4), data,
+                         "Incorrect bytes")
+
+    def test_split_nibbles(self):
+        """
+        Unit test for splitting bytes into nibbles
+        """
+
+        data = memoryview(bytes([0x12, 0x34, 0xab, 0xcd]))
+        correct = bytes([1, 2, 3, 4, 10, 11, 12, 13])
+
+        self.assertEqual(split_nibbles(data), correct, "Incorrect nibbles")
+
+    def test_xor_bytes(self):
+        """
+        Unit test for XORing two blocks of bytes
+        """
+
+        result = xor_bytes(bytes([0x12, 0x34]), memoryview(b"\xff\x0f"))
+
+        self.assertEqual(result, bytes([0xed, 0x3b]), "Incorrect XOR")
+
+
+class TestPadHexString(unittest.TestCase):
+    """
+    Unit tests for padding hex strings - must match divide_into_blocks
+    """
+
+    def test_pad_hex_string(self):
+        """
+        Unit test for padding hex strings of different lengths for
+        encryption and decryption
+        """
+
+        for hex_string in ["0", "0123456789ABCDE", "0123456789ABCDEF",
+                           "0123456789ABCDEF012"]:
+            for type_of_enc in [1, 2]:
+                blocks = divide_into_blocks(string_to_list(hex_string), 64,
+                                            type_of_enc)
+                self.assertEqual(pad_hex_string(hex_string, 64, type_of_enc),
+                                 list_to_string(blocks), "Incorrect padding")
+
+
 if __name__ == '__main__':
     unittest.main()
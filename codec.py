@@ -0,0 +1,87 @@
+"""
+Module to convert between the hex strings read from and written to files
+and the nibble lists and bytes the ciphers work on. Every conversion runs
+in C (binascii, bytes.hex, bytes.translate) rather than one Python call per
+character, so it stays linear for megabyte-sized inputs
+"""
+
+from binascii import unhexlify
+from itertools import chain
+
+# tables for bytes.translate - split a byte into its high or low nibble,
+# and map a nibble value to its (upper case) hex digit
+high_nibble_table = bytes(b >> 4 for b in range(256))
+low_nibble_table = bytes(b & 0xf for b in range(256))
+hex_digit_table = b"0123456789ABCDEF" + bytes(240)
+
+# the byte values that are nibbles
+nibble_values = bytes(range(16))
+
+
+def hex_to_nibbles(hex_string):
+    """
+    Function to convert a hex string into a list of nibbles - the same
+    result as utils.string_to_list, for strings of any length (an odd number
+    of digits included).
+    Parameters: the hex string (upper or lower case).
+    Returns: list holding the value of each hex digit.
+    """
+
+    # an odd number of digits is made even with a leading zero, which is
+    # dropped again from the result
+    odd = len(hex_string) % 2
+    data = unhexlify("0" * odd + hex_string)
+
+    nibbles = bytearray(2 * len(data))
+    nibbles[0::2] = data.translate(high_nibble_table)
+    nibbles[1::2] = data.translate(low_nibble_table)
+
+    return list(nibbles[odd:])
+
+
+def nibbles_to_hex(nibbles):
+    """
+    Function to convert a list of nibbles, or a list of blocks of nibbles,
+    into an upper case hex string - the same result as
+    utils.list_to_string. Blocks are flattened in linear time, and values
+    that are not nibbles are written out in full as list_to_string does.
+    Parameters: the list (or list of lists) to convert.
+    Returns: the hex string.
+    """
+
+    if not nibbles:
+        return ""
+
+    # check whether list is 2D - if so flatten to 1D
+    if isinstance(nibbles[0], list):
+        nibbles = list(chain.from_iterable(nibbles))
+
+    # nibbles map straight to their hex digits
+    try:
+        data = bytes(nibbles)
+    except (TypeError, ValueError):
+        data = None
+    if data is not None and not data.translate(None, nibble_values):
+        return data.translate(hex_digit_table).decode("ascii")
+
+    return "".join(hex(i).upper().split("X")[-1] for i in nibbles)
+
+
+def hex_to_bytes(hex_string):
+    """
+    Function to convert a hex string into bytes.
+    Parameters: the hex string (an even number of digits).
+    Returns: the bytes.
+    """
+
+    return bytes.fromhex(hex_string)
+
+
+def bytes_to_hex(data):
+    """
+    Function to convert bytes into an upper case hex string.
+    Parameters: the bytes (or bytearray / memoryview).
+    Returns: the hex string.
+    """
+
+    return data.hex().upper()
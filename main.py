@@ -4,12 +4,16 @@ call the relevant code constructs
 """
 
 from Gift.gift_64 import *
+from Gift.gift_64_packed import Gift64Packed
 from Gift.gift_128 import *
+from Gift.gift_128_table import Gift128Table
 from Skinny.skinny import *
 from Gift.gift_cofb import *
 from Skinny.skinnyaead import *
 from RC4 import *
+from modes import *
 from utils import *
+from codec import *
 from os import path
 
 # descriptions of constructs implemented by the tool
@@ -191,17 +195,21 @@ class lightweightTool:
 
         # create cipher object
         if self.cipher == "1":
-            self.construct = Gift64()
+            # packed integer GIFT-64 - same output as Gift64, but faster
+            self.construct = Gift64Packed()
         elif self.cipher == "2":
-            self.construct = Gift128()
+            # table driven GIFT-128 - same output as Gift128, but faster
+            self.construct = Gift128Table()
         else:
             # anything else is SKINNY
             # define SKINNY versions
             skinny_versions = [[64, 64, 32], [64, 128, 36], [64, 192, 40],
                                [128, 128, 40], [128, 256, 48], [128, 384, 56]]
 
-            # create skinny object with the correct version
-            self.construct = Skinny(skinny_versions[int(self.cipher) - 3])
+            # create skinny object with the correct version - runs on the
+            # word oriented engine (same output, but faster)
+            self.construct = Skinny(skinny_versions[int(self.cipher) - 3],
+                                    words=True)
 
         # option 1 is to encrypt
         if self.option == "1":
@@ -249,7 +257,8 @@ class lightweightTool:
             else:
                 # run SKINNY-AEAD
                 self.construct = SkinnyAead(self.construct_name,
-                                            Skinny([128, 384, 56]))
+                                            Skinny([128, 384, 56],
+                                                   words=True))
 
             self.encrypt_aead()
 
@@ -261,7 +270,8 @@ class lightweightTool:
             else:
                 # run SKINNY-AEAD verification
                 self.construct = SkinnyAead(self.construct_name,
-                                            Skinny([128, 384, 56]))
+                                            Skinny([128, 384, 56],
+                                                   words=True))
 
             self.verify_aead()
 
@@ -272,8 +282,6 @@ class lightweightTool:
         Returns: none.
         """
 
-        ciphertext = []
-
         # read in parameters from file and check their validity
         block_size = descriptions[self.construct_name][0]
         key_size = descriptions[self.construct_name][1]
@@ -285,25 +293,21 @@ class lightweightTool:
             return
 
         # if inputs are checked to be valid, extract them into variables
-        # and convert parameters from string to list formats
+        # and convert the padded plaintext and key to bytes
         inputs = extract_inputs(variables_dictionary, ["P", "K"])
         plaintext = inputs[0]
         key = inputs[1]
-        plaintextList = string_to_list(plaintext)
-        keyList = string_to_list(key)
-        m_len = len(plaintextList)
-
-        # split plaintext into 128-bit blocks
-        blocks = divide_into_blocks(plaintextList, block_size, 1)
+        m_len = len(plaintext)
+        data = hex_to_bytes(pad_hex_string(plaintext, block_size, 1))
 
-        # run ECB mode
-        for block in blocks:
-            ciphertext.append(self.construct.encrypt_block(block, keyList))
+        # run ECB mode, with the blocks split across a pool of processes
+        ciphertext = ecb_encrypt_parallel(self.construct, hex_to_bytes(key),
+                                          data, block_size)
 
         # format data ready to be written to file
         data = {"Note": " Encrypted in ECB mode with " +
                 str(self.construct_name), "P": plaintext, "K": key,
-                "C": list_to_string(ciphertext), "L": str(m_len)}
+                "C": bytes_to_hex(ciphertext), "L": str(m_len)}
 
         # write data to file
         write_to_file(self.filename, data)
@@ -315,8 +319,6 @@ class lightweightTool:
         Returns: none.
         """
 
-        plaintext = []
-
         # read in parameters from file and check their validity
         block_size = descriptions[self.construct_name][0]
         key_size = descriptions[self.construct_name][1]
@@ -330,27 +332,22 @@ class lightweightTool:
             return
 
         # if inputs are checked to be valid, extract them into variables
-        # and convert parameters from string to list formats
+        # and convert the padded ciphertext and key to bytes
         inputs = extract_inputs(variables_dictionary, ["C", "K", "L"])
         ciphertext = inputs[0]
         key = inputs[1]
         m_len_input = inputs[2]
         m_len = plaintext_length(len(ciphertext), int(m_len_input))
-        ciphertextList = string_to_list(ciphertext)
-        keyList = string_to_list(key)
+        data = hex_to_bytes(pad_hex_string(ciphertext, block_size, 2))
 
-        # split plaintext into 128-bit blocks
-        blocks = divide_into_blocks(ciphertextList, block_size, 2)
-
-        # for every ciphertext block, decrypt the block and add to
-        # plaintext list
-        for block in blocks:
-            plaintext.append(self.construct.decrypt_block(block, keyList))
+        # run ECB mode, with the blocks split across a pool of processes
+        plaintext = ecb_decrypt_parallel(self.construct, hex_to_bytes(key),
+                                         data, block_size)
 
         # format data ready to be written to file
         data = {"Note": " Decrypted in ECB mode with " +
                 str(self.construct_name), "C": ciphertext, "K": key,
-                "P": list_to_string(plaintext)[0:m_len], "L": str(m_len)}
+                "P": bytes_to_hex(plaintext)[0:m_len], "L": str(m_len)}
 
         # write data to file
         write_to_file(self.filename, data)
@@ -362,8 +359,6 @@ class lightweightTool:
         Returns: none.
         """
 
-        ciphertext_blocks = []
-
         # read in parameters from file and check their validity
         block_size = descriptions[self.construct_name][0]
         key_size = descriptions[self.construct_name][1]
@@ -376,37 +371,25 @@ class lightweightTool:
             return
 
         # if inputs are checked to be valid, extract them into variables
-        # and convert parameters from string to list formats
+        # and convert the padded plaintext and key to bytes
         inputs = extract_inputs(variables_dictionary, ["P", "K"])
         plaintext = inputs[0]
         key = inputs[1]
-        plaintextList = string_to_list(plaintext)
-        keyList = string_to_list(key)
-        m_len = len(plaintextList)
-
-        # split plaintext into 128-bit blocks
-        blocks = divide_into_blocks(plaintextList, block_size, 1)
-        IV = run_RC4(keyList, block_size//8)
+        m_len = len(plaintext)
+        data = hex_to_bytes(pad_hex_string(plaintext, block_size, 1))
+        key_bytes = hex_to_bytes(key)
 
-        # initialise CBC mode
-        x = xor_bits(blocks[0], IV)
-        y = self.construct.encrypt_block(x, keyList)
-        ciphertext_blocks.append(y)
-
-        # iterate over each plaintext block
-        for i in range(1, len(blocks)):
-            # XOR the current plaintext block and the result of the
-            # previous encryption
-            x = xor_bits(blocks[i], y)
+        # generate the IV using the RC4 algorithm
+        IV = rc4_iv(key_bytes, block_size // 8)
 
-            # Encrypt the xored plaintext block and previous encryption result
-            y = self.construct.encrypt_block(x, keyList)
-            ciphertext_blocks.append(y)
+        # run CBC mode
+        ciphertext = cbc_encrypt(self.construct, key_bytes, IV, data,
+                                 block_size)
 
         # format data ready to be written to file
         data = {"Note": " Encrypted with CBC mode and "
                 + str(self.construct_name), "P": plaintext, "K": key,
-                "C": list_to_string(ciphertext_blocks), "L": str(m_len)}
+                "C": bytes_to_hex(ciphertext), "L": str(m_len)}
 
         # write data to file
         write_to_file(self.filename, data)
@@ -418,8 +401,6 @@ class lightweightTool:
         Returns: none.
         """
 
-        plaintext_blocks = []
-
         # read in parameters from file and check their validity
         block_size = descriptions[self.construct_name][0]
         key_size = descriptions[self.construct_name][1]
@@ -432,39 +413,26 @@ class lightweightTool:
             return
 
         # if inputs are checked to be valid, extract them into variables
-        # and convert parameters from string to list formats
+        # and convert the padded ciphertext and key to bytes
         inputs = extract_inputs(variables_dictionary, ["C", "K", "L"])
         ciphertext = inputs[0]
         key = inputs[1]
-        m_len = inputs[2]
         m_len_input = inputs[2]
         m_len = plaintext_length(len(ciphertext), int(m_len_input))
-        ciphertext_list = string_to_list(ciphertext)
-        keyList = string_to_list(key)
+        data = hex_to_bytes(pad_hex_string(ciphertext, block_size, 2))
+        key_bytes = hex_to_bytes(key)
 
-        # split plaintext into 128-bit blocks
-        blocks = divide_into_blocks(ciphertext_list, block_size, 2)
-        IV = run_RC4(keyList, block_size // 8)
-
-        # initialise CBC MAC mode
-        y = self.construct.decrypt_block(blocks[0], keyList)
-        x = xor_bits(y, IV)
-        plaintext_blocks.append(x)
-
-        # iterate over each block
-        for i in range(1, len(blocks)):
-            # xor the current plaintext block and the result of the
-            # previous encryption
-            y = self.construct.decrypt_block(blocks[i], keyList)
-            x = xor_bits(blocks[i - 1], y)
+        # generate the IV using the RC4 algorithm
+        IV = rc4_iv(key_bytes, block_size // 8)
 
-            # Encrypt the xored plaintext block and previous encryption result
-            plaintext_blocks.append(x)
+        # run CBC mode, with the blocks split across a pool of processes
+        plaintext = cbc_decrypt_parallel(self.construct, key_bytes, IV, data,
+                                         block_size)
 
         # format data ready to be written to file
         data = {"Note": " Decrypted with CBC mode and "
                 + str(self.construct_name), "C": ciphertext, "K": key,
-                "P": list_to_string(plaintext_blocks)[0:m_len],
+                "P": bytes_to_hex(plaintext)[0:m_len],
                 "L": str(m_len)}
 
         # format data ready to be written to file
@@ -477,8 +445,6 @@ class lightweightTool:
         Returns: none.
         """
 
-        ciphertext_blocks = []
-
         # read in parameters from file and check their validity
         block_size = descriptions[self.construct_name][0]
         key_size = descriptions[self.construct_name][1]
@@ -498,7 +464,7 @@ class lightweightTool:
             return
 
         # if inputs are checked to be valid, extract them into variables
-        # and convert parameters from string to list formats
+        # and convert the padded input and key to bytes
         if operation == 1:
             inputs = extract_inputs(variables_dictionary, ["P", "K"])
         else:
@@ -506,39 +472,32 @@ class lightweightTool:
 
         plaintext = inputs[0]
         key = inputs[1]
-        plaintextList = string_to_list(plaintext)
-        keyList = string_to_list(key)
+        data = hex_to_bytes(pad_hex_string(plaintext, block_size, operation))
+        key_bytes = hex_to_bytes(key)
 
         if operation == 2:
             m_len_input = inputs[2]
             m_len = plaintext_length(len(plaintext), int(m_len_input))
         else:
-            m_len = len(plaintextList)
-
-        # split plaintext into 64-bit blocks
-        blocks = divide_into_blocks(plaintextList, block_size, operation)
+            m_len = len(plaintext)
 
         # generate the IV using the RC4 algorithm
-        IV = run_RC4(keyList, block_size//8)
-
-        # iterate over each block, encrypt the IV and xor to the block
-        for block in blocks:
-            x = xor_bits(block, self.construct.encrypt_block(IV[:], keyList))
-            ciphertext_blocks.append(x)
+        IV = rc4_iv(key_bytes, block_size // 8)
 
-            # increment last byte of the IV
-            IV[-2:] = increment_byte(IV[-2:])
+        # run CTR mode, with the blocks split across a pool of processes
+        ciphertext = ctr_encrypt_parallel(self.construct, key_bytes, IV, data,
+                                          block_size)
 
         # format data ready to be written to file (note different message
         # for encrypting/decrypting
         if operation == 1:
             data = {"Note": " Encrypted in CTR mode with " +
                 self.construct_name, "P": plaintext, "K": key,
-                    "C": list_to_string(ciphertext_blocks), "L": str(m_len)}
+                    "C": bytes_to_hex(ciphertext), "L": str(m_len)}
         else:
             data = {"Note": " Decrypted in CTR mode with " +
                     self.construct_name, "C": plaintext, "K": key,
-                    "P": list_to_string(ciphertext_blocks)[0:m_len],
+                    "P": bytes_to_hex(ciphertext)[0:m_len],
                     "L": str(m_len)}
 
         # format data ready to be written to file
@@ -563,33 +522,19 @@ class lightweightTool:
             return
 
         # if inputs are checked to be valid, extract them into variables
-        # and convert parameters from string to list formats
+        # and convert the padded plaintext and key to bytes
         inputs = extract_inputs(variables_dictionary, ["P", "K"])
         plaintext = inputs[0]
         key = inputs[1]
-        plaintextList = string_to_list(plaintext)
-        keyList = string_to_list(key)
-
-        # split plaintext into 128-bit blocks
-        blocks = divide_into_blocks(plaintextList, block_size, 1)
-
-        # initialise CBC MAC mode
-        x = xor_bits(blocks[0], [0]*(block_size//4))
-        y = self.construct.encrypt_block(x, keyList)
-
-        # iterate over each block
-        for i in range(1, len(blocks)):
-            # xor the current plaintext block and the result of the
-            # previous encryption
-            x = xor_bits(blocks[i], y)
+        data = hex_to_bytes(pad_hex_string(plaintext, block_size, 1))
 
-            # encrypt the xored plaintext block and previous encryption result
-            y = self.construct.encrypt_block(x, keyList)
+        # run CBC-MAC mode
+        y = cbc_mac(self.construct, hex_to_bytes(key), data, block_size)
 
         # format data ready to be written to file
         data = {"Note": "Generated MAC with CBC-MAC and " +
                 self.construct_name, "P": plaintext, "K": key,
-                "T": list_to_string(y)}
+                "T": bytes_to_hex(y)}
 
         # format data ready to be written to file
         write_to_file(self.filename, data)
@@ -614,40 +559,25 @@ class lightweightTool:
             return
 
         # if inputs are checked to be valid, extract them into variables
-        # and convert parameters from string to list formats
+        # and convert the padded plaintext, key and tag to bytes
         inputs = extract_inputs(variables_dictionary, ["P", "K", "T"])
         plaintext = inputs[0]
         key = inputs[1]
         tag = inputs[2]
-        plaintextList = string_to_list(plaintext)
-        keyList = string_to_list(key)
-        tagList = string_to_list(tag)
+        data = hex_to_bytes(pad_hex_string(plaintext, block_size, 1))
 
-        # split plaintext into 128-bit blocks
-        blocks = divide_into_blocks(plaintextList, block_size, 1)
-
-        # initialise CBC MAC mode
-        x = xor_bits(blocks[0], [0]*(block_size//4))
-        y = self.construct.encrypt_block(x, keyList)
-
-        # iterate over each block
-        for i in range(1, len(blocks)):
-            # xor the current plaintext block and the result of the previous
-            # encryption
-            x = xor_bits(blocks[i], y)
-
-            # Encrypt the xored plaintext block and previous encryption result
-            y = self.construct.encrypt_block(x, keyList)
+        # run CBC-MAC mode
+        y = cbc_mac(self.construct, hex_to_bytes(key), data, block_size)
 
         # format data ready to be written to file
-        if y == tagList:
+        if y == hex_to_bytes(tag):
             data = {"Note": " Verified MAC with CBC-MAC mode and " +
                     self.construct_name, "P": plaintext, "K": key,
-                    "T": list_to_string(y)}
+                    "T": bytes_to_hex(y)}
         else:
             data = {"Note": " NOT verified MAC with CBC-MAC and " +
                     self.construct_name, "P": plaintext, "K": key,
-                    "T": list_to_string(y)}
+                    "T": bytes_to_hex(y)}
 
         # format data ready to be written to file
         write_to_file(self.filename, data)
@@ -682,20 +612,26 @@ class lightweightTool:
         K = inputs[3]
 
         # convert parameters from string to list formats
-        plaintextList = string_to_list(plaintext)
-        ADList = string_to_list(AD)
-        NList = string_to_list(N)
-        KList = string_to_list(K)
+        plaintextList = hex_to_nibbles(plaintext)
+        ADList = hex_to_nibbles(AD)
+        NList = hex_to_nibbles(N)
+        KList = hex_to_nibbles(K)
 
         p_blocks = divide_into_blocks(plaintextList, block_size, 3)
         a_blocks = divide_into_blocks(ADList, block_size, 3)
 
-        c, t = self.construct.encrypt(p_blocks, KList, a_blocks, NList)
+        # SKINNY-AEAD blocks are independent, so they are spread across a
+        # pool of processes
+        if isinstance(self.construct, SkinnyAead):
+            c, t = self.construct.encrypt_parallel(p_blocks, KList, a_blocks,
+                                                   NList)
+        else:
+            c, t = self.construct.encrypt(p_blocks, KList, a_blocks, NList)
 
         # format data ready to be written to file
         data = {"Note": " Encrypted with " + self.construct_name,
                 "P": plaintext, "A": AD, "N": N, "K": K,
-                "C": list_to_string(c), "T": list_to_string(t)}
+                "C": nibbles_to_hex(c), "T": nibbles_to_hex(t)}
 
         # write data to file
         write_to_file(self.filename, data)
@@ -734,21 +670,27 @@ class lightweightTool:
         T = inputs[4]
 
         # convert parameters from string to list formats
-        plaintextList = string_to_list(plaintext)
-        ADList = string_to_list(AD)
-        NList = string_to_list(N)
-        KList = string_to_list(K)
-        TList = string_to_list(T)
+        plaintextList = hex_to_nibbles(plaintext)
+        ADList = hex_to_nibbles(AD)
+        NList = hex_to_nibbles(N)
+        KList = hex_to_nibbles(K)
+        TList = hex_to_nibbles(T)
         p_blocks = divide_into_blocks(plaintextList, block_size, 3)
         a_blocks = divide_into_blocks(ADList, block_size, 3)
 
-        p = self.construct.verify(p_blocks, KList, a_blocks, NList, TList)
+        # SKINNY-AEAD blocks are independent, so they are spread across a
+        # pool of processes
+        if isinstance(self.construct, SkinnyAead):
+            p = self.construct.verify_parallel(p_blocks, KList, a_blocks,
+                                               NList, TList)
+        else:
+            p = self.construct.verify(p_blocks, KList, a_blocks, NList, TList)
 
         # format data ready to be written to file
         if p != [-1]:
             data = {"Note": " Verified and decrypted with " +
                     self.construct_name, "C": plaintext, "A": AD, "N": N,
-                    "K": K, "P": list_to_string(p), "T": T}
+                    "K": K, "P": nibbles_to_hex(p), "T": T}
         else:
             data = {"Note": " Decryption failed", "P": "", "A": AD, "N": N,
                     "K": K, "C": plaintext, "T": T}
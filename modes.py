@@ -0,0 +1,474 @@
+"""
+Module to implement the ECB, CBC and CTR modes of operation and CBC-MAC for
+any of the block ciphers. The modes work on bytes-like data (bytes, bytearray
+or memoryview) holding a whole number of blocks, run the key schedule once,
+and write each block straight into an output buffer - either one passed in
+with out= (which may be the input buffer itself, to work in place) or a new
+bytearray. The parallel versions split the data into chunks of blocks and
+run the chunks across a pool of worker processes
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from hmac import compare_digest
+from os import cpu_count
+from utils import min_chunk_blocks, xor_bytes
+
+# cipher and expanded key held by each worker process - set once per worker
+# by init_worker rather than being sent with every chunk
+worker_cipher = None
+worker_key = None
+
+
+def prepare_buffers(data, block_size, out):
+    """
+    Function to set up the input and output buffers for a mode.
+    Parameters: the input data, the block size (bits) and the output buffer
+    (None to allocate one).
+    Returns: the output buffer, and memoryviews of the input and output.
+    """
+
+    data = memoryview(data).cast("B")
+    if len(data) % (block_size // 8):
+        raise ValueError("data must be a whole number of blocks")
+
+    if out is None:
+        out = bytearray(len(data))
+    out_view = memoryview(out).cast("B")
+    if len(out_view) != len(data):
+        raise ValueError("output buffer must be the same length as the data")
+
+    return out, data, out_view
+
+
+def pad_bytes(data, block_size):
+    """
+    Function to apply injective padding 10* to the end of a message given
+    as bytes - a 0x80 byte and then zeros up to a whole number of blocks (a
+    full extra block if the message already fills its last block).
+    Parameters: the data and the block size (bits).
+    Returns: the padded data as bytes.
+    """
+
+    n = block_size // 8
+
+    return bytes(data) + b"\x80" + bytes(n - 1 - len(data) % n)
+
+
+def unpad_bytes(data):
+    """
+    Function to remove 10* padding from the end of a message.
+    Parameters: the padded data.
+    Returns: the data without the padding.
+    """
+
+    # the padding is the last non-zero byte, which must be 0x80
+    data = bytes(data).rstrip(b"\x00")
+    if not data.endswith(b"\x80"):
+        raise ValueError("invalid padding")
+
+    return data[:-1]
+
+
+def ecb_encrypt(cipher, key, data, block_size, out=None):
+    """
+    Function to encrypt under ECB mode.
+    Parameters: the block cipher, key (bytes or ExpandedKey), plaintext,
+    block size (bits) and optional output buffer.
+    Returns: the output buffer holding the ciphertext.
+    """
+
+    out, data, out_view = prepare_buffers(data, block_size, out)
+    key = cipher.expand_key_bytes(key)
+    n = block_size // 8
+
+    # encrypt every block into the output buffer
+    for i in range(0, len(data), n):
+        out_view[i:i + n] = cipher.encrypt_block_bytes(data[i:i + n], key)
+
+    return out
+
+
+def ecb_decrypt(cipher, key, data, block_size, out=None):
+    """
+    Function to decrypt under ECB mode.
+    Parameters: the block cipher, key (bytes or ExpandedKey), ciphertext,
+    block size (bits) and optional output buffer.
+    Returns: the output buffer holding the plaintext.
+    """
+
+    out, data, out_view = prepare_buffers(data, block_size, out)
+    key = cipher.expand_key_bytes(key)
+    n = block_size // 8
+
+    # decrypt every block into the output buffer
+    for i in range(0, len(data), n):
+        out_view[i:i + n] = cipher.decrypt_block_bytes(data[i:i + n], key)
+
+    return out
+
+
+def cbc_encrypt(cipher, key, iv, data, block_size, out=None):
+    """
+    Function to encrypt under CBC mode.
+    Parameters: the block cipher, key (bytes or ExpandedKey), IV (bytes),
+    plaintext, block size (bits) and optional output buffer.
+    Returns: the output buffer holding the ciphertext.
+    """
+
+    out, data, out_view = prepare_buffers(data, block_size, out)
+    key = cipher.expand_key_bytes(key)
+    n = block_size // 8
+    y = bytes(iv)
+
+    for i in range(0, len(data), n):
+        # XOR the plaintext block with the previous ciphertext block (the IV
+        # for the first block) and encrypt the result
+        y = cipher.encrypt_block_bytes(xor_bytes(data[i:i + n], y), key)
+        out_view[i:i + n] = y
+
+    return out
+
+
+def cbc_decrypt(cipher, key, iv, data, block_size, out=None):
+    """
+    Function to decrypt under CBC mode. The block decryptions do not depend
+    on each other, so each chunk of min_chunk_blocks blocks is decrypted
+    before the XOR chain is applied to the chunk - memory use is bounded by
+    the chunk, not the data.
+    Parameters: the block cipher, key (bytes or ExpandedKey), IV (bytes),
+    ciphertext, block size (bits) and optional output buffer.
+    Returns: the output buffer holding the plaintext.
+    """
+
+    out, data, out_view = prepare_buffers(data, block_size, out)
+    key = cipher.expand_key_bytes(key)
+    n = block_size // 8
+    step = n * min_chunk_blocks
+    y = bytes(iv)
+
+    for start in range(0, len(data), step):
+        end = min(start + step, len(data))
+
+        # each plaintext block is XORed with the previous ciphertext block
+        # (the IV, or the last block of the previous chunk, for the first) -
+        # copied before the output is written, as the ciphertext may be
+        # overwritten when decrypting in place
+        chain = y + bytes(data[start:end - n])
+        y = bytes(data[end - n:end])
+
+        # decrypt every block of the chunk, then apply the chain with a
+        # single XOR
+        for i in range(start, end, n):
+            out_view[i:i + n] = cipher.decrypt_block_bytes(data[i:i + n], key)
+        out_view[start:end] = xor_bytes(out_view[start:end], chain)
+
+    return out
+
+
+def keystream_at(cipher, key, counter, block_index, block_size,
+                 num_blocks=1):
+    """
+    Function to generate the CTR mode keystream from any block onwards, so a
+    range of blocks can be encrypted or decrypted without the blocks before
+    it. The whole counter block is one big-endian counter, which only wraps
+    round once every value of the block has been used.
+    Parameters: the block cipher, key (bytes or ExpandedKey), initial counter
+    block (bytes), first block number, block size (bits) and number of
+    blocks.
+    Returns: the keystream as bytes.
+    """
+
+    key = cipher.expand_key_bytes(key)
+    n = block_size // 8
+    modulus = 1 << (8 * n)
+    value = int.from_bytes(counter, "big") + block_index
+    keystream = bytearray(n * num_blocks)
+
+    # encrypt each counter block in turn
+    for i in range(0, len(keystream), n):
+        keystream[i:i + n] = cipher.encrypt_block_bytes(
+            (value % modulus).to_bytes(n, "big"), key)
+        value += 1
+
+    return bytes(keystream)
+
+
+def ctr_encrypt(cipher, key, counter, data, block_size, out=None,
+                first_block=0):
+    """
+    Function to encrypt/decrypt under CTR mode (CTR is inverse-free, so the
+    same function does both). The counter block is incremented as a full
+    width counter after each block (see keystream_at), and the keystream is
+    generated and XORed a chunk of min_chunk_blocks blocks at a time.
+    Parameters: the block cipher, key (bytes or ExpandedKey), initial counter
+    block (bytes), input data, block size (bits), optional output buffer and
+    the block number of the first block of data (to start part way through
+    a message).
+    Returns: the output buffer holding the result.
+    """
+
+    out, data, out_view = prepare_buffers(data, block_size, out)
+    key = cipher.expand_key_bytes(key)
+    n = block_size // 8
+    step = n * min_chunk_blocks
+
+    # XOR each chunk of the data with its keystream, straight into the
+    # output buffer
+    for start in range(0, len(data), step):
+        end = min(start + step, len(data))
+        keystream = keystream_at(cipher, key, counter,
+                                 first_block + start // n, block_size,
+                                 (end - start) // n)
+        out_view[start:end] = xor_bytes(data[start:end], keystream)
+
+    return out
+
+
+def cbc_mac(cipher, key, data, block_size, iv=None):
+    """
+    Function to generate an authentication tag using CBC-MAC - CBC mode with
+    an all zero IV, keeping only the last ciphertext block.
+    Parameters: the block cipher, key (bytes or ExpandedKey), message, block
+    size (bits) and optional IV (the tag of the message so far, to carry on
+    a message given in parts).
+    Returns: the tag as bytes.
+    """
+
+    data = memoryview(data).cast("B")
+    if len(data) % (block_size // 8):
+        raise ValueError("data must be a whole number of blocks")
+
+    key = cipher.expand_key_bytes(key)
+    n = block_size // 8
+    y = bytes(n) if iv is None else bytes(iv)
+
+    # XOR each block with the previous result and encrypt
+    for i in range(0, len(data), n):
+        y = cipher.encrypt_block_bytes(xor_bytes(data[i:i + n], y), key)
+
+    return y
+
+
+def init_worker(cipher, key):
+    """
+    Function to set up a worker process with the cipher and expanded key.
+    Parameters: the block cipher and the expanded key.
+    Returns: none.
+    """
+
+    global worker_cipher, worker_key
+    worker_cipher = cipher
+    worker_key = key
+
+
+def run_chunk(function, args):
+    """
+    Function to run a mode over one chunk in a worker process.
+    Parameters: the mode function and its arguments after the key.
+    Returns: the result as bytes.
+    """
+
+    return bytes(function(worker_cipher, worker_key, *args))
+
+
+def run_parallel(cipher, key, data, block_size, out, tasks, workers,
+                 chunk_blocks):
+    """
+    Function to run the chunks of a mode across a pool of worker processes,
+    writing the results into the output buffer in order.
+    Parameters: the block cipher, key, input data, block size (bits),
+    output buffer, function giving the (function, arguments) task for a chunk
+    from the number of its first block and its data, the number of worker
+    processes and the number of blocks per chunk (None to choose).
+    Returns: the output buffer.
+    """
+
+    out, data, out_view = prepare_buffers(data, block_size, out)
+    key = cipher.expand_key_bytes(key)
+    n = block_size // 8
+    num_blocks = len(data) // n
+
+    if workers is None:
+        workers = cpu_count() or 1
+
+    # give each worker several chunks so the work stays balanced, but never
+    # fewer than min_chunk_blocks blocks per chunk
+    if chunk_blocks is None:
+        chunk_blocks = max(min_chunk_blocks, -(-num_blocks // (4 * workers)))
+
+    # split the data into chunks and build the task for each
+    offsets = range(0, len(data), chunk_blocks * n)
+    chunk_tasks = [tasks(offset // n, data[offset:offset + chunk_blocks * n])
+                   for offset in offsets]
+
+    # with only one chunk or worker, run the mode in this process
+    if len(chunk_tasks) <= 1 or workers <= 1:
+        for offset, (function, args) in zip(offsets, chunk_tasks):
+            result = function(cipher, key, *args)
+            out_view[offset:offset + len(result)] = result
+        return out
+
+    # the cipher and expanded key are sent to each worker once, and map
+    # returns the results in chunk order
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(cipher, key)) as executor:
+        results = executor.map(run_chunk, *zip(*chunk_tasks))
+        for offset, result in zip(offsets, results):
+            out_view[offset:offset + len(result)] = result
+
+    return out
+
+
+def ecb_encrypt_parallel(cipher, key, data, block_size, out=None,
+                         workers=None, chunk_blocks=None):
+    """
+    Function to encrypt under ECB mode across a pool of worker processes.
+    Parameters: the block cipher, key (bytes or ExpandedKey), plaintext,
+    block size (bits), optional output buffer, number of worker processes
+    (defaults to the number of CPUs) and blocks per chunk.
+    Returns: the output buffer holding the ciphertext.
+    """
+
+    def tasks(chunk_block, chunk):
+        return ecb_encrypt, (bytes(chunk), block_size)
+
+    return run_parallel(cipher, key, data, block_size, out, tasks, workers,
+                        chunk_blocks)
+
+
+def ecb_decrypt_parallel(cipher, key, data, block_size, out=None,
+                         workers=None, chunk_blocks=None):
+    """
+    Function to decrypt under ECB mode across a pool of worker processes.
+    Parameters: the block cipher, key (bytes or ExpandedKey), ciphertext,
+    block size (bits), optional output buffer, number of worker processes
+    (defaults to the number of CPUs) and blocks per chunk.
+    Returns: the output buffer holding the plaintext.
+    """
+
+    def tasks(chunk_block, chunk):
+        return ecb_decrypt, (bytes(chunk), block_size)
+
+    return run_parallel(cipher, key, data, block_size, out, tasks, workers,
+                        chunk_blocks)
+
+
+def ctr_encrypt_parallel(cipher, key, counter, data, block_size, out=None,
+                         workers=None, chunk_blocks=None, first_block=0):
+    """
+    Function to encrypt/decrypt under CTR mode across a pool of worker
+    processes - each chunk generates its own keystream from its block
+    number.
+    Parameters: the block cipher, key (bytes or ExpandedKey), initial counter
+    block (bytes), input data, block size (bits), optional output buffer,
+    number of worker processes (defaults to the number of CPUs), blocks per
+    chunk and the block number of the first block of data.
+    Returns: the output buffer holding the result.
+    """
+
+    counter = bytes(counter)
+
+    def tasks(chunk_block, chunk):
+        return ctr_encrypt, (counter, bytes(chunk), block_size, None,
+                             first_block + chunk_block)
+
+    return run_parallel(cipher, key, data, block_size, out, tasks, workers,
+                        chunk_blocks)
+
+
+def cbc_decrypt_parallel(cipher, key, iv, data, block_size, out=None,
+                         workers=None, chunk_blocks=None):
+    """
+    Function to decrypt under CBC mode across a pool of worker processes -
+    each chunk is decrypted with the last ciphertext block of the chunk
+    before it as its IV.
+    Parameters: the block cipher, key (bytes or ExpandedKey), IV (bytes),
+    ciphertext, block size (bits), optional output buffer, number of worker
+    processes (defaults to the number of CPUs) and blocks per chunk.
+    Returns: the output buffer holding the plaintext.
+    """
+
+    n = block_size // 8
+    iv = bytes(iv)
+    data = memoryview(data).cast("B")
+
+    def tasks(chunk_block, chunk):
+        if chunk_block == 0:
+            chunk_iv = iv
+        else:
+            chunk_iv = bytes(data[(chunk_block - 1) * n:chunk_block * n])
+        return cbc_decrypt, (chunk_iv, bytes(chunk), block_size)
+
+    return run_parallel(cipher, key, data, block_size, out, tasks, workers,
+                        chunk_blocks)
+
+
+class CbcMac:
+    """
+    Class to generate a CBC-MAC tag incrementally, in the style of hashlib -
+    the message is given in parts with update, and only the incomplete
+    block at the end of the message so far is held between calls. The
+    message is padded with 10* padding, so the tag matches cbc_mac over the
+    padded message.
+    """
+
+    def __init__(self, cipher, key, block_size, data=b""):
+        # block cipher, expanded key and block length in bytes
+        self.cipher = cipher
+        self.key = cipher.expand_key_bytes(key)
+        self.block_size = block_size
+        self.n = block_size // 8
+
+        # tag of the whole blocks so far, and the incomplete block after them
+        self.tag = bytes(self.n)
+        self.buffer = b""
+
+        self.update(data)
+
+    def update(self, data):
+        """
+        Method to add the next part of the message.
+        Parameters: the data (bytes, bytearray or memoryview).
+        Returns: none.
+        """
+
+        data = self.buffer + bytes(data)
+
+        # run CBC-MAC over the whole blocks, keeping the rest for later -
+        # the padding always adds a block, so no whole block is held back
+        whole = len(data) - len(data) % self.n
+        if whole:
+            self.tag = cbc_mac(self.cipher, self.key, data[:whole],
+                               self.block_size, self.tag)
+        self.buffer = data[whole:]
+
+    def digest(self):
+        """
+        Method to determine the tag of the message so far (more data can
+        still be added afterwards).
+        Returns: the tag as bytes.
+        """
+
+        return cbc_mac(self.cipher, self.key,
+                       pad_bytes(self.buffer, self.block_size),
+                       self.block_size, self.tag)
+
+    def hexdigest(self):
+        """
+        Method to determine the tag of the message so far as a hex string.
+        Returns: the tag as an upper case hex string, as written by the tool.
+        """
+
+        return self.digest().hex().upper()
+
+    def verify(self, tag):
+        """
+        Method to verify a tag against the message so far.
+        Parameters: the tag (bytes or a hex string).
+        Returns: True if the tag matches, False if not.
+        """
+
+        if isinstance(tag, str):
+            tag = bytes.fromhex(tag)
+
+        return compare_digest(self.digest(), bytes(tag))
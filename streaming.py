@@ -0,0 +1,170 @@
+"""
+Module to encrypt, decrypt and generate MACs for binary files of any size.
+Files are read and written in fixed size chunks, with the CBC, CTR and
+CBC-MAC chaining state carried from one chunk to the next, so memory use
+depends only on the chunk size and not on the size of the file
+"""
+
+from modes import ecb_encrypt, ecb_decrypt, cbc_encrypt, cbc_decrypt, \
+    ctr_encrypt, pad_bytes, unpad_bytes, CbcMac
+from RC4 import rc4_iv
+
+# number of bytes read from the input file at a time - a whole number of
+# blocks for both 64 and 128-bit block ciphers
+default_chunk_size = 1 << 16
+
+
+def read_chunks(file, chunk_size):
+    """
+    Generator to read a file in chunks, reading one chunk ahead so the last
+    chunk can be recognised (an empty file gives one empty chunk).
+    Parameters: the open binary file and the chunk size in bytes.
+    Returns: yields (chunk, whether it is the last chunk) pairs.
+    """
+
+    chunk = file.read(chunk_size)
+    while True:
+        next_chunk = file.read(chunk_size)
+        yield chunk, not next_chunk
+        if not next_chunk:
+            return
+        chunk = next_chunk
+
+
+def default_iv(key, block_size):
+    """
+    Function to generate the IV the tool uses for a key - the first block of
+    the RC4 keystream under the key.
+    Parameters: the key (bytes) and the block size (bits).
+    Returns: the IV as bytes.
+    """
+
+    return rc4_iv(bytes(key), block_size // 8)
+
+
+def check_chunk_size(chunk_size, block_size):
+    """
+    Function to check the chunk size holds a whole number of blocks.
+    Parameters: the chunk size in bytes and the block size (bits).
+    Returns: none.
+    """
+
+    if chunk_size <= 0 or chunk_size % (block_size // 8):
+        raise ValueError("chunk size must be a whole number of blocks")
+
+
+def encrypt_file(cipher, key, mode, input_path, output_path, block_size,
+                 iv=None, chunk_size=default_chunk_size):
+    """
+    Function to encrypt a file, writing the ciphertext to another file. ECB
+    and CBC pad the message with 10* padding, CTR leaves the ciphertext the
+    same length as the message.
+    Parameters: the block cipher, key (bytes), mode ("ECB", "CBC" or "CTR"),
+    input and output file paths, block size (bits), IV or initial counter
+    block (bytes - defaults to the tool's RC4 IV for the key) and the chunk
+    size in bytes.
+    Returns: none.
+    """
+
+    check_chunk_size(chunk_size, block_size)
+    n = block_size // 8
+    if iv is None:
+        iv = default_iv(key, block_size)
+    key = cipher.expand_key_bytes(key)
+    block_num = 0
+
+    with open(input_path, "rb") as input_file, \
+            open(output_path, "wb") as output_file:
+        for chunk, last in read_chunks(input_file, chunk_size):
+            if mode == "CTR":
+                # pad a short last chunk with zeros, then drop the extra
+                # keystream bytes
+                length = len(chunk)
+                chunk = chunk + bytes(-length % n)
+                result = ctr_encrypt(cipher, key, iv, chunk, block_size,
+                                     first_block=block_num)[:length]
+                block_num += len(chunk) // n
+            else:
+                if last:
+                    chunk = pad_bytes(chunk, block_size)
+                if mode == "ECB":
+                    result = ecb_encrypt(cipher, key, chunk, block_size)
+                elif mode == "CBC":
+                    result = cbc_encrypt(cipher, key, iv, chunk, block_size)
+
+                    # the last ciphertext block chains into the next chunk
+                    iv = result[-n:]
+                else:
+                    raise ValueError("unknown mode: " + str(mode))
+
+            output_file.write(result)
+
+
+def decrypt_file(cipher, key, mode, input_path, output_path, block_size,
+                 iv=None, chunk_size=default_chunk_size):
+    """
+    Function to decrypt a file encrypted with encrypt_file, writing the
+    plaintext to another file.
+    Parameters: the block cipher, key (bytes), mode ("ECB", "CBC" or "CTR"),
+    input and output file paths, block size (bits), IV or initial counter
+    block (bytes - defaults to the tool's RC4 IV for the key) and the chunk
+    size in bytes.
+    Returns: none.
+    """
+
+    check_chunk_size(chunk_size, block_size)
+    n = block_size // 8
+    if iv is None:
+        iv = default_iv(key, block_size)
+    key = cipher.expand_key_bytes(key)
+    block_num = 0
+
+    with open(input_path, "rb") as input_file, \
+            open(output_path, "wb") as output_file:
+        for chunk, last in read_chunks(input_file, chunk_size):
+            if mode == "CTR":
+                # CTR is inverse-free - decrypting is the same as encrypting
+                length = len(chunk)
+                chunk = chunk + bytes(-length % n)
+                result = ctr_encrypt(cipher, key, iv, chunk, block_size,
+                                     first_block=block_num)[:length]
+                block_num += len(chunk) // n
+            else:
+                if mode == "ECB":
+                    result = ecb_decrypt(cipher, key, chunk, block_size)
+                elif mode == "CBC":
+                    result = cbc_decrypt(cipher, key, iv, chunk, block_size)
+
+                    # the last ciphertext block chains into the next chunk
+                    iv = chunk[-n:]
+                else:
+                    raise ValueError("unknown mode: " + str(mode))
+
+                # remove the padding from the end of the message
+                if last:
+                    result = unpad_bytes(result)
+
+            output_file.write(result)
+
+
+def mac_file(cipher, key, input_path, block_size,
+             chunk_size=default_chunk_size):
+    """
+    Function to generate a CBC-MAC tag for a file, padding the message with
+    10* padding.
+    Parameters: the block cipher, key (bytes or ExpandedKey), input file
+    path, block size (bits) and the chunk size in bytes.
+    Returns: the tag as bytes.
+    """
+
+    check_chunk_size(chunk_size, block_size)
+    mac = CbcMac(cipher, key, block_size)
+
+    # feed the file to the MAC a chunk at a time
+    with open(input_path, "rb") as input_file:
+        chunk = input_file.read(chunk_size)
+        while chunk:
+            mac.update(chunk)
+            chunk = input_file.read(chunk_size)
+
+    return mac.digest()
@@ -4,6 +4,55 @@ BC and AEAD construct can make use of - also code logic for input error
 handling, padding, splitting blocks, and I/O to files
 """
 
+from codec import hex_to_nibbles, nibbles_to_hex, high_nibble_table, \
+    low_nibble_table
+
+# number of expanded keys each block cipher keeps in its key schedule cache
+key_cache_size = 64
+
+# smallest number of blocks handed to a worker process in one go, so the
+# cost of sending a chunk to a worker is spread over enough blocks
+min_chunk_blocks = 1024
+
+
+class ExpandedKey:
+    """
+    Class to hold a key together with its precomputed round keys, so the key
+    schedule only needs to be run once per key. An ExpandedKey can be passed
+    to a block cipher's encrypt_block / decrypt_block in place of the key.
+    Each engine stores its round keys in its own format, so the key is
+    tagged with the schedule it was made for - the layout of the original
+    key ("nibbles" or "bytes"), then the engine and its parameters.
+    """
+
+    def __init__(self, key, round_keys, schedule):
+        self.key = key
+        self.round_keys = round_keys
+        self.schedule = schedule
+
+
+def reuse_expanded_key(key, schedule):
+    """
+    Function to check a key given to a block cipher's expand_key against
+    the schedule the cipher runs. A key expanded for another schedule
+    (another engine, or another number of rounds) has its original key
+    returned so it can be expanded again - as long as that key is in the
+    same layout - and is rejected otherwise.
+    Parameters: the key (original or ExpandedKey) and the schedule of the
+    cipher.
+    Returns: the key, or the original key of an ExpandedKey made for another
+    schedule.
+    """
+
+    if not isinstance(key, ExpandedKey) or key.schedule == schedule:
+        return key
+
+    if key.schedule[0] != schedule[0]:
+        raise ValueError("key was expanded for " + key.schedule[1] +
+                         ", which takes its key in a different layout")
+
+    return key.key
+
 
 def apply_padding(block, block_length):
     """
@@ -27,20 +76,7 @@ def list_to_string(list_to_convert):
     Returns: the list converted into string format.
     """
 
-    # check whether list is 2D - if so flatten to 1D
-    if not list_to_convert:
-        return ""
-
-    if isinstance(list_to_convert[0], list):
-        list_to_convert = sum(list_to_convert, [])
-
-    converted_string = ""
-
-    # for each element in the list, append it (in hex) to the string
-    for i in list_to_convert:
-        converted_string += (hex(i).upper()).split('X')[-1]
-
-    return converted_string
+    return nibbles_to_hex(list_to_convert)
 
 
 def string_to_list(string_to_convert):
@@ -51,14 +87,7 @@ def string_to_list(string_to_convert):
     Returns: the plaintext as a list.
     """
 
-    converted_list = []
-
-    # for each element in the string, cast it as an int and append to
-    # the string
-    for letter in string_to_convert:
-        converted_list.append(int(letter, 16))
-
-    return converted_list
+    return hex_to_nibbles(string_to_convert)
 
 
 def convert_to_bits(state):
@@ -497,3 +526,107 @@ def increment_byte(byte):
         byte = byte + 1
 
     return decimal_to_hex([byte])
+
+
+def nibbles_to_int(nibbles):
+    """
+    Function to pack a list of nibbles into an int - nibble i is stored in
+    bits 4i to 4i + 3, matching the bit numbering of the GIFT nibble
+    implementations.
+    Parameters: list of nibbles.
+    Returns: the packed int.
+    """
+
+    value = 0
+    for nibble in reversed(nibbles):
+        value = value << 4 | nibble
+
+    return value
+
+
+def int_to_nibbles(value, num_nibbles):
+    """
+    Function to unpack an int into a list of nibbles (inverse of
+    nibbles_to_int).
+    Parameters: the packed int and the number of nibbles to unpack.
+    Returns: list of nibbles.
+    """
+
+    return [value >> (4 * i) & 0xf for i in range(num_nibbles)]
+
+
+# byte value with its two nibbles swapped (bytes.translate table) - the
+# high and low nibble tables come from codec
+nibble_swap_table = bytes((i & 0xf) << 4 | i >> 4 for i in range(256))
+
+
+def bytes_to_nibble_int(data):
+    """
+    Function to pack a block given as bytes into an int with the same layout
+    as nibbles_to_int - byte i holds nibbles 2i (high) and 2i + 1 (low), i.e.
+    the block's hex string read in order.
+    Parameters: the block as bytes (or bytearray / memoryview).
+    Returns: the packed int.
+    """
+
+    return int.from_bytes(bytes(data).translate(nibble_swap_table), "little")
+
+
+def nibble_int_to_bytes(value, num_bytes):
+    """
+    Function to unpack an int into a block of bytes (inverse of
+    bytes_to_nibble_int).
+    Parameters: the packed int and the block length in bytes.
+    Returns: the block as bytes.
+    """
+
+    return value.to_bytes(num_bytes, "little").translate(nibble_swap_table)
+
+
+def split_nibbles(data):
+    """
+    Function to split each byte into its two nibbles, giving bytes that hold
+    one nibble each (high nibble first) - the form the key schedule caches
+    are keyed on.
+    Parameters: the data as bytes (or bytearray / memoryview).
+    Returns: bytes of twice the length holding one nibble per byte.
+    """
+
+    data = bytes(data)
+    nibbles = bytearray(2 * len(data))
+    nibbles[0::2] = data.translate(high_nibble_table)
+    nibbles[1::2] = data.translate(low_nibble_table)
+
+    return bytes(nibbles)
+
+
+def pad_hex_string(hex_string, block_length, type_of_enc):
+    """
+    Function to pad a hex string to a whole number of blocks, using the same
+    10* padding divide_into_blocks applies to nibble lists.
+    Parameters: the hex string, the block length, and the encryption type -
+    1 for encryption (a full last block gets a whole padding block), 2 for
+    decryption (only an incomplete last block is padded).
+    Returns: the padded hex string.
+    """
+
+    characters_per_block = block_length // 4
+    remainder = len(hex_string) % characters_per_block
+
+    # a full last block is only padded when encrypting
+    if remainder == 0 and type_of_enc == 2:
+        return hex_string
+
+    return hex_string + "8" + "0" * (characters_per_block - remainder - 1)
+
+
+def xor_bytes(bytes_one, bytes_two):
+    """
+    Function to XOR two equal length blocks of bytes.
+    Parameters: the two blocks (bytes, bytearray or memoryview).
+    Returns: the XOR of the blocks as bytes.
+    """
+
+    value = int.from_bytes(bytes_one, "big") ^ int.from_bytes(bytes_two, "big")
+
+    return value.to_bytes(len(bytes_one), "big")